@@ -0,0 +1,339 @@
+"""
+Throughput/latency benchmarks for every use_redis store.
+
+Runs against, in order of preference: the server given with ``--url``, a ``redis-server`` spawned on a free
+port, or an in-process ``fakeredis.TcpFakeServer``. Results are written as JSON so runs can be compared:
+
+    python benchmarks/run.py --output before.json
+    python benchmarks/run.py --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import redis
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import use_redis  # noqa: E402
+from use_redis import (  # noqa: E402
+    useRedisHash,
+    useRedisList,
+    useRedisSet,
+    useRedisStream,
+)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Server:
+    """
+    The Redis server under test.
+    """
+
+    def __init__(self, url=None):
+        self.url = url
+        self.kind = "external"
+        self._process = None
+        self._fake = None
+
+    def __enter__(self):
+        if self.url:
+            return self
+        port = free_port()
+        executable = shutil.which("redis-server")
+        if executable:
+            self.kind = "redis-server"
+            self._process = subprocess.Popen(
+                [executable, "--port", str(port), "--save", "", "--appendonly", "no"],
+                stdout=subprocess.DEVNULL,
+            )
+        else:
+            try:
+                from fakeredis import TcpFakeServer
+            except ImportError:
+                raise SystemExit(
+                    "no Redis available: pass --url, install redis-server or install fakeredis"
+                )
+            self.kind = "fakeredis"
+            self._fake = TcpFakeServer(("127.0.0.1", port), server_type="redis")
+            threading.Thread(target=self._fake.serve_forever, daemon=True).start()
+        self.url = f"redis://127.0.0.1:{port}/0"
+        self._wait_ready()
+        return self
+
+    def _wait_ready(self):
+        client = redis.Redis.from_url(self.url)
+        for _ in range(100):
+            try:
+                client.ping()
+                return
+            except redis.ConnectionError:
+                time.sleep(0.05)
+        raise SystemExit(f"Redis at {self.url} did not become ready")
+
+    def __exit__(self, *exc_info):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait()
+        if self._fake is not None:
+            self._fake.shutdown()
+            self._fake.server_close()
+
+    @property
+    def parameters(self):
+        connection_kwargs = redis.connection.parse_url(self.url)
+        return {
+            "host": connection_kwargs.get("host"),
+            "port": connection_kwargs.get("port"),
+            "password": connection_kwargs.get("password"),
+            "db": connection_kwargs.get("db", 0),
+        }
+
+    def version(self):
+        try:
+            return redis.Redis.from_url(self.url).info("server").get("redis_version")
+        except redis.RedisError:
+            return None
+
+
+def unique(name):
+    return f"bench:{name}:{uuid.uuid4().hex[:8]}"
+
+
+def measure(name, params, operations, func):
+    """
+    Run `func(i)` `operations` times and return throughput and latency percentiles.
+    """
+    latencies = []
+    started = time.perf_counter()
+    for i in range(operations):
+        begin = time.perf_counter()
+        func(i)
+        latencies.append(time.perf_counter() - begin)
+    elapsed = time.perf_counter() - started
+    return result(name, params, operations, elapsed, latencies)
+
+
+def result(name, params, operations, elapsed, latencies=None):
+    entry = {
+        "name": name,
+        "params": params,
+        "operations": operations,
+        "seconds": round(elapsed, 6),
+        "ops_per_sec": round(operations / elapsed, 2) if elapsed else None,
+    }
+    if latencies:
+        latencies = sorted(latencies)
+        entry["latency_ms"] = {
+            "p50": round(statistics.median(latencies) * 1000, 4),
+            "p99": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 4),
+            "max": round(latencies[-1] * 1000, 4),
+        }
+    return entry
+
+
+def bench_hash(parameters, n):
+    store = useRedisHash(unique("hash"), **parameters)
+    yield measure("hash.set", {}, n, lambda i: store.set(f"f{i % 100}", i))
+    yield measure("hash.get", {}, n, lambda i: store.get(f"f{i % 100}"))
+    yield measure("hash.increment", {}, n, lambda i: store.increment("counter"))
+    yield measure(
+        "hash.items", {"fields": 100}, max(n // 10, 1), lambda i: store.items()
+    )
+    store.connection.delete(store.key)
+
+
+def bench_list(parameters, n):
+    store = useRedisList(unique("list"), **parameters)
+    yield measure("list.rpush", {}, n, lambda i: store.rpush(i))
+    yield measure("list.lpop", {}, n, lambda i: store.lpop())
+    store.connection.delete(store.key)
+
+
+def bench_set(parameters, n):
+    store = useRedisSet(unique("set"), **parameters)
+    yield measure("set.add", {}, n, lambda i: store.add(i))
+    yield measure("set.is_member", {}, n, lambda i: store.is_member(i))
+    store.connection.delete(store.key)
+
+
+def bench_stream_send(parameters, n):
+    store = useRedisStream(stream=unique("stream"), group="bench", **parameters)
+    yield measure("stream.send", {}, n, lambda i: store.send({"i": i}))
+    for chunk_size in (100, 1000):
+        started = time.perf_counter()
+        store.send_many(({"i": i} for i in range(n)), chunk_size=chunk_size)
+        yield result(
+            "stream.send_many",
+            {"chunk_size": chunk_size},
+            n,
+            time.perf_counter() - started,
+        )
+    store.connection.delete(store.stream)
+
+
+def bench_stream_consume(parameters, n, prefetch, consumers):
+    """
+    Drain `n` messages with `consumers` threads, acking each message.
+    """
+    stream = unique("stream")
+    producer = useRedisStream(stream=stream, group="bench", **parameters)
+    producer.send_many(({"i": i} for i in range(n)), chunk_size=1000)
+
+    consumed = []
+    lock = threading.Lock()
+    stores = [
+        useRedisStream(stream=stream, group="bench", **parameters)
+        for _ in range(consumers)
+    ]
+
+    def run(index):
+        store = stores[index]
+
+        def callback(message):
+            store.ack(message)
+            with lock:
+                consumed.append(message.id)
+                if len(consumed) >= n:
+                    for s in stores:
+                        s._shutdown = True
+
+        store.start_consuming(f"consumer-{index}", callback, prefetch, timeout=100)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(consumers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    producer.connection.delete(stream)
+    return result(
+        "stream.consume_ack",
+        {"prefetch": prefetch, "consumers": consumers},
+        len(consumed),
+        elapsed,
+    )
+
+
+def run_all(parameters, n, prefetches, consumer_counts):
+    results = []
+    for bench in (bench_hash, bench_list, bench_set, bench_stream_send):
+        for entry in bench(parameters, n):
+            print_result(entry)
+            results.append(entry)
+    for prefetch in prefetches:
+        for consumers in consumer_counts:
+            entry = bench_stream_consume(parameters, n, prefetch, consumers)
+            print_result(entry)
+            results.append(entry)
+    return results
+
+
+def print_result(entry):
+    params = ",".join(f"{k}={v}" for k, v in entry["params"].items())
+    latency = entry.get("latency_ms", {}).get("p50")
+    suffix = f" p50={latency}ms" if latency is not None else ""
+    print(f"{entry['name']:<22} {params:<26} {entry['ops_per_sec']:>12} ops/s{suffix}")
+
+
+def compare(results, baseline, threshold):
+    """
+    Return the entries whose throughput dropped by more than `threshold` (a fraction) against `baseline`.
+    """
+
+    def key(entry):
+        return entry["name"], json.dumps(entry["params"], sort_keys=True)
+
+    previous = {key(entry): entry for entry in baseline["results"]}
+    regressions = []
+    for entry in results:
+        before = previous.get(key(entry))
+        if not before or not before.get("ops_per_sec") or not entry.get("ops_per_sec"):
+            continue
+        change = entry["ops_per_sec"] / before["ops_per_sec"] - 1
+        if change < -threshold:
+            regressions.append(
+                {
+                    "name": entry["name"],
+                    "params": entry["params"],
+                    "before": before["ops_per_sec"],
+                    "after": entry["ops_per_sec"],
+                    "change": round(change, 4),
+                }
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--url", help="benchmark an existing server, e.g. redis://localhost:6379/15"
+    )
+    parser.add_argument(
+        "--operations", type=int, default=5000, help="operations per case"
+    )
+    parser.add_argument("--prefetch", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--consumers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument(
+        "--output", default="benchmark.json", help="where to write the JSON results"
+    )
+    parser.add_argument("--compare", help="a previous JSON result to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="throughput drop (fraction) reported as a regression",
+    )
+    args = parser.parse_args(argv)
+
+    with Server(args.url) as server:
+        results = run_all(
+            server.parameters, args.operations, args.prefetch, args.consumers
+        )
+        report = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "redis_py": redis.__version__,
+                "use_redis": getattr(use_redis, "__version__", None),
+                "server": server.kind,
+                "server_version": server.version(),
+                "operations": args.operations,
+            },
+            "results": results,
+        }
+
+    exit_code = 0
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        report["regressions"] = compare(results, baseline, args.threshold)
+        for regression in report["regressions"]:
+            print(
+                f"REGRESSION {regression['name']} {regression['params']}: "
+                f"{regression['before']} -> {regression['after']} ops/s ({regression['change']:+.1%})"
+            )
+        exit_code = 1 if report["regressions"] else 0
+
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"results written to {args.output}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
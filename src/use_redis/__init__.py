@@ -1,9 +1,22 @@
 from .store import RedisStore as useRedis
 from .stream import RedisStreamMessage
 from .stream import RedisStreamStore as useRedisStream
+from .multistream import RedisMultiStreamStore as useRedisMultiStream
+from .partition import RedisPartitionedStreamStore as useRedisPartitionedStream
 from .set import RedisSetStore as useRedisSet
 from .list import RedisListStore as useRedisList
+from .queue import RedisListQueue as useRedisListQueue
 from .hash import RedisHashStore as useRedisHash
+from .pool import pool_registry
+from .scripts import script_registry
+from .metrics import Metrics
+from .asyncio import (
+    useRedisAsync,
+    useRedisStreamAsync,
+    useRedisSetAsync,
+    useRedisListAsync,
+    useRedisHashAsync,
+)
 
 useRedisStreamStore = useRedisStream
 useRedisStore = useRedis
@@ -15,6 +28,17 @@ __all__ = [
     "useRedisStreamStore",
     "RedisStreamMessage",
     "useRedisStream",
+    "useRedisMultiStream",
+    "useRedisPartitionedStream",
     "useRedisList",
+    "useRedisListQueue",
     "useRedisHash",
+    "pool_registry",
+    "script_registry",
+    "Metrics",
+    "useRedisAsync",
+    "useRedisStreamAsync",
+    "useRedisSetAsync",
+    "useRedisListAsync",
+    "useRedisHashAsync",
 ]
@@ -0,0 +1,112 @@
+import threading
+from typing import Optional
+
+
+class AdaptivePrefetch:
+    """
+    Resizes the prefetch and the number of callback threads of a consumer from the group lag and callback latency.
+
+    Under backlog the prefetch doubles and one thread is added per update; once the group has caught up both shrink
+    again. The prefetch is also capped so that one batch takes at most `max_batch_latency` seconds to process.
+    """
+
+    def __init__(
+        self,
+        min_prefetch: int = 1,
+        max_prefetch: int = 1000,
+        min_workers: int = 0,
+        max_workers: int = 0,
+        max_batch_latency: float = 1.0,
+        interval: int = 5000,
+    ):
+        """
+        :param min_prefetch: Smallest prefetch, also the initial one
+        :param max_prefetch: Largest prefetch
+        :param min_workers: Smallest number of callback threads, also the initial one; 0 runs callbacks on the polling thread
+        :param max_workers: Largest number of callback threads, `min_workers` keeps the number fixed
+        :param max_batch_latency: Longest time a batch may take to process, given the measured callback latency (seconds)
+        :param interval: Interval between two updates (milliseconds)
+        """
+        if not 0 < min_prefetch <= max_prefetch:
+            raise ValueError("expected 0 < min_prefetch <= max_prefetch")
+        self.min_prefetch = min_prefetch
+        self.max_prefetch = max_prefetch
+        self.min_workers = min_workers
+        self.max_workers = max(max_workers, min_workers)
+        self.max_batch_latency = max_batch_latency
+        self.interval = interval
+        self.prefetch = min_prefetch
+        self.workers = min_workers
+        self.latency = None
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._full_batches = 0
+
+    def record_latency(self, elapsed: float):
+        """
+        Record the duration of one callback (seconds).
+        """
+        with self._lock:
+            # 指数加权移动平均，平滑单次慢调用
+            if self.latency is None:
+                self.latency = elapsed
+            else:
+                self.latency = 0.8 * self.latency + 0.2 * elapsed
+
+    def record_batch(self, fetched: int, requested: int):
+        """
+        Record a consume call, a full batch hints at a backlog when the server does not report the lag.
+        """
+        with self._lock:
+            self._batches += 1
+            if requested > 0 and fetched >= requested:
+                self._full_batches += 1
+
+    def update(self, lag: Optional[int] = None):
+        """
+        Resize prefetch and workers.
+
+        :param lag: Entries not yet delivered to the group (XINFO GROUPS "lag", Redis 7.0+), None if unknown
+        :return: The new `(prefetch, workers)`
+        """
+        with self._lock:
+            if lag is not None:
+                backlog, idle = lag >= self.prefetch, lag == 0
+            else:
+                backlog = self._batches > 0 and self._full_batches == self._batches
+                idle = self._full_batches == 0
+            self._batches = self._full_batches = 0
+
+            if backlog:
+                self.prefetch = min(self.prefetch * 2, self.max_prefetch)
+                self.workers = min(self.workers + 1, self.max_workers)
+            elif idle:
+                self.prefetch = max(self.prefetch // 2, self.min_prefetch)
+                self.workers = max(self.workers - 1, self.min_workers)
+
+            if self.latency:
+                # 每个线程串行处理 prefetch / workers 条消息
+                cap = int(self.max_batch_latency / self.latency * max(self.workers, 1))
+                self.prefetch = max(min(self.prefetch, cap), self.min_prefetch)
+            return self.prefetch, self.workers
+
+
+class FixedPrefetch:
+    """
+    Constant prefetch and number of callback threads, the sizing of `start_consuming(workers=...)`.
+    """
+
+    interval = None
+
+    def __init__(self, prefetch: int = 1, workers: int = 0):
+        self.prefetch = prefetch
+        self.workers = workers
+
+    def record_latency(self, elapsed: float):
+        pass
+
+    def record_batch(self, fetched: int, requested: int):
+        pass
+
+    def update(self, lag: Optional[int] = None):
+        return self.prefetch, self.workers
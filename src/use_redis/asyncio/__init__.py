@@ -0,0 +1,13 @@
+from .hash import RedisHashStore as useRedisHashAsync
+from .list import RedisListStore as useRedisListAsync
+from .set import RedisSetStore as useRedisSetAsync
+from .store import RedisStore as useRedisAsync
+from .stream import RedisStreamStore as useRedisStreamAsync
+
+__all__ = [
+    "useRedisAsync",
+    "useRedisStreamAsync",
+    "useRedisSetAsync",
+    "useRedisListAsync",
+    "useRedisHashAsync",
+]
@@ -0,0 +1,86 @@
+from .store import RedisStore
+
+
+class RedisHashStore(RedisStore):
+    def __init__(self, key, **kwargs):
+        super().__init__(**kwargs)
+        self._key = key
+
+    @property
+    def key(self):
+        return self._key
+
+    async def set(self, field, value):
+        """设置哈希表中指定字段的值"""
+        connection = await self.get_connection()
+        return await connection.hset(self.key, field, value)
+
+    async def set_multiple(self, mapping):
+        """同时将多个 field-value 对设置到哈希表中"""
+        connection = await self.get_connection()
+        return await connection.hset(self.key, mapping=mapping)
+
+    async def get(self, *fields):
+        """获取哈希表中指定字段的值"""
+        connection = await self.get_connection()
+        if len(fields) == 1:
+            return await connection.hget(self.key, fields[0])
+        return await connection.hmget(self.key, fields)
+
+    async def delete(self, *fields):
+        """删除哈希表中的一个或多个字段"""
+        connection = await self.get_connection()
+        return await connection.hdel(self.key, *fields)
+
+    async def exists(self, field):
+        """检查哈希表中是否存在指定的字段"""
+        connection = await self.get_connection()
+        return await connection.hexists(self.key, field)
+
+    async def length(self):
+        """获取哈希表中字段的数量"""
+        connection = await self.get_connection()
+        return await connection.hlen(self.key)
+
+    async def keys(self):
+        """获取哈希表中的所有字段"""
+        connection = await self.get_connection()
+        return await connection.hkeys(self.key)
+
+    async def values(self):
+        """获取哈希表中所有字段的值"""
+        connection = await self.get_connection()
+        return await connection.hvals(self.key)
+
+    async def items(self):
+        """获取哈希表中所有的字段和值"""
+        connection = await self.get_connection()
+        return await connection.hgetall(self.key)
+
+    async def increment(self, field, amount=1):
+        """
+        将哈希表中指定字段的值增加给定的增量
+
+        :param field: 要增加的字段
+        :param amount: 增加的数量，可以是整数或浮点数
+        :return: 增加后的值
+        """
+        connection = await self.get_connection()
+        if isinstance(amount, int):
+            return await connection.hincrby(self.key, field, amount)
+        return await connection.hincrbyfloat(self.key, field, amount)
+
+    async def scan(self, cursor=0, match=None, count=None):
+        """迭代哈希表中的键值对"""
+        connection = await self.get_connection()
+        return await connection.hscan(self.key, cursor, match, count)
+
+    def __getattr__(self, name):
+        """动态处理未实现的方法"""
+
+        async def method(*args, **kwargs):
+            connection = await self.get_connection()
+            redis_method = getattr(connection, name)
+            return await redis_method(self.key, *args, **kwargs)
+
+        return method
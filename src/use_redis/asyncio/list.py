@@ -0,0 +1,81 @@
+from .store import RedisStore
+
+
+class RedisListStore(RedisStore):
+    def __init__(self, key, **kwargs):
+        super().__init__(**kwargs)
+        self._key = key
+
+    @property
+    def key(self):
+        return self._key
+
+    async def lpush(self, *values):
+        """将一个或多个值插入到列表头部"""
+        connection = await self.get_connection()
+        return await connection.lpush(self.key, *values)
+
+    async def rpush(self, *values):
+        """将一个或多个值插入到列表尾部"""
+        connection = await self.get_connection()
+        return await connection.rpush(self.key, *values)
+
+    async def lpop(self):
+        """移除并返回列表的第一个元素"""
+        connection = await self.get_connection()
+        return await connection.lpop(self.key)
+
+    async def rpop(self):
+        """移除并返回列表的最后一个元素"""
+        connection = await self.get_connection()
+        return await connection.rpop(self.key)
+
+    async def length(self):
+        """返回列表的长度"""
+        connection = await self.get_connection()
+        return await connection.llen(self.key)
+
+    async def range(self, start, end):
+        """获取列表指定范围内的元素"""
+        connection = await self.get_connection()
+        return await connection.lrange(self.key, start, end)
+
+    async def set(self, index, value):
+        """通过索引设置列表元素的值"""
+        connection = await self.get_connection()
+        return await connection.lset(self.key, index, value)
+
+    async def index(self, index):
+        """通过索引获取列表中的元素"""
+        connection = await self.get_connection()
+        return await connection.lindex(self.key, index)
+
+    async def trim(self, start, end):
+        """修剪列表，只保留指定区间内的元素"""
+        connection = await self.get_connection()
+        return await connection.ltrim(self.key, start, end)
+
+    async def remove(self, value, count=0):
+        """移除列表中与value相等的元素"""
+        connection = await self.get_connection()
+        return await connection.lrem(self.key, count, value)
+
+    async def insert_before(self, pivot, value):
+        """在列表的元素前插入元素"""
+        connection = await self.get_connection()
+        return await connection.linsert(self.key, "BEFORE", pivot, value)
+
+    async def insert_after(self, pivot, value):
+        """在列表的元素后插入元素"""
+        connection = await self.get_connection()
+        return await connection.linsert(self.key, "AFTER", pivot, value)
+
+    def __getattr__(self, name):
+        """动态处理未实现的方法"""
+
+        async def method(*args, **kwargs):
+            connection = await self.get_connection()
+            redis_method = getattr(connection, name)
+            return await redis_method(self.key, *args, **kwargs)
+
+        return method
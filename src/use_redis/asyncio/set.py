@@ -0,0 +1,89 @@
+from .store import RedisStore
+
+
+class RedisSetStore(RedisStore):
+    def __init__(self, key, **kwargs):
+        super().__init__(**kwargs)
+        self._key = key
+
+    @property
+    def key(self):
+        return self._key
+
+    async def add(self, *values):
+        """向集合中添加一个或多个成员"""
+        connection = await self.get_connection()
+        return await connection.sadd(self.key, *values)
+
+    async def remove(self, *values):
+        """从集合中移除一个或多个成员"""
+        connection = await self.get_connection()
+        return await connection.srem(self.key, *values)
+
+    async def members(self):
+        """返回集合中的所有成员"""
+        connection = await self.get_connection()
+        return await connection.smembers(self.key)
+
+    async def is_member(self, value):
+        """判断value是否是集合的成员"""
+        connection = await self.get_connection()
+        return await connection.sismember(self.key, value)
+
+    async def are_members(self, *values):
+        """判断多个value是否是集合的成员，按顺序返回 bool 列表"""
+        if not values:
+            return []
+        connection = await self.get_connection()
+        results = await connection.smismember(self.key, values)
+        return [bool(result) for result in results]
+
+    async def size(self):
+        """返回集合的成员数"""
+        connection = await self.get_connection()
+        return await connection.scard(self.key)
+
+    async def pop(self):
+        """随机移除并返回集合中的一个成员"""
+        connection = await self.get_connection()
+        return await connection.spop(self.key)
+
+    async def move(self, dst_key, value):
+        """将成员从当前集合移动到另一个集合"""
+        connection = await self.get_connection()
+        return await connection.smove(self.key, dst_key, value)
+
+    async def intersection(self, *other_keys):
+        """返回当前集合与其他集合的交集"""
+        connection = await self.get_connection()
+        return await connection.sinter(self.key, *other_keys)
+
+    async def union(self, *other_keys):
+        """返回当前集合与其他集合的并集"""
+        connection = await self.get_connection()
+        return await connection.sunion(self.key, *other_keys)
+
+    async def difference(self, *other_keys):
+        """返回当前集合与其他集合的差集"""
+        connection = await self.get_connection()
+        return await connection.sdiff(self.key, *other_keys)
+
+    async def random_member(self):
+        """随机返回集合中的一个成员，但不删除"""
+        connection = await self.get_connection()
+        return await connection.srandmember(self.key)
+
+    async def scan(self, cursor=0, match=None, count=None):
+        """迭代集合中的元素"""
+        connection = await self.get_connection()
+        return await connection.sscan(self.key, cursor, match, count)
+
+    def __getattr__(self, name):
+        """动态处理未实现的方法"""
+
+        async def method(*args, **kwargs):
+            connection = await self.get_connection()
+            redis_method = getattr(connection, name)
+            return await redis_method(self.key, *args, **kwargs)
+
+        return method
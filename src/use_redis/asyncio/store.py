@@ -0,0 +1,117 @@
+import asyncio
+import logging
+
+import redis
+import redis.asyncio
+import redis.asyncio.cluster
+
+from ..store import RedisStore as _RedisStore
+
+logger = logging.getLogger(__name__)
+
+
+class RedisStore:
+    MAX_SEND_ATTEMPTS = _RedisStore.MAX_SEND_ATTEMPTS
+    MAX_CONNECTION_ATTEMPTS = _RedisStore.MAX_CONNECTION_ATTEMPTS
+    MAX_CONNECTION_DELAY = _RedisStore.MAX_CONNECTION_DELAY
+    RECONNECTION_DELAY = _RedisStore.RECONNECTION_DELAY
+
+    def __init__(self, *, host=None, port=None, password=None, cluster=False, **kwargs):
+        """
+        An asyncio Redis store backed by ``redis.asyncio``.
+
+        :param host: Redis host
+        :param port: Redis port
+        :param password: Redis password
+        :param cluster: Connect to a Redis Cluster with ``redis.asyncio.cluster.RedisCluster``
+        :param kwargs: Redis parameters
+        """
+        self._shutdown = False
+        self.parameters = {
+            "host": host or "localhost",
+            "port": port or 6379,
+            "password": password or None,
+            "decode_responses": True,
+        }
+        if kwargs:
+            self.parameters.update(kwargs)
+        self.cluster = cluster
+        self._connection = None
+        self._connection_lock = None
+
+    async def _create_connection(self):
+        attempts = 1
+        reconnection_delay = self.RECONNECTION_DELAY
+        while attempts <= self.MAX_CONNECTION_ATTEMPTS:
+            if self.cluster:
+                connector = redis.asyncio.cluster.RedisCluster(**self.parameters)
+            else:
+                connector = redis.asyncio.Redis(**self.parameters)
+            try:
+                if self.cluster:
+                    # 集群客户端在 initialize 时连接启动节点并加载槽位表
+                    await connector.initialize()
+                await connector.ping()
+                if attempts > 1:
+                    logger.warning(
+                        f"RedisStore connection succeeded after {attempts} attempts",
+                    )
+                return connector
+            except (
+                redis.ConnectionError,
+                redis.exceptions.RedisClusterException,
+            ) as exc:
+                await self._close(connector)
+                logger.warning(
+                    f"RedisStore connection error<{exc}>; retrying in {reconnection_delay} seconds"
+                )
+                attempts += 1
+                await asyncio.sleep(reconnection_delay)
+                reconnection_delay = min(
+                    reconnection_delay * 2, self.MAX_CONNECTION_DELAY
+                )
+        raise redis.ConnectionError("RedisStore connection error, max attempts reached")
+
+    @staticmethod
+    async def _close(connector):
+        # redis>=5.0.1 renamed close() to aclose()
+        close = getattr(connector, "aclose", None) or connector.close
+        await close()
+
+    async def get_connection(self):
+        """
+        Return the client, connecting (with backoff) on first use.
+        """
+        if self._connection is None:
+            if self._connection_lock is None:
+                self._connection_lock = asyncio.Lock()
+            async with self._connection_lock:
+                if self._connection is None:
+                    self._connection = await self._create_connection()
+        return self._connection
+
+    @property
+    def connection(self):
+        """
+        The connected client, ``None`` until ``get_connection`` has been awaited.
+        """
+        return self._connection
+
+    async def close(self):
+        if self._connection:
+            try:
+                await self._close(self._connection)
+            except Exception as exc:
+                logger.exception(f"RedisStore connection close error<{exc}>")
+            self._connection = None
+
+    async def shutdown(self):
+        self._shutdown = True
+        await self.close()
+
+    async def __aenter__(self):
+        await self.get_connection()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.shutdown()
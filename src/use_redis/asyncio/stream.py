@@ -0,0 +1,263 @@
+import asyncio
+import inspect
+import logging
+import time
+from typing import Callable, List, Optional, Union
+
+import redis
+
+from ..codec import Codec, get_codec
+from ..stream import RedisStreamMessage, _split_dead_letters
+from .store import RedisStore
+
+logger = logging.getLogger(__name__)
+
+
+class RedisStreamStore(RedisStore):
+    def __init__(
+        self,
+        *,
+        stream: str,
+        group: str,
+        stream_max_entries: int = 0,
+        redeliver_timeout: int = 60000,
+        claim_interval: int = 1800000,
+        codec: Union[str, Codec, None] = None,
+        max_deliveries: int = 0,
+        dead_letter_stream: Optional[str] = None,
+        **kwargs,
+    ):
+        """
+
+        An asyncio Redis stream store.
+
+        :param stream: The name of the stream.
+        :param group: The name of the group.
+        :param stream_max_entries: any value higher than 0 defines an approximate maximum number of stream entries
+        :param redeliver_timeout: Timeout before redeliver messages still in pending state (seconds)
+        :param claim_interval: Interval by which pending/abandoned messages should be checked
+        :param codec: Body codec, see `use_redis.useRedisStream`
+        :param max_deliveries: any value higher than 0 moves claimed messages delivered more often than this
+            to `dead_letter_stream` instead of handing them to the consumer again
+        :param dead_letter_stream: Defaults to "{stream}:dead", see `use_redis.useRedisStream`
+
+        """
+        self.codec = get_codec(codec)
+        if self.codec is not None and self.codec.binary:
+            kwargs["decode_responses"] = False
+        super().__init__(**kwargs)
+        self.stream = stream
+        self.group = group
+        self.max_entries = stream_max_entries if stream_max_entries > 0 else None
+        self.redeliver_timeout = redeliver_timeout
+        self.claim_interval = claim_interval
+        self.max_deliveries = max_deliveries
+        self.dead_letter_stream = dead_letter_stream or f"{stream}:dead"
+
+        self._auto_setup = True
+        # 协程之间共享同一个线程，因此按消费者名记录下一次 claim 的时间和 PEL 扫描游标
+        self._next_claim = {}
+        self._claim_cursors = {}
+
+    async def _setup(self):
+        connection = await self.get_connection()
+        try:
+            await connection.xgroup_create(
+                self.stream, self.group, id="0", mkstream=True
+            )
+        except redis.exceptions.ResponseError as e:
+            if "already exists" not in str(e):
+                raise e
+
+        self._auto_setup = False
+
+    async def send(self, message: dict):
+        """
+        Send a message to the Redis stream.
+        """
+        if self._auto_setup:
+            await self._setup()
+        if self.codec is not None:
+            message = self.codec.encode_fields(message)
+        connection = await self.get_connection()
+        return await connection.xadd(self.stream, message, maxlen=self.max_entries)
+
+    async def claim_old_pending_messages(
+        self, consumer: str, count: int, min_idle_time: int
+    ) -> Optional[List[RedisStreamMessage]]:
+        """
+        Claim messages from the Redis stream.
+        """
+        connection = await self.get_connection()
+        # 从上次返回的游标继续扫描，避免每次都从 PEL 头部重新扫描
+        next_id, messages, *_ = await connection.xautoclaim(
+            name=self.stream,
+            groupname=self.group,
+            consumername=consumer,
+            min_idle_time=min_idle_time,
+            start_id=self._claim_cursors.get(consumer, "0-0"),
+            count=count,
+        )
+        logger.debug(f"xautoclaim: {messages=}")
+
+        if isinstance(next_id, bytes):
+            next_id = next_id.decode()
+        self._claim_cursors[consumer] = next_id
+        if next_id == "0-0":
+            # 已扫描完整个 PEL，等待 claim_interval 后从头开始；否则下次 consume 继续扫描
+            self._next_claim[consumer] = time.time() * 1000 + self.claim_interval
+
+        if messages and self.max_deliveries > 0:
+            messages = await self._dead_letter(consumer, messages)
+        if messages:
+            return RedisStreamMessage.from_xclaim(
+                raw_messages=messages,
+                stream=self.stream,
+                group=self.group,
+                codec=self.codec,
+            )
+
+    async def _dead_letter(self, consumer: str, messages: list) -> list:
+        """
+        Move claimed messages delivered more than `max_deliveries` times to the dead-letter stream.
+
+        :return: The messages still to be handed to the consumer
+        """
+        connection = await self.get_connection()
+        pending = await connection.xpending_range(
+            self.stream,
+            self.group,
+            messages[0][0],
+            messages[-1][0],
+            len(messages),
+            consumer,
+        )
+        alive, dead = _split_dead_letters(
+            self.stream, messages, pending, self.max_deliveries
+        )
+        if not dead:
+            return alive
+
+        pipeline = connection.pipeline(transaction=not self.cluster)
+        for id, fields in dead:
+            # 死信流不按 stream_max_entries 截断，以免丢失待排查的消息
+            pipeline.xadd(self.dead_letter_stream, fields)
+        ids = [id for id, _ in dead]
+        pipeline.xack(self.stream, self.group, *ids)
+        await pipeline.execute()
+        logger.warning(
+            f"moved {len(ids)} messages of {self.stream} to {self.dead_letter_stream}"
+        )
+        return alive
+
+    async def get(
+        self, consumer: str, count: int = 1, block: Union[int, None] = None
+    ) -> Optional[List[RedisStreamMessage]]:
+        """
+        Read new messages from the Redis stream without claim.
+        """
+        if self._auto_setup:
+            await self._setup()
+
+        connection = await self.get_connection()
+        raw_messages = await connection.xreadgroup(
+            groupname=self.group,
+            consumername=consumer,
+            streams={self.stream: ">"},
+            count=count,
+            block=block,
+        )
+        logger.debug(f"xreadgroup: {raw_messages=}")
+        if raw_messages:
+            return RedisStreamMessage.from_xread(
+                raw_messages=raw_messages, group=self.group, codec=self.codec
+            )
+
+    async def consume(
+        self,
+        consumer: str,
+        prefetch: int = 1,
+        timeout: Union[int, None] = None,
+        force_claim: bool = False,
+        redeliver_timeout: Union[int, None] = None,
+    ) -> Optional[List[RedisStreamMessage]]:
+        """
+        Consume messages from the Redis stream(order: xclaim -> xreadgroup).
+
+        :param consumer: The name of the consumer
+        :param prefetch: Number of prefetches
+        :param timeout: Blocking time of the Xread. Unit is millisecond, 0 is infinite blocking
+        :param force_claim: Whether to force claim, True= to perform claim, False = execute claim periodically
+        :param redeliver_timeout: Timeout before redeliver messages still in pending state (seconds)
+        :return: List of messages consumed. If consumption fails, return []
+        """
+        connection = await self.get_connection()
+        pending_messages = await connection.xpending_range(
+            self.stream, self.group, "-", "+", prefetch, consumer, 0
+        )
+        need_count = prefetch - len(pending_messages) if pending_messages else prefetch
+        if need_count <= 0:
+            await asyncio.sleep(1)
+            return []
+
+        result = []
+        if force_claim or self._next_claim.get(consumer, 0) <= time.time() * 1000:
+            pending_messages = await self.claim_old_pending_messages(
+                consumer=consumer,
+                count=need_count,
+                min_idle_time=redeliver_timeout or self.redeliver_timeout,
+            )
+            if pending_messages:
+                result.extend(pending_messages)
+                need_count = need_count - len(result)
+
+        if need_count > 0:
+            messages = await self.get(consumer, need_count, timeout)
+            if messages:
+                result.extend(messages)
+
+        return result
+
+    async def start_consuming(
+        self,
+        consumer: str,
+        callback: Callable,
+        prefetch: int = 1,
+        timeout: int = 1000,
+        **kwargs,
+    ):
+        """
+        Start consuming messages from the Redis stream.
+
+        :param consumer: The name of the consumer，please use a unique value
+        :param callback: Callback function, either a plain function or a coroutine function
+        :param prefetch: Number of prefetches
+        :param timeout: Blocking time of the Xread. Unit is millisecond, 0 is infinite blocking
+        """
+
+        while not self._shutdown:
+            try:
+                messages = await self.consume(
+                    consumer, prefetch, timeout=timeout, **kwargs
+                )
+                for message in messages:
+                    result = callback(message)
+                    if inspect.isawaitable(result):
+                        await result
+            except redis.RedisError as e:
+                logger.error(f"Error consuming messages: {e}")
+                await asyncio.sleep(self.RECONNECTION_DELAY)
+
+    async def ack(self, message: RedisStreamMessage):
+        """
+        Acknowledge a message.
+        """
+        connection = await self.get_connection()
+        await connection.xack(self.stream, self.group, message.id)
+
+    async def reject(self, message: RedisStreamMessage):
+        """
+        Reject a message.
+        """
+        connection = await self.get_connection()
+        await connection.xack(self.stream, self.group, message.id)
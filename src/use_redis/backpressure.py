@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackpressureError(Exception):
+    """
+    Raised by `send` when the stream backlog is above the high-water mark and the producer may not wait.
+    """
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket: `rate` tokens per second, bursts of up to `burst` tokens.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst or rate
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, count: int = 1):
+        """
+        Take `count` tokens, sleeping until the bucket has refilled enough.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            # 允许透支：本次先扣除，再按欠下的令牌数等待
+            self._tokens -= count
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+class Backpressure:
+    """
+    Throttles producers of a stream whose backlog passes a high-water mark, until it drains below the low-water mark.
+
+    The backlog is the larger of the undelivered (lag) plus unacknowledged (pending) entries over all groups,
+    or XLEN on servers that do not report the lag. It is sampled with one pipelined XLEN + XINFO GROUPS every
+    `sample_interval` milliseconds; in between, entries sent by this process are added to the last sample.
+    """
+
+    POLICIES = ("block", "slow", "reject")
+
+    def __init__(
+        self,
+        high_water: int,
+        low_water: Optional[int] = None,
+        policy: str = "block",
+        max_wait: Optional[float] = None,
+        max_delay: float = 0.1,
+        sample_interval: int = 1000,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+    ):
+        """
+        :param high_water: Backlog at which producers are throttled
+        :param low_water: Backlog below which producers are released, defaults to 80% of `high_water`
+        :param policy: "block" waits for the backlog to drain, "reject" raises `BackpressureError` at once,
+            "slow" also delays sends by up to `max_delay` while the backlog is between the two marks, then blocks
+        :param max_wait: Longest time a blocked send waits before raising `BackpressureError` (seconds), None waits forever
+        :param max_delay: Delay of a send just below the high-water mark with the "slow" policy (seconds)
+        :param sample_interval: Interval between two backlog samples (milliseconds)
+        :param rate: Optional local rate limit (messages per second)
+        :param burst: Burst size of the rate limit, defaults to `rate`
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"unknown backpressure policy: {policy}")
+        self.high_water = high_water
+        self.low_water = int(high_water * 0.8) if low_water is None else low_water
+        if not 0 <= self.low_water < self.high_water:
+            raise ValueError("expected 0 <= low_water < high_water")
+        self.policy = policy
+        self.max_wait = max_wait
+        self.max_delay = max_delay
+        self.sample_interval = sample_interval
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.throttled = False
+        self._lock = threading.Lock()
+        self._sampled = 0
+        self._sent = 0
+        self._next_sample = 0
+
+    def sample(self, store) -> int:
+        """
+        Read the backlog of `store.stream` from Redis.
+        """
+        pipeline = store.connection.pipeline(transaction=False)
+        pipeline.xlen(store.stream)
+        pipeline.xinfo_groups(store.stream)
+        length, groups = pipeline.execute()
+        backlog = 0
+        for info in groups:
+            if info.get("lag") is None:
+                # lag 字段自 Redis 7.0 起提供，无法计算时退回到 stream 长度
+                return length
+            backlog = max(backlog, info["lag"] + info.get("pending", 0))
+        return backlog if groups else length
+
+    def backlog(self, store, force: bool = False) -> int:
+        """
+        The last sampled backlog plus entries sent since, resampled every `sample_interval`.
+        """
+        now = time.monotonic() * 1000
+        if force or now >= self._next_sample:
+            sampled = self.sample(store)
+            with self._lock:
+                self._sampled, self._sent = sampled, 0
+                self._next_sample = now + self.sample_interval
+        with self._lock:
+            return self._sampled + self._sent
+
+    def acquire(self, store, count: int = 1):
+        """
+        Wait, delay or raise until `count` entries may be sent to `store.stream`.
+        """
+        if self.bucket is not None:
+            self.bucket.take(count)
+        deadline = None if self.max_wait is None else time.monotonic() + self.max_wait
+        force = False
+        while True:
+            backlog = self.backlog(store, force)
+            with self._lock:
+                if not self.throttled and backlog >= self.high_water:
+                    self.throttled = True
+                    logger.warning(
+                        f"{store.stream} backlog {backlog} reached the high-water mark, throttling producers"
+                    )
+                elif self.throttled and backlog <= self.low_water:
+                    self.throttled = False
+                if not self.throttled:
+                    self._sent += count
+                    break
+            if self.policy == "reject":
+                raise BackpressureError(
+                    f"{store.stream} backlog {backlog} is too large"
+                )
+            if deadline is not None and time.monotonic() >= deadline:
+                raise BackpressureError(
+                    f"{store.stream} backlog {backlog} did not drain within {self.max_wait} seconds"
+                )
+            wait = self.sample_interval / 1000
+            if deadline is not None:
+                wait = min(wait, max(deadline - time.monotonic(), 0))
+            time.sleep(wait)
+            force = True
+
+        if self.policy == "slow" and backlog > self.low_water:
+            overshoot = (backlog - self.low_water) / (self.high_water - self.low_water)
+            time.sleep(self.max_delay * min(overshoot, 1))
@@ -0,0 +1,216 @@
+import collections
+import logging
+import threading
+import time
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = "__redis__:invalidate"
+
+
+class LocalCache:
+    """
+    A thread-safe LRU cache with an optional TTL and hit/miss/eviction counters.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl=None):
+        """
+        :param max_size: Maximum number of entries
+        :param ttl: Seconds an entry stays valid, None keeps it until evicted or invalidated
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generation = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, key):
+        """
+        Return `(True, value)` on a hit and `(False, None)` on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return True, value
+                del self._entries[key]
+                self._evictions += 1
+            self._misses += 1
+            return False, None
+
+    def set(self, key, value, generation):
+        """
+        Cache `value` unless the cache was invalidated since `generation` was read.
+        """
+        with self._lock:
+            # 读取期间收到过失效通知，结果可能已过期，不写入缓存
+            if generation != self.generation:
+                return
+            expires_at = time.monotonic() + self.ttl if self.ttl else None
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self._invalidations += 1
+            self._entries.clear()
+
+    def info(self):
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+
+class InvalidationListener:
+    """
+    Listen for server-assisted invalidations of one key on a dedicated connection.
+
+    The connection enables ``CLIENT TRACKING ... BCAST PREFIX <key>`` redirected to itself and subscribes to
+    ``__redis__:invalidate``, so every write to the key is reported regardless of which client made it.
+    """
+
+    RECONNECTION_DELAY = 1
+    MAX_CONNECTION_DELAY = 2**5
+
+    def __init__(self, connection_pool, key, on_invalidate):
+        """
+        :param connection_pool: Pool whose connection settings are used for the dedicated connection
+        :param key: The tracked key
+        :param on_invalidate: Called without arguments whenever the key may have changed
+        """
+        self.connection_pool = connection_pool
+        self.key = key
+        self.on_invalidate = on_invalidate
+        self.ready = threading.Event()
+        self._shutdown = False
+        self._connection = None
+        self._thread = None
+
+    @classmethod
+    def for_store(cls, store, on_invalidate):
+        """
+        Start a listener for `store.key`, connected in cluster mode to the node holding the key.
+        """
+        if store.cluster:
+            # 失效通知只由持有该键的节点发出
+            node = store.connection.get_node_from_key(store.key)
+            pool = node.redis_connection.connection_pool
+        else:
+            pool = store.connection.connection_pool
+        listener = cls(pool, store.key, on_invalidate)
+        listener.start()
+        return listener
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._listen_forever,
+                name=f"use-redis-invalidate-{self.key}",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _connect(self):
+        pool = self.connection_pool
+        # 不占用连接池名额，订阅连接由监听器独占
+        connection = pool.connection_class(**pool.connection_kwargs)
+        connection.send_command("CLIENT", "ID")
+        client_id = connection.read_response()
+        connection.send_command(
+            "CLIENT",
+            "TRACKING",
+            "ON",
+            "REDIRECT",
+            client_id,
+            "BCAST",
+            "PREFIX",
+            self.key,
+        )
+        connection.read_response()
+        connection.send_command("SUBSCRIBE", INVALIDATE_CHANNEL)
+        connection.read_response()
+        return connection
+
+    def _listen_forever(self):
+        reconnection_delay = self.RECONNECTION_DELAY
+        while not self._shutdown:
+            try:
+                self._connection = self._connect()
+                # 重新订阅前的失效通知可能已丢失，清空缓存后才允许使用
+                self.on_invalidate()
+                self.ready.set()
+                reconnection_delay = self.RECONNECTION_DELAY
+                while not self._shutdown:
+                    if self._connection.can_read(timeout=1):
+                        self._handle(self._connection.read_response())
+            except redis.ResponseError as exc:
+                # 服务端不支持 CLIENT TRACKING（Redis < 6），缓存保持关闭
+                logger.error(
+                    f"InvalidationListener tracking error<{exc}>; cache disabled"
+                )
+                break
+            except (redis.ConnectionError, redis.TimeoutError, OSError) as exc:
+                if self._shutdown:
+                    break
+                self.ready.clear()
+                self.on_invalidate()
+                logger.warning(
+                    f"InvalidationListener connection error<{exc}>; retrying in {reconnection_delay} seconds"
+                )
+                time.sleep(reconnection_delay)
+                reconnection_delay = min(
+                    reconnection_delay * 2, self.MAX_CONNECTION_DELAY
+                )
+            finally:
+                self._disconnect()
+
+    def _handle(self, response):
+        # ['message', '__redis__:invalidate', [key, ...]]，keys 为 None 表示 FLUSHALL/FLUSHDB
+        if not response or len(response) != 3:
+            return
+        kind, _, keys = response
+        if isinstance(kind, bytes):
+            kind = kind.decode()
+        if kind != "message":
+            return
+        if keys is None:
+            self.on_invalidate()
+            return
+        for key in keys:
+            if isinstance(key, bytes):
+                key = key.decode()
+            if key == self.key:
+                self.on_invalidate()
+                return
+
+    def _disconnect(self):
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            try:
+                connection.disconnect()
+            except Exception as exc:
+                logger.exception(f"InvalidationListener close error<{exc}>")
+
+    def stop(self):
+        self._shutdown = True
+        self.ready.clear()
+        self._disconnect()
@@ -0,0 +1,34 @@
+import collections
+from typing import Dict, Iterable, List, Union
+
+from redis.crc import key_slot as _key_slot
+
+
+def hash_tag(tag: str, *parts: str) -> str:
+    """
+    Build a key that Redis Cluster stores on the slot of `tag`, e.g. hash_tag("orders", "stream") -> "{orders}:stream".
+
+    Keys built with the same tag always share a slot, so multi-key commands and pipelines on them stay on one node.
+    """
+    if "{" in tag or "}" in tag:
+        raise ValueError(f"hash tag must not contain braces: {tag}")
+    return ":".join((f"{{{tag}}}",) + parts)
+
+
+def key_slot(key: Union[str, bytes]) -> int:
+    """
+    The cluster hash slot of `key`, honouring hash tags.
+    """
+    if isinstance(key, str):
+        key = key.encode()
+    return _key_slot(key)
+
+
+def group_by_slot(keys: Iterable[Union[str, bytes]]) -> Dict[int, List]:
+    """
+    Group keys by hash slot, keeping their order within each slot.
+    """
+    groups = collections.defaultdict(list)
+    for key in keys:
+        groups[key_slot(key)].append(key)
+    return dict(groups)
@@ -0,0 +1,145 @@
+import json
+
+
+class Codec:
+    """
+    Encodes a message body into a single stream field and decodes it back.
+
+    A codec whose payload is not UTF-8 text sets `binary`, which switches the store to a bytes-mode connection.
+    """
+
+    name = None
+    binary = False
+    field = "d"
+
+    def encode(self, body):
+        raise NotImplementedError
+
+    def decode(self, payload):
+        raise NotImplementedError
+
+    def encode_fields(self, body) -> dict:
+        return {self.field: self.encode(body)}
+
+    def decode_fields(self, fields):
+        """
+        Decode the body from the raw stream fields; entries not written by a codec are returned unchanged.
+        """
+        payload = fields.get(self.field)
+        if payload is None:
+            payload = fields.get(self.field.encode())
+            if payload is None:
+                return fields
+        return self.decode(payload)
+
+
+class JsonCodec(Codec):
+    name = "json"
+
+    def encode(self, body):
+        return json.dumps(body, separators=(",", ":"))
+
+    def decode(self, payload):
+        return json.loads(payload)
+
+
+class OrjsonCodec(Codec):
+    name = "orjson"
+
+    def __init__(self):
+        try:
+            import orjson
+        except ImportError as exc:
+            raise ImportError(
+                "orjson codec requires orjson, install use-redis[orjson]"
+            ) from exc
+        self._orjson = orjson
+
+    def encode(self, body):
+        return self._orjson.dumps(body)
+
+    def decode(self, payload):
+        return self._orjson.loads(payload)
+
+
+class MsgpackCodec(Codec):
+    name = "msgpack"
+    binary = True
+
+    def __init__(self):
+        try:
+            import msgpack
+        except ImportError as exc:
+            raise ImportError(
+                "msgpack codec requires msgpack, install use-redis[msgpack]"
+            ) from exc
+        self._msgpack = msgpack
+
+    def encode(self, body):
+        return self._msgpack.packb(body)
+
+    def decode(self, payload):
+        return self._msgpack.unpackb(payload)
+
+
+class CompressedCodec(Codec):
+    """
+    Compress the payload of another codec with zstd or lz4.
+    """
+
+    binary = True
+
+    def __init__(self, codec: Codec, compression: str = "zstd"):
+        self.codec = codec
+        self.name = f"{codec.name}+{compression}"
+        if compression == "zstd":
+            try:
+                import zstandard
+            except ImportError as exc:
+                raise ImportError(
+                    "zstd compression requires zstandard, install use-redis[zstd]"
+                ) from exc
+            self._compress = zstandard.ZstdCompressor().compress
+            self._decompress = zstandard.ZstdDecompressor().decompress
+        elif compression == "lz4":
+            try:
+                import lz4.frame
+            except ImportError as exc:
+                raise ImportError(
+                    "lz4 compression requires lz4, install use-redis[lz4]"
+                ) from exc
+            self._compress = lz4.frame.compress
+            self._decompress = lz4.frame.decompress
+        else:
+            raise ValueError(f"unknown compression: {compression}")
+
+    def encode(self, body):
+        payload = self.codec.encode(body)
+        if isinstance(payload, str):
+            payload = payload.encode()
+        return self._compress(payload)
+
+    def decode(self, payload):
+        return self.codec.decode(self._decompress(payload))
+
+
+CODECS = {
+    "json": JsonCodec,
+    "orjson": OrjsonCodec,
+    "msgpack": MsgpackCodec,
+}
+
+
+def get_codec(codec):
+    """
+    Return a codec instance from a name such as "json", "msgpack" or "msgpack+zstd".
+    """
+    if codec is None or isinstance(codec, Codec):
+        return codec
+    name, _, compression = codec.partition("+")
+    if name not in CODECS:
+        raise ValueError(f"unknown codec: {codec}")
+    result = CODECS[name]()
+    if compression:
+        result = CompressedCodec(result, compression)
+    return result
@@ -1,36 +1,229 @@
+import contextlib
+import logging
+import threading
+
+import redis
+
+from .cache import InvalidationListener, LocalCache
+from .iterators import paginate
 from .store import RedisStore
 
+logger = logging.getLogger(__name__)
+
+
+def _get_connection(pool):
+    try:
+        return pool.get_connection()
+    except TypeError:
+        # redis-py < 5.3 要求传入命令名
+        return pool.get_connection("MULTI")
+
 
 class RedisHashStore(RedisStore):
-    def __init__(self, key, **kwargs):
+    def __init__(
+        self,
+        key,
+        cache_size=0,
+        cache_ttl=None,
+        write_behind=False,
+        flush_interval=1,
+        flush_size=1000,
+        **kwargs,
+    ):
+        """
+        :param key: 哈希表的键
+        :param cache_size: 大于 0 时开启本地缓存，get/items/exists 优先读取内存，
+            由 Redis CLIENT TRACKING 推送的失效通知保持一致
+        :param cache_ttl: 缓存条目的最长存活时间（秒），None 表示只依赖失效通知和 LRU 淘汰
+        :param write_behind: 开启后 set/set_multiple/increment 先写入内存缓冲区，同一字段的多次增量合并为一次，
+            由 flush 通过一个事务管道写入 Redis；此时这些方法返回 None。
+            连接在发送后中断时无法确认是否已写入，这批写入被丢弃而不是重试，即缓冲的增量至多写入一次
+        :param flush_interval: 缓冲写入的最长滞留时间（秒）
+        :param flush_size: 缓冲的字段数达到该值时立即写入
+        """
         super().__init__(**kwargs)
         self._key = key
+        self._cache = LocalCache(cache_size, cache_ttl) if cache_size > 0 else None
+        self._listener = None
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._pending_sets = {}
+        self._pending_increments = {}
+        self._write_lock = threading.Lock()
+        self._flush_timer = None
 
     @property
     def key(self):
         return self._key
 
+    def _cached(self, cache_key, fetch):
+        """命中本地缓存时直接返回，否则读取 Redis 并写入缓存"""
+        if self._cache is None:
+            return fetch()
+        if self._listener is None:
+            self._listener = InvalidationListener.for_store(
+                self, self._cache.invalidate
+            )
+        if not self._listener.ready.is_set():
+            # 失效通知通道未就绪时缓存可能不一致，直接读 Redis
+            return fetch()
+        hit, value = self._cache.get(cache_key)
+        if hit:
+            return value
+        generation = self._cache.generation
+        value = fetch()
+        self._cache.set(cache_key, value, generation)
+        return value
+
+    def _invalidate(self):
+        if self._cache is not None:
+            self._cache.invalidate()
+
+    @contextlib.contextmanager
+    def _invalidating(self):
+        """写入前后各清空一次本地缓存：写入期间并发读取的旧值可能在写入前后被放入缓存"""
+        self._invalidate()
+        try:
+            yield
+        finally:
+            self._invalidate()
+
+    def _buffer_write(self, sets=None, field=None, amount=0):
+        if sets is not None and not sets:
+            return None
+        with self._write_lock:
+            if sets is not None:
+                # 覆盖写之前缓冲的增量已无意义
+                for name, value in sets.items():
+                    self._pending_sets[name] = value
+                    self._pending_increments.pop(name, None)
+            else:
+                self._pending_increments[field] = (
+                    self._pending_increments.get(field, 0) + amount
+                )
+            size = len(self._pending_sets) + len(self._pending_increments)
+            if size < self.flush_size:
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(
+                        self.flush_interval, self._flush_quietly
+                    )
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+                return
+        self.flush()
+
+    def flush(self):
+        """
+        将缓冲的写入通过一个事务管道写入 Redis
+
+        只有在发送任何命令之前（取得连接时）出错，写入才放回缓冲区等待下次刷新；发送之后的连接或超时错误
+        可能只是丢失了应答，事务中某条命令执行出错（ResponseError）时其余命令也已生效，
+        这两种情况下这批写入都被丢弃并抛出异常，避免增量被重复累加
+        """
+        with self._write_lock:
+            sets, self._pending_sets = self._pending_sets, {}
+            increments, self._pending_increments = self._pending_increments, {}
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        if not sets and not increments:
+            return
+        pipeline = self._pipeline()
+        if sets:
+            pipeline.hset(self.key, mapping=sets)
+        for field, amount in increments.items():
+            if isinstance(amount, int):
+                pipeline.hincrby(self.key, field, amount)
+            else:
+                pipeline.hincrbyfloat(self.key, field, amount)
+        if not self.cluster:
+            try:
+                pipeline.connection = _get_connection(pipeline.connection_pool)
+            except (redis.ConnectionError, redis.TimeoutError):
+                # 尚未发送任何命令，可以安全地放回缓冲区
+                self._restore_writes(sets, increments)
+                self._invalidate()
+                raise
+        try:
+            pipeline.execute()
+        except (redis.ConnectionError, redis.TimeoutError) as exc:
+            logger.error(
+                f"RedisHashStore flush of {len(sets)} sets and {len(increments)} increments "
+                f"may not have been applied, dropped<{exc}>"
+            )
+            raise
+        finally:
+            self._invalidate()
+
+    def _restore_writes(self, sets, increments):
+        """写入失败时把未写入的数据放回缓冲区，期间新的覆盖写优先"""
+        with self._write_lock:
+            overridden = set(self._pending_sets)
+            for field, value in sets.items():
+                if field not in overridden:
+                    self._pending_sets[field] = value
+            for field, amount in increments.items():
+                if field not in overridden:
+                    self._pending_increments[field] = (
+                        amount + self._pending_increments.get(field, 0)
+                    )
+
+    def _flush_quietly(self):
+        try:
+            self.flush()
+        except redis.RedisError as exc:
+            logger.exception(f"RedisHashStore flush error<{exc}>")
+
+    def cache_info(self):
+        """返回本地缓存的命中、未命中、淘汰等统计，未开启缓存时返回 None"""
+        if self._cache is None:
+            return None
+        return self._cache.info()
+
     def set(self, field, value):
         """设置哈希表中指定字段的值"""
-        return self.connection.hset(self.key, field, value)
+        if self.write_behind:
+            return self._buffer_write(sets={field: value})
+        with self._invalidating():
+            return self.connection.hset(self.key, field, value)
 
     def set_multiple(self, mapping):
         """同时将多个 field-value 对设置到哈希表中"""
-        return self.connection.hmset(self.key, mapping)
+        if self.write_behind:
+            return self._buffer_write(sets=mapping)
+        with self._invalidating():
+            return self.connection.hmset(self.key, mapping)
 
     def get(self, *fields):
         """获取哈希表中指定字段的值"""
         if len(fields) == 1:
-            return self.connection.hget(self.key, fields[0])
-        return self.connection.hmget(self.key, fields)
+            return self._cached(
+                ("get", fields[0]),
+                lambda: self.connection.hget(self.key, fields[0]),
+            )
+        values = self._cached(
+            ("get",) + fields, lambda: self.connection.hmget(self.key, fields)
+        )
+        # 返回副本，避免调用方修改缓存中的列表
+        return values if self._cache is None else list(values)
 
     def delete(self, *fields):
         """删除哈希表中的一个或多个字段"""
-        return self.connection.hdel(self.key, *fields)
+        if self.write_behind:
+            # 丢弃这些字段尚未写入的数据，避免刷新时把已删除的字段写回
+            with self._write_lock:
+                for field in fields:
+                    self._pending_sets.pop(field, None)
+                    self._pending_increments.pop(field, None)
+        with self._invalidating():
+            return self.connection.hdel(self.key, *fields)
 
     def exists(self, field):
         """检查哈希表中是否存在指定的字段"""
-        return self.connection.hexists(self.key, field)
+        return self._cached(
+            ("exists", field), lambda: self.connection.hexists(self.key, field)
+        )
 
     def length(self):
         """获取哈希表中字段的数量"""
@@ -46,7 +239,10 @@ class RedisHashStore(RedisStore):
 
     def items(self):
         """获取哈希表中所有的字段和值"""
-        return self.connection.hgetall(self.key)
+        if self._cache is None:
+            return self.connection.hgetall(self.key)
+        # 返回副本，避免调用方修改缓存中的字典
+        return dict(self._cached(("items",), lambda: self.connection.hgetall(self.key)))
 
     def increment(self, field, amount=1):
         """
@@ -54,21 +250,79 @@ class RedisHashStore(RedisStore):
         
         :param field: 要增加的字段
         :param amount: 增加的数量，可以是整数或浮点数
-        :return: 增加后的值
+        :return: 增加后的值，write_behind 模式下返回 None
         """
-        if isinstance(amount, int):
-            return self.connection.hincrby(self.key, field, amount)
-        else:
-            return self.connection.hincrbyfloat(self.key, field, amount)
+        if self.write_behind:
+            return self._buffer_write(field=field, amount=amount)
+        with self._invalidating():
+            if isinstance(amount, int):
+                return self.connection.hincrby(self.key, field, amount)
+            else:
+                return self.connection.hincrbyfloat(self.key, field, amount)
+
 
+    def increment_within(self, field, amount=1, minimum=None, maximum=None):
+        """
+        原子地检查并增加字段的值，增加后超出 [minimum, maximum] 时不修改
+
+        :param field: 字段名
+        :param amount: 增加的值，可以为负数或浮点数
+        :param minimum: 下限，None 表示不限制
+        :param maximum: 上限，None 表示不限制
+        :return: 增加后的值，超出范围时返回 None
+        """
+        if self.write_behind:
+            # 先写入缓冲的增量，否则脚本读到的是旧值
+            self.flush()
+        kind = "float" if isinstance(amount, float) else "int"
+        args = (
+            field,
+            amount,
+            "" if minimum is None else minimum,
+            "" if maximum is None else maximum,
+            kind,
+        )
+        with self._invalidating():
+            result = self.run_script("hash_increment_within", (self.key,), args)
+        if result is not None and kind == "float":
+            return float(result)
+        return result
 
     def scan(self, cursor=0, match=None, count=None):
         """迭代哈希表中的键值对"""
         return self.connection.hscan(self.key, cursor, match, count)
 
+    def iter_items(self, match=None, page_size=None, prefetch=False):
+        """
+        以 HSCAN 分页惰性迭代哈希表中的 (field, value)
+
+        :param match: 字段匹配模式
+        :param page_size: 每页数量（COUNT），None 表示根据每页耗时自适应调整
+        :param prefetch: 调用方处理当前页时，是否在后台线程预取下一页
+        """
+
+        def fetch(cursor, count):
+            cursor, page = self.connection.hscan(self.key, cursor, match, count)
+            return (cursor or None), page.items()
+
+        return paginate(fetch, 0, page_size, prefetch)
+
+    def shutdown(self):
+        if self.__dict__.get("_pending_sets") or self.__dict__.get(
+            "_pending_increments"
+        ):
+            self._flush_quietly()
+        listener = self.__dict__.get("_listener")
+        if listener is not None:
+            listener.stop()
+            self._listener = None
+        super().shutdown()
+
     def __getattr__(self, name):
         """动态处理未实现的方法"""
         def method(*args, **kwargs):
-            redis_method = getattr(self.connection, name)
-            return redis_method(self.key, *args, **kwargs)
+            # 未知命令可能修改哈希表，保守地清空本地缓存
+            with self._invalidating():
+                redis_method = getattr(self.connection, name)
+                return redis_method(self.key, *args, **kwargs)
         return method
@@ -0,0 +1,82 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Optional
+
+
+class AdaptivePageSize:
+    """
+    Page size that doubles while pages come back faster than half the target latency and halves when slower.
+    """
+
+    def __init__(
+        self,
+        initial: int = 100,
+        minimum: int = 10,
+        maximum: int = 10000,
+        target_latency: float = 0.01,
+    ):
+        """
+        :param initial: First page size
+        :param minimum: Smallest page size
+        :param maximum: Largest page size
+        :param target_latency: Desired time per page (seconds)
+        """
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+
+    def record(self, elapsed: float):
+        if elapsed > self.target_latency:
+            self.size = max(self.size // 2, self.minimum)
+        elif elapsed < self.target_latency / 2:
+            self.size = min(self.size * 2, self.maximum)
+        return self.size
+
+
+class FixedPageSize:
+    def __init__(self, size: int):
+        self.size = size
+
+    def record(self, elapsed: float):
+        return self.size
+
+
+def _timed_fetch(fetch, cursor, count):
+    started = time.perf_counter()
+    next_cursor, items = fetch(cursor, count)
+    return next_cursor, items, time.perf_counter() - started
+
+
+def paginate(
+    fetch: Callable,
+    start,
+    page_size: Optional[int] = None,
+    prefetch: bool = False,
+) -> Iterator:
+    """
+    Lazily yield the items of every page returned by `fetch`.
+
+    :param fetch: `fetch(cursor, count) -> (next_cursor, items)`, next_cursor is None after the last page
+    :param start: The first cursor
+    :param page_size: Fixed page size, None adapts it to the observed latency
+    :param prefetch: Fetch the next page in a background thread while the caller consumes the current one
+    """
+    sizer = AdaptivePageSize() if page_size is None else FixedPageSize(page_size)
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        cursor, pending = start, None
+        while cursor is not None:
+            if pending is not None:
+                next_cursor, items, elapsed = pending.result()
+            else:
+                next_cursor, items, elapsed = _timed_fetch(fetch, cursor, sizer.size)
+            sizer.record(elapsed)
+            pending = None
+            if executor is not None and next_cursor is not None:
+                pending = executor.submit(_timed_fetch, fetch, next_cursor, sizer.size)
+            yield from items
+            cursor = next_cursor
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
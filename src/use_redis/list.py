@@ -1,3 +1,4 @@
+from .iterators import paginate
 from .store import RedisStore
 
 
@@ -34,6 +35,44 @@ class RedisListStore(RedisStore):
         """获取列表指定范围内的元素"""
         return self.connection.lrange(self.key, start, end)
 
+    def iter_range(self, start=0, end=-1, page_size=None, prefetch=False):
+        """
+        以 LRANGE 分页惰性迭代列表指定范围内的元素
+
+        :param start: 起始索引
+        :param end: 结束索引（包含），-1 表示到列表末尾
+        :param page_size: 每页数量，None 表示根据每页耗时自适应调整
+        :param prefetch: 调用方处理当前页时，是否在后台线程预取下一页
+        """
+        # None 表示直到列表末尾
+        last = None if end == -1 else end
+        if start < 0 or end < -1:
+            # 负数索引先换算成绝对位置，避免分页过程中列表长度变化导致错位
+            length = self.connection.llen(self.key)
+            start = max(length + start, 0) if start < 0 else start
+            if end < -1:
+                last = length + end
+
+        def fetch(cursor, count):
+            stop = cursor + count - 1
+            if last is not None:
+                stop = min(stop, last)
+            page = self.connection.lrange(self.key, cursor, stop)
+            if len(page) < stop - cursor + 1 or stop == last:
+                return None, page
+            return stop + 1, page
+
+        if last is not None and last < start:
+            # 包括换算后 last 小于 0 的情况，与 LRANGE 一样返回空
+            return iter(())
+        return paginate(fetch, start, page_size, prefetch)
+
+    def pop_many_to(self, dst_key, count):
+        """原子地从列表头部弹出最多 count 个元素并追加到 dst_key 列表尾部，返回被移动的元素"""
+        if count <= 0:
+            return []
+        return self.run_script("list_pop_many_to", (self.key, dst_key), (count,))
+
     def set(self, index, value):
         """通过索引设置列表元素的值"""
         return self.connection.lset(self.key, index, value)
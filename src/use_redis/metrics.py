@@ -0,0 +1,191 @@
+import bisect
+import threading
+import time
+
+import redis
+
+
+class Metrics:
+    """
+    In-process counters, gauges and latency histograms, exportable as a snapshot or Prometheus text.
+
+    Pass one instance to any number of stores with ``metrics=``; stores without it are not instrumented.
+    """
+
+    DEFAULT_BUCKETS = (
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1,
+        2.5,
+        5,
+        10,
+    )
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix="use_redis"):
+        """
+        :param buckets: Upper bounds of the histogram buckets (seconds)
+        :param prefix: Prefix of every metric name
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items())) if labels else ()
+
+    def increment(self, name, labels=None, amount=1):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name, labels=None, value=0):
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name, labels=None, value=0.0):
+        key = self._key(name, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # [每个桶的计数..., +Inf 桶计数, 总和]
+                histogram = self._histograms[key] = [0] * (len(self.buckets) + 1) + [
+                    0.0
+                ]
+            histogram[index] += 1
+            histogram[-1] += value
+
+    def instrument(self, client):
+        """
+        Record latency and errors of every command (and pipeline) sent through `client`.
+        """
+        execute_command = client.execute_command
+        pipeline = client.pipeline
+
+        def instrumented_execute_command(*args, **options):
+            command = str(args[0]) if args else ""
+            started = time.perf_counter()
+            try:
+                return execute_command(*args, **options)
+            except redis.RedisError:
+                self.increment("command_errors_total", {"command": command})
+                raise
+            finally:
+                self.observe(
+                    "command_duration_seconds",
+                    {"command": command},
+                    time.perf_counter() - started,
+                )
+
+        def instrumented_pipeline(*args, **kwargs):
+            pipe = pipeline(*args, **kwargs)
+            execute = pipe.execute
+
+            def instrumented_execute(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return execute(*args, **kwargs)
+                except redis.RedisError:
+                    self.increment("command_errors_total", {"command": "PIPELINE"})
+                    raise
+                finally:
+                    self.observe(
+                        "command_duration_seconds",
+                        {"command": "PIPELINE"},
+                        time.perf_counter() - started,
+                    )
+
+            pipe.execute = instrumented_execute
+            return pipe
+
+        client.execute_command = instrumented_execute_command
+        client.pipeline = instrumented_pipeline
+        return client
+
+    def snapshot(self):
+        """
+        Return all metrics as plain Python data.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = {key: list(value) for key, value in self._histograms.items()}
+
+        result = {"counters": [], "gauges": [], "histograms": []}
+        for (name, labels), value in sorted(counters.items()):
+            result["counters"].append(
+                {"name": name, "labels": dict(labels), "value": value}
+            )
+        for (name, labels), value in sorted(gauges.items()):
+            result["gauges"].append(
+                {"name": name, "labels": dict(labels), "value": value}
+            )
+        for (name, labels), histogram in sorted(histograms.items()):
+            counts = histogram[:-1]
+            result["histograms"].append(
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "buckets": dict(zip(self.buckets + (float("inf"),), counts)),
+                    "count": sum(counts),
+                    "sum": histogram[-1],
+                }
+            )
+        return result
+
+    def to_prometheus(self):
+        """
+        Return all metrics in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for item in snapshot["counters"]:
+            name = f"{self.prefix}_{item['name']}"
+            header(name, "counter")
+            lines.append(f"{name}{_labels(item['labels'])} {item['value']}")
+        for item in snapshot["gauges"]:
+            name = f"{self.prefix}_{item['name']}"
+            header(name, "gauge")
+            lines.append(f"{name}{_labels(item['labels'])} {item['value']}")
+        for item in snapshot["histograms"]:
+            name = f"{self.prefix}_{item['name']}"
+            header(name, "histogram")
+            cumulative = 0
+            for bound, count in item["buckets"].items():
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                labels = _labels(dict(item["labels"], le=le))
+                lines.append(f"{name}_bucket{labels} {cumulative}")
+            lines.append(f"{name}_sum{_labels(item['labels'])} {item['sum']}")
+            lines.append(f"{name}_count{_labels(item['labels'])} {item['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels.items()
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
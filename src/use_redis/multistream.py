@@ -0,0 +1,453 @@
+import collections
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import redis
+
+from .cluster import group_by_slot
+from .codec import Codec, get_codec
+from .store import RedisStore
+from .stream import RedisStreamMessage, _split_dead_letters
+
+logger = logging.getLogger(__name__)
+
+
+class RedisMultiStreamStore(RedisStore):
+    CLUSTER_POLL_INTERVAL = 50
+    PENDING_SYNC_INTERVAL = 5000
+
+    def __init__(
+        self,
+        *,
+        streams: Iterable[str],
+        group: str,
+        stream_max_entries: int = 0,
+        redeliver_timeout: int = 60000,
+        claim_interval: int = 1800000,
+        codec: Union[str, Codec, None] = None,
+        max_deliveries: int = 0,
+        dead_letter_stream: Optional[str] = None,
+        **kwargs,
+    ):
+        """
+
+        A consumer group reading many Redis streams with a single blocking XREADGROUP.
+
+        Every stream has its own prefetch budget per consumer: a stream whose budget is used up by
+        unacknowledged messages is left out of the next XREADGROUP, so one busy stream cannot starve the others.
+        Unacknowledged messages are counted locally, so acknowledge them through this store.
+
+        :param streams: The names of the streams
+        :param group: The name of the group, created on every stream
+        :param stream_max_entries: any value higher than 0 defines an approximate maximum number of stream entries
+        :param redeliver_timeout: Timeout before redeliver messages still in pending state (milliseconds)
+        :param claim_interval: Interval by which pending/abandoned messages should be checked
+        :param codec: Body codec, see `RedisStreamStore`
+        :param max_deliveries: any value higher than 0 moves a claimed message delivered more than this many times
+            to the dead-letter stream and acks it, see `RedisStreamStore`
+        :param dead_letter_stream: One stream receiving the dead letters of all streams, by default each stream has
+            its own "{stream}:dead". The "_stream" field of a dead letter names the stream it came from.
+
+        In cluster mode a single XREADGROUP only works for streams on one slot (see `use_redis.cluster.hash_tag`);
+        otherwise every slot is read without blocking in one pipeline, repeated every `CLUSTER_POLL_INTERVAL` ms
+        until messages arrive or the timeout expires.
+
+        """
+        self.codec = get_codec(codec)
+        if self.codec is not None and self.codec.binary:
+            kwargs["decode_responses"] = False
+        super().__init__(**kwargs)
+        self.streams = list(dict.fromkeys(streams))
+        if not self.streams:
+            raise ValueError("streams is required")
+        self.group = group
+        self.max_entries = stream_max_entries if stream_max_entries > 0 else None
+        self.redeliver_timeout = redeliver_timeout
+        self.claim_interval = claim_interval
+        self.max_deliveries = max_deliveries
+        self.dead_letter_stream = dead_letter_stream
+
+        self._auto_setup = True
+        self.state = threading.local()
+        # bytes 模式下响应中的 stream 名为 bytes，映射回配置的名称
+        self._names = {stream.encode(): stream for stream in self.streams}
+        self._capacity = threading.Condition()
+        self._pending_owner = {}
+        self._pending_count = collections.Counter()
+
+    def _setup(self):
+        pipeline = self.connection.pipeline(transaction=False)
+        for stream in self.streams:
+            pipeline.xgroup_create(stream, self.group, id="0", mkstream=True)
+        for result in pipeline.execute(raise_on_error=False):
+            if isinstance(result, redis.exceptions.ResponseError):
+                if "already exists" not in str(result):
+                    raise result
+
+        self._auto_setup = False
+
+    def send(self, stream: str, message: dict):
+        """
+        Send a message to one of the streams.
+        """
+        if self._auto_setup:
+            self._setup()
+        if self.codec is not None:
+            message = self.codec.encode_fields(message)
+        return self.connection.xadd(stream, message, maxlen=self.max_entries)
+
+    def _budgets(self, consumer: str, prefetch: int) -> Dict[str, int]:
+        with self._capacity:
+            return {
+                stream: prefetch - self._pending_count[(consumer, stream)]
+                for stream in self.streams
+            }
+
+    def claim_old_pending_messages(
+        self, consumer: str, budgets: Dict[str, int], min_idle_time: int
+    ) -> List[RedisStreamMessage]:
+        """
+        Claim abandoned messages of every stream with a budget left, in one pipeline round trip.
+        """
+        streams = [stream for stream, count in budgets.items() if count > 0]
+        if not streams:
+            return []
+        if not hasattr(self.state, "claim_cursors"):
+            self.state.claim_cursors = {}
+        cursors = self.state.claim_cursors
+        pipeline = self.connection.pipeline(transaction=False)
+        for stream in streams:
+            pipeline.xautoclaim(
+                name=stream,
+                groupname=self.group,
+                consumername=consumer,
+                min_idle_time=min_idle_time,
+                start_id=cursors.get(stream, "0-0"),
+                count=budgets[stream],
+            )
+
+        claimed = {}
+        for stream, (next_id, messages, *_) in zip(streams, pipeline.execute()):
+            # 每个 stream 从上次的游标继续扫描 PEL
+            if isinstance(next_id, bytes):
+                next_id = next_id.decode()
+            cursors[stream] = next_id
+            if messages:
+                claimed[stream] = messages
+        if claimed and self.max_deliveries > 0:
+            claimed = self._dead_letter(consumer, claimed)
+
+        result = []
+        for stream, messages in claimed.items():
+            if messages:
+                result += RedisStreamMessage.from_xclaim(
+                    raw_messages=messages,
+                    stream=stream,
+                    group=self.group,
+                    codec=self.codec,
+                )
+        if all(cursors[stream] == "0-0" for stream in streams):
+            self.state.next_claim = time.time() * 1000 + self.claim_interval
+        logger.debug(f"xautoclaim: {result=}")
+        return result
+
+    def dead_letter_stream_for(self, stream: str) -> str:
+        """
+        The stream receiving the dead letters of `stream`.
+        """
+        return self.dead_letter_stream or f"{stream}:dead"
+
+    def _dead_letter(self, consumer: str, claimed: Dict[str, list]) -> Dict[str, list]:
+        """
+        Move claimed messages delivered more than `max_deliveries` times to the dead-letter streams,
+        reading their delivery counts in one pipeline and moving them in another.
+
+        :return: The messages of every stream still to be handed to the consumer
+        """
+        streams = list(claimed)
+        pipeline = self.connection.pipeline(transaction=False)
+        for stream in streams:
+            # XAUTOCLAIM 返回的消息按 id 升序排列
+            messages = claimed[stream]
+            pipeline.xpending_range(
+                stream,
+                self.group,
+                messages[0][0],
+                messages[-1][0],
+                len(messages),
+                consumer,
+            )
+        alive, dead = {}, {}
+        for stream, pending in zip(streams, pipeline.execute()):
+            alive[stream], entries = _split_dead_letters(
+                stream, claimed[stream], pending, self.max_deliveries
+            )
+            if entries:
+                dead[stream] = entries
+        if not dead:
+            return alive
+
+        pipeline = self.connection.pipeline(transaction=False)
+        for stream, entries in dead.items():
+            for id, fields in entries:
+                pipeline.xadd(self.dead_letter_stream_for(stream), fields)
+            pipeline.xack(stream, self.group, *[id for id, _ in entries])
+        pipeline.execute()
+        for stream, entries in dead.items():
+            self._release_pending(stream, [id for id, _ in entries])
+            logger.warning(
+                f"moved {len(entries)} messages of {stream} "
+                f"to {self.dead_letter_stream_for(stream)}"
+            )
+            if self.metrics is not None:
+                self._record(
+                    "stream_messages_dead_lettered_total",
+                    stream,
+                    len(entries),
+                    consumer,
+                )
+        return alive
+
+    def get(
+        self,
+        consumer: str,
+        budgets: Dict[str, int],
+        block: Union[int, None] = None,
+    ) -> List[RedisStreamMessage]:
+        """
+        Read new messages from every stream with a budget left, in one XREADGROUP.
+
+        XREADGROUP applies COUNT to each stream, so the smallest remaining budget is used to keep every stream within its own.
+        """
+        if self._auto_setup:
+            self._setup()
+
+        streams = {stream: ">" for stream, count in budgets.items() if count > 0}
+        if not streams:
+            return []
+        count = min(budgets[stream] for stream in streams)
+        if self.cluster and len(group_by_slot(streams)) > 1:
+            raw_messages = self._read_slots(consumer, streams, count, block)
+        else:
+            raw_messages = self.connection.xreadgroup(
+                groupname=self.group,
+                consumername=consumer,
+                streams=streams,
+                count=count,
+                block=block,
+            )
+        logger.debug(f"xreadgroup: {raw_messages=}")
+        if not raw_messages:
+            return []
+        raw_messages = [
+            (self._names.get(stream, stream), messages)
+            for stream, messages in raw_messages
+        ]
+        messages = RedisStreamMessage.from_xread(
+            raw_messages=raw_messages, group=self.group, codec=self.codec
+        )
+        if self.metrics is not None:
+            for stream, entries in raw_messages:
+                self._record(
+                    "stream_messages_fetched_total", stream, len(entries), consumer
+                )
+        return messages
+
+    def _read_slots(
+        self, consumer: str, streams: Dict[str, str], count: int, block
+    ) -> list:
+        """
+        XREADGROUP every slot of `streams` in one pipeline, which the cluster client sends to all nodes at once.
+        """
+        # block 为 None 不阻塞，为 0 一直等待
+        deadline = time.time() * 1000 + (block or 0)
+        groups = list(group_by_slot(streams).values())
+        while True:
+            pipeline = self._pipeline(transaction=False)
+            for keys in groups:
+                pipeline.xreadgroup(
+                    groupname=self.group,
+                    consumername=consumer,
+                    streams={key: ">" for key in keys},
+                    count=count,
+                )
+            raw_messages = [
+                entry for reply in pipeline.execute() if reply for entry in reply
+            ]
+            if raw_messages or block is None:
+                return raw_messages
+            remaining = deadline - time.time() * 1000
+            if block and remaining <= 0:
+                return raw_messages
+            wait = self.CLUSTER_POLL_INTERVAL
+            if block:
+                wait = min(wait, remaining)
+            time.sleep(wait / 1000)
+
+    def consume(
+        self,
+        consumer: str,
+        prefetch: int = 1,
+        timeout: Union[int, None] = None,
+        force_claim: bool = False,
+        redeliver_timeout: Union[int, None] = None,
+    ) -> List[RedisStreamMessage]:
+        """
+        Consume messages from all streams(order: xautoclaim -> xreadgroup).
+
+        :param consumer: The name of the consumer
+        :param prefetch: Number of unacknowledged messages allowed per stream
+        :param timeout: Blocking time of the Xread. Unit is millisecond, 0 is infinite blocking
+        :param force_claim: Whether to force claim, True= to perform claim, False = execute claim periodically
+        :param redeliver_timeout: Timeout before redeliver messages still in pending state (milliseconds)
+        :return: List of messages consumed, grouped by stream
+        """
+        next_sync = getattr(self.state, "next_pending_sync", None)
+        now = time.time() * 1000
+        if next_sync is None:
+            self.state.next_pending_sync = now + self.PENDING_SYNC_INTERVAL
+        elif next_sync <= now:
+            self._sync_pending(consumer, prefetch)
+
+        budgets = self._budgets(consumer, prefetch)
+        if all(count <= 0 for count in budgets.values()):
+            # 所有 stream 的名额都已用完；等待 ack 释放名额，最多 1s 后再试
+            with self._capacity:
+                self._capacity.wait(1)
+            return []
+
+        if self._auto_setup:
+            self._setup()
+
+        result = []
+        if force_claim or getattr(self.state, "next_claim", 0) <= time.time() * 1000:
+            result += self.claim_old_pending_messages(
+                consumer,
+                budgets,
+                min_idle_time=redeliver_timeout or self.redeliver_timeout,
+            )
+            for message in result:
+                budgets[message.stream] -= 1
+
+        # 已认领到消息时不再阻塞等待新消息
+        result += self.get(consumer, budgets, None if result else timeout)
+        if result:
+            self._track_delivered(consumer, result)
+        return result
+
+    def _sync_pending(self, consumer: str, prefetch: int):
+        """
+        Forget locally counted messages of `consumer` that the server no longer lists as pending for it,
+        e.g. claimed by another process, so the budget of their stream is not exhausted forever.
+        """
+        self.state.next_pending_sync = time.time() * 1000 + self.PENDING_SYNC_INTERVAL
+        with self._capacity:
+            streams = [
+                stream
+                for stream in self.streams
+                if self._pending_count[(consumer, stream)] > 0
+            ]
+        if not streams:
+            return
+        pipeline = self.connection.pipeline(transaction=False)
+        for stream in streams:
+            pipeline.xpending_range(stream, self.group, "-", "+", prefetch, consumer)
+        pending = {}
+        for stream, entries in zip(streams, pipeline.execute()):
+            # 服务端的列表被 prefetch 截断时无法判断哪些消息已不属于该消费者
+            if len(entries) < prefetch:
+                pending[stream] = {entry["message_id"] for entry in entries}
+        with self._capacity:
+            for (stream, id), owner in list(self._pending_owner.items()):
+                if owner == consumer and id not in pending.get(stream, (id,)):
+                    del self._pending_owner[(stream, id)]
+                    self._pending_count[(consumer, stream)] -= 1
+            self._capacity.notify_all()
+
+    def _track_delivered(self, consumer: str, messages: List[RedisStreamMessage]):
+        with self._capacity:
+            for message in messages:
+                key = (message.stream, message.id)
+                owner = self._pending_owner.get(key)
+                if owner == consumer:
+                    continue
+                if owner is not None:
+                    self._pending_count[(owner, message.stream)] -= 1
+                self._pending_owner[key] = consumer
+                self._pending_count[(consumer, message.stream)] += 1
+
+    def _release_pending(self, stream, ids):
+        with self._capacity:
+            for id in ids:
+                owner = self._pending_owner.pop((stream, id), None)
+                if owner is not None:
+                    self._pending_count[(owner, stream)] -= 1
+            self._capacity.notify_all()
+
+    def start_consuming(
+        self,
+        consumer: str,
+        callback: Callable,
+        prefetch: int = 1,
+        timeout: int = 1000,
+        **kwargs,
+    ):
+        """
+        Start consuming messages from all streams.
+
+        :param consumer: The name of the consumer，please use a unique value
+        :param callback: Callback function
+        :param prefetch: Number of unacknowledged messages allowed per stream
+        :param timeout: Blocking time of the Xread. Unit is millisecond, 0 is infinite blocking
+        """
+        while not self._shutdown:
+            try:
+                messages = self.consume(consumer, prefetch, timeout=timeout, **kwargs)
+                for message in messages:
+                    callback(message)
+            except redis.RedisError as e:
+                logger.error(f"Error consuming messages: {e}")
+                time.sleep(self.RECONNECTION_DELAY)
+
+    def _record(self, name, stream, amount, consumer=None):
+        labels = {"stream": stream, "group": self.group}
+        if consumer is not None:
+            labels["consumer"] = consumer
+        self.metrics.increment(name, labels, amount)
+
+    def ack_many(self, messages: List[RedisStreamMessage]):
+        """
+        Acknowledge several messages, one XACK per stream in a single pipeline.
+        """
+        ids_by_stream = collections.defaultdict(list)
+        for message in messages:
+            ids_by_stream[message.stream].append(message.id)
+        if not ids_by_stream:
+            return 0
+        pipeline = self.connection.pipeline(transaction=False)
+        for stream, ids in ids_by_stream.items():
+            pipeline.xack(stream, self.group, *ids)
+        acked = pipeline.execute()
+        for stream, ids in ids_by_stream.items():
+            self._release_pending(stream, ids)
+            if self.metrics is not None:
+                self._record("stream_messages_acked_total", stream, len(ids))
+        return sum(acked)
+
+    def ack(self, message: RedisStreamMessage):
+        """
+        Acknowledge a message.
+        """
+        acked = self.connection.xack(message.stream, self.group, message.id)
+        self._release_pending(message.stream, [message.id])
+        if self.metrics is not None:
+            self._record("stream_messages_acked_total", message.stream, 1)
+        return acked
+
+    def reject(self, message: RedisStreamMessage):
+        """
+        Reject a message.
+        """
+        self.ack(message)
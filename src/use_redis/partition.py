@@ -0,0 +1,186 @@
+import itertools
+import logging
+import time
+import zlib
+from typing import Dict, List, Optional
+
+import redis
+
+from .multistream import RedisMultiStreamStore
+
+logger = logging.getLogger(__name__)
+
+
+class RedisPartitionedStreamStore(RedisMultiStreamStore):
+    def __init__(
+        self,
+        *,
+        stream: str,
+        group: str,
+        partitions: int = 8,
+        heartbeat_interval: int = 5000,
+        consumer_timeout: int = 30000,
+        **kwargs,
+    ):
+        """
+
+        A logical stream spread over `partitions` physical streams named "{stream}:{index}".
+
+        `send` picks the partition from a hash of the message key, so messages with the same key keep their order.
+        Consumers of the group announce themselves with a heartbeat and split the partitions between the live ones;
+        the split is recomputed on every heartbeat, so partitions move as consumers join or leave.
+        A consumer only reads a partition while it holds its lease ("{stream}:{index}:owner:{group}"), renewed on
+        every heartbeat. A partition moving away is read no more, but its lease is only released once every message
+        read from it has been acked, so its next owner never reads it concurrently and per-key order is kept.
+        The lease of a consumer that died expires after `consumer_timeout`.
+
+        :param stream: The name of the logical stream
+        :param group: The name of the group
+        :param partitions: Number of physical streams, changing it remaps keys to other partitions
+        :param heartbeat_interval: Interval between consumer heartbeats (milliseconds)
+        :param consumer_timeout: A consumer without heartbeat for this long loses its partitions and their leases
+            (milliseconds), must be well above `heartbeat_interval`
+        :param kwargs: See `RedisMultiStreamStore`
+
+        """
+        if partitions < 1:
+            raise ValueError("partitions must be at least 1")
+        self.stream = stream
+        self.partitions = partitions
+        self.heartbeat_interval = heartbeat_interval
+        self.consumer_timeout = consumer_timeout
+        super().__init__(
+            streams=[f"{stream}:{index}" for index in range(partitions)],
+            group=group,
+            **kwargs,
+        )
+        self.consumers_key = f"{stream}:consumers:{group}"
+        self._round_robin = itertools.count()
+        self._assignments = {}
+        self._leases = {}
+        self._next_heartbeat = {}
+
+    def partition_for(self, key) -> str:
+        """
+        The physical stream that messages with `key` are sent to.
+        """
+        if isinstance(key, str):
+            key = key.encode()
+        elif not isinstance(key, bytes):
+            key = str(key).encode()
+        return self.streams[zlib.crc32(key) % self.partitions]
+
+    def send(self, message: dict, key=None):
+        """
+        Send a message to the partition of `key`, messages without key are spread round-robin.
+        """
+        if key is None:
+            stream = self.streams[next(self._round_robin) % self.partitions]
+        else:
+            stream = self.partition_for(key)
+        return super().send(stream, message)
+
+    def lease_key(self, stream: str) -> str:
+        return f"{stream}:owner:{self.group}"
+
+    def _lease(self, script: str, stream: str, consumer: str) -> bool:
+        return bool(
+            self.run_script(
+                script, (self.lease_key(stream),), (consumer, self.consumer_timeout)
+            )
+        )
+
+    def heartbeat(self, consumer: str) -> List[str]:
+        """
+        Refresh the heartbeat of `consumer`, drop expired consumers, recompute its partitions and renew their leases.
+
+        :return: The physical streams assigned to `consumer` and leased by it
+        """
+        now = time.time() * 1000
+        pipeline = self._pipeline()
+        pipeline.zadd(self.consumers_key, {consumer: now})
+        pipeline.zremrangebyscore(
+            self.consumers_key, "-inf", now - self.consumer_timeout
+        )
+        pipeline.zrange(self.consumers_key, 0, -1)
+        _, _, members = pipeline.execute()
+
+        members = sorted(
+            member.decode() if isinstance(member, bytes) else member
+            for member in members
+        )
+        if consumer in members:
+            wanted = self.streams[members.index(consumer) :: len(members)]
+        else:
+            # 集群模式下管道不是事务，其他客户端可能在 ZADD 与 ZRANGE 之间将其移除（时钟偏差）
+            logger.warning(f"{consumer} missing from {self.consumers_key}")
+            wanted = []
+
+        held = self._leases.get(consumer, {})
+        draining = {}
+        with self._capacity:
+            for stream, since in held.items():
+                # 仍有未确认消息的分区继续持有租约、但不再读取，直到这些消息确认完，
+                # 最多等待 consumer_timeout，避免一条始终未确认的消息永久占住分区
+                if (
+                    stream not in wanted
+                    and self._pending_count[(consumer, stream)]
+                    and now - (since or now) < self.consumer_timeout
+                ):
+                    draining[stream] = since or now
+        released = set(held) - set(wanted) - set(draining)
+
+        # 每个租约单独执行脚本：比较持有者与续期/删除是原子的，集群模式下各租约也可位于不同槽位
+        leased = [
+            stream
+            for stream in wanted
+            if self._lease("lease_acquire", stream, consumer)
+        ]
+        draining = {
+            stream: since
+            for stream, since in draining.items()
+            if self._lease("lease_renew", stream, consumer)
+        }
+        for stream in sorted(released):
+            self._lease("lease_release", stream, consumer)
+
+        if leased != self._assignments.get(consumer):
+            logger.info(f"{consumer} assigned partitions {leased}")
+        self._assignments[consumer] = leased
+        # 值为开始排空的时间，仍在读取的分区为 None
+        self._leases[consumer] = dict.fromkeys(leased, None)
+        self._leases[consumer].update(draining)
+        self._next_heartbeat[consumer] = now + self.heartbeat_interval
+        return leased
+
+    def assignment(self, consumer: str) -> Optional[List[str]]:
+        """
+        The physical streams assigned to `consumer` at its last heartbeat, None before the first one.
+        """
+        return self._assignments.get(consumer)
+
+    def _budgets(self, consumer: str, prefetch: int) -> Dict[str, int]:
+        if self._next_heartbeat.get(consumer, 0) <= time.time() * 1000:
+            self.heartbeat(consumer)
+        budgets = super()._budgets(consumer, prefetch)
+        return {stream: budgets[stream] for stream in self._assignments[consumer]}
+
+    def leave(self, consumer: str):
+        """
+        Remove `consumer` from the group and release its leases, so the remaining consumers take over its partitions
+        at their next heartbeat. Messages it has not acked are claimed by them after `redeliver_timeout`.
+        """
+        streams = sorted(self._leases.pop(consumer, ()))
+        self._assignments.pop(consumer, None)
+        self._next_heartbeat.pop(consumer, None)
+        self.connection.zrem(self.consumers_key, consumer)
+        for stream in streams:
+            self._lease("lease_release", stream, consumer)
+
+    def shutdown(self):
+        for consumer in list(self.__dict__.get("_assignments", ())):
+            try:
+                self.leave(consumer)
+            except redis.RedisError as exc:
+                logger.exception(f"RedisPartitionedStreamStore leave error<{exc}>")
+        super().shutdown()
@@ -0,0 +1,173 @@
+import inspect
+import logging
+import threading
+import time
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+# redis.Redis 会转换部分参数（如 ssl、unix_socket_path），只有连接类直接接受的参数才能用于共享连接池
+POOL_PARAMETERS = (
+    set(
+        inspect.signature(
+            getattr(redis.connection, "AbstractConnection", redis.Connection)
+        ).parameters
+    )
+    | set(inspect.signature(redis.Connection).parameters)
+    | {"max_connections"}
+) - {"self", "args", "kwargs"}
+
+
+class SharedConnectionPool(redis.ConnectionPool):
+    """
+    A connection pool that disconnects sockets left idle for too long and keeps usage statistics.
+    """
+
+    def __init__(self, idle_timeout=None, **kwargs):
+        """
+        :param idle_timeout: Seconds an idle connection is kept open, None keeps it forever
+        :param kwargs: ConnectionPool parameters
+        """
+        super().__init__(**kwargs)
+        self.idle_timeout = idle_timeout
+        self.verified = False
+        self._released_at = {}
+        self._checkouts = 0
+        self._reaped = 0
+
+    def get_connection(self, *args, **kwargs):
+        connection = super().get_connection(*args, **kwargs)
+        self._checkouts += 1
+        return connection
+
+    def release(self, connection):
+        super().release(connection)
+        self._released_at[id(connection)] = time.monotonic()
+        if self.idle_timeout is not None:
+            self.reap()
+
+    def reap(self):
+        """
+        Disconnect available connections idle for longer than `idle_timeout`.
+        """
+        if self.idle_timeout is None:
+            return 0
+        deadline = time.monotonic() - self.idle_timeout
+        reaped = 0
+        with self._lock:
+            # 可用连接按 LIFO 复用，列表头部是空闲最久的连接
+            for connection in self._available_connections:
+                if self._released_at.get(id(connection), deadline) > deadline:
+                    break
+                if getattr(connection, "_sock", None) is not None:
+                    connection.disconnect()
+                    reaped += 1
+        self._reaped += reaped
+        return reaped
+
+    def stats(self):
+        with self._lock:
+            available = len(self._available_connections)
+            connected = sum(
+                1
+                for connection in self._available_connections
+                if getattr(connection, "_sock", None) is not None
+            )
+            in_use = len(self._in_use_connections)
+        return {
+            "max_connections": self.max_connections,
+            "created_connections": self._created_connections,
+            "in_use_connections": in_use,
+            "available_connections": available,
+            "idle_connected_connections": connected,
+            "checkouts": self._checkouts,
+            "reaped_connections": self._reaped,
+        }
+
+
+class ConnectionPoolRegistry:
+    """
+    Process-wide registry of connection pools keyed by connection parameters.
+    """
+
+    REAP_INTERVAL = 30
+
+    def __init__(self):
+        self._pools = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def get_pool(self, parameters, idle_timeout=None):
+        """
+        Return the pool shared by every store using `parameters`, or None if they cannot be shared.
+
+        :param parameters: Redis parameters
+        :param idle_timeout: Seconds an idle connection is kept open, None keeps it forever
+        """
+        if not POOL_PARAMETERS.issuperset(parameters):
+            return None
+        try:
+            key = (tuple(sorted(parameters.items())), idle_timeout)
+            hash(key)
+        except TypeError:
+            return None
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = SharedConnectionPool(idle_timeout=idle_timeout, **parameters)
+                self._pools[key] = pool
+                if idle_timeout is not None:
+                    self._start_reaper()
+            return pool
+
+    def _start_reaper(self):
+        if self._reaper is not None:
+            return
+        self._reaper = threading.Thread(
+            target=self._reap_forever, name="use-redis-pool-reaper", daemon=True
+        )
+        self._reaper.start()
+
+    def _reap_forever(self):
+        while True:
+            time.sleep(self.REAP_INTERVAL)
+            self.reap()
+
+    def reap(self):
+        """
+        Disconnect idle connections in every pool.
+        """
+        with self._lock:
+            pools = list(self._pools.values())
+        return sum(pool.reap() for pool in pools)
+
+    def stats(self):
+        """
+        Return per-pool statistics keyed by "host:port/db".
+        """
+        with self._lock:
+            pools = list(self._pools.values())
+        result = {}
+        for pool in pools:
+            kwargs = pool.connection_kwargs
+            name = f"{kwargs.get('host')}:{kwargs.get('port')}/{kwargs.get('db', 0)}"
+            if name in result:
+                name = f"{name}#{len(result)}"
+            result[name] = pool.stats()
+        return result
+
+    def disconnect(self):
+        """
+        Disconnect and forget every registered pool.
+        """
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            try:
+                pool.disconnect()
+            except Exception as exc:
+                logger.exception(f"ConnectionPoolRegistry disconnect error<{exc}>")
+
+
+pool_registry = ConnectionPoolRegistry()
@@ -0,0 +1,187 @@
+import logging
+import sys
+import time
+from typing import Callable, List, Optional
+
+import redis
+
+from .cluster import hash_tag
+from .list import RedisListStore
+
+logger = logging.getLogger(__name__)
+
+
+class RedisListQueue(RedisListStore):
+    def __init__(
+        self,
+        key,
+        visibility_timeout: int = 60000,
+        recovery_interval: int = 10000,
+        **kwargs,
+    ):
+        """
+
+        A FIFO work queue on a Redis list with reliable, batched delivery.
+
+        `consume` moves items atomically into a processing list of the worker, where they stay until acked.
+        Every worker heartbeats while it consumes; the items of a worker silent for `visibility_timeout` are put back
+        at the head of the queue, so a crashed worker loses nothing (delivery is at-least-once).
+
+        :param key: The key of the queue list
+        :param visibility_timeout: Time without heartbeat after which a worker's items are redelivered (milliseconds),
+            must be longer than the slowest batch of callbacks
+        :param recovery_interval: Interval by which silent workers are looked for (milliseconds)
+
+        """
+        super().__init__(key, **kwargs)
+        self.visibility_timeout = visibility_timeout
+        self.recovery_interval = recovery_interval
+        self._next_recovery = 0
+
+    def _related_key(self, *parts) -> str:
+        # 与队列键使用相同的哈希标签，集群中脚本涉及的键都在同一个槽
+        if "{" in self.key:
+            return ":".join((self.key,) + parts)
+        return hash_tag(self.key, *parts)
+
+    @property
+    def workers_key(self) -> str:
+        return self._related_key("workers")
+
+    def processing_key(self, worker: str) -> str:
+        return self._related_key("processing", worker)
+
+    def push(self, *items):
+        """
+        Append items to the tail of the queue.
+        """
+        return self.connection.rpush(self.key, *items)
+
+    def pop_batch(self, count: int, timeout: Optional[int] = None) -> List:
+        """
+        Pop up to `count` items with LMPOP, or BLMPOP when `timeout` is given (requires Redis 7.0).
+
+        Popped items are not tracked: they are lost if the caller crashes, use `consume` for reliable delivery.
+
+        :param timeout: Blocking time. Unit is millisecond, 0 is infinite blocking
+        """
+        if timeout is None:
+            result = self.connection.lmpop(1, self.key, direction="LEFT", count=count)
+        else:
+            result = self.connection.blmpop(
+                timeout / 1000, 1, self.key, direction="LEFT", count=count
+            )
+        return result[1] if result else []
+
+    def heartbeat(self, worker: str):
+        self.connection.zadd(self.workers_key, {worker: time.time() * 1000})
+
+    def recover(self) -> int:
+        """
+        Put the items of every worker silent for `visibility_timeout` back at the head of the queue.
+
+        :return: Number of items redelivered
+        """
+        deadline = time.time() * 1000 - self.visibility_timeout
+        self._next_recovery = time.time() * 1000 + self.recovery_interval
+        recovered = 0
+        workers = self.connection.zrangebyscore(self.workers_key, "-inf", deadline)
+        for worker in workers:
+            if isinstance(worker, bytes):
+                worker = worker.decode()
+            count = self.run_script(
+                "list_requeue",
+                (self.key, self.processing_key(worker), self.workers_key),
+                (worker, deadline),
+            )
+            if count:
+                logger.warning(f"redelivered {count} items of silent worker {worker}")
+            recovered += count
+        return recovered
+
+    def consume(
+        self, worker: str, count: int = 1, timeout: Optional[int] = None
+    ) -> List:
+        """
+        Move up to `count` items from the queue into the processing list of `worker` and return them.
+
+        :param worker: The name of the worker, please use a unique value
+        :param count: Maximum number of items
+        :param timeout: Blocking time when the queue is empty. Unit is millisecond, 0 is infinite blocking
+        """
+        self.heartbeat(worker)
+        if self._next_recovery <= time.time() * 1000:
+            self.recover()
+
+        processing = self.processing_key(worker)
+        items = self.pop_many_to(processing, count)
+        if items or timeout is None:
+            return items
+        # 队列为空：阻塞等待第一个元素，再非阻塞地补齐本批
+        item = self.connection.blmove(
+            self.key, processing, timeout / 1000, "LEFT", "RIGHT"
+        )
+        if item is None:
+            return []
+        return [item] + self.pop_many_to(processing, count - 1)
+
+    def ack(self, worker: str, item):
+        """
+        Remove a processed item from the processing list of `worker`.
+        """
+        return self.connection.lrem(self.processing_key(worker), 1, item)
+
+    def ack_many(self, worker: str, items):
+        """
+        Remove several processed items in one pipeline round trip.
+        """
+        if not items:
+            return 0
+        processing = self.processing_key(worker)
+        pipeline = self.connection.pipeline(transaction=False)
+        for item in items:
+            pipeline.lrem(processing, 1, item)
+        return sum(pipeline.execute())
+
+    def reject(self, worker: str, item, requeue: bool = True):
+        """
+        Remove an item from the processing list of `worker`, putting it back at the tail of the queue if `requeue`.
+        """
+        pipeline = self._pipeline()
+        pipeline.lrem(self.processing_key(worker), 1, item)
+        if requeue:
+            pipeline.rpush(self.key, item)
+        return pipeline.execute()[0]
+
+    def start_consuming(
+        self,
+        worker: str,
+        callback: Callable,
+        count: int = 1,
+        timeout: int = 1000,
+    ):
+        """
+        Start consuming items from the queue.
+
+        :param worker: The name of the worker，please use a unique value
+        :param callback: Called with every item, it must `ack` or `reject` the item
+        :param count: Number of items moved per round trip
+        :param timeout: Blocking time when the queue is empty. Unit is millisecond, 0 is infinite blocking
+        """
+        while not self._shutdown:
+            try:
+                for item in self.consume(worker, count, timeout=timeout):
+                    callback(item)
+            except redis.RedisError as e:
+                logger.error(f"Error consuming items: {e}")
+                time.sleep(self.RECONNECTION_DELAY)
+
+    def leave(self, worker: str):
+        """
+        Return the unacked items of `worker` to the queue and forget the worker.
+        """
+        return self.run_script(
+            "list_requeue",
+            (self.key, self.processing_key(worker), self.workers_key),
+            (worker, sys.maxsize),
+        )
@@ -0,0 +1,235 @@
+import logging
+import random
+import threading
+import time
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+# 失败转移期间常见的瞬时错误：连接断开、超时、旧主节点降级为只读副本
+TRANSIENT_ERRORS = (
+    redis.ConnectionError,
+    redis.TimeoutError,
+    redis.exceptions.ReadOnlyError,
+)
+
+# 重复执行不会改变结果的命令；INCR、LPUSH、XADD 等命令在应答丢失时可能已经执行，不能自动重试。
+# SET（NX/GET）、ZADD（INCR）依参数而定；XREADGROUP 会推进 last-delivered-id，XCLAIM/XAUTOCLAIM
+# 会增加投递次数，XGROUP 的子命令大多不可重复执行，因此都不在其中
+# fmt: off
+IDEMPOTENT_COMMANDS = frozenset(
+    {
+        "PING", "ECHO", "INFO", "TYPE", "EXISTS", "TTL", "PTTL", "SCAN", "KEYS",
+        "GET", "MGET", "STRLEN", "GETRANGE", "MSET", "DEL", "UNLINK",
+        "EXPIRE", "PEXPIRE", "EXPIREAT", "PEXPIREAT", "PERSIST",
+        "HGET", "HMGET", "HGETALL", "HKEYS", "HVALS", "HLEN", "HEXISTS", "HSTRLEN",
+        "HSCAN", "HRANDFIELD", "HSET", "HMSET", "HSETNX", "HDEL",
+        "SADD", "SREM", "SISMEMBER", "SMISMEMBER", "SMEMBERS", "SCARD", "SSCAN",
+        "SRANDMEMBER", "SINTER", "SUNION", "SDIFF", "SINTERSTORE", "SUNIONSTORE",
+        "SDIFFSTORE",
+        "LRANGE", "LLEN", "LINDEX", "LPOS", "LSET", "LTRIM",
+        "ZREM", "ZRANGE", "ZRANGEBYSCORE", "ZREMRANGEBYSCORE", "ZSCORE",
+        "ZCARD", "ZRANK",
+        "XACK", "XDEL", "XTRIM", "XLEN", "XRANGE", "XREVRANGE", "XREAD",
+        "XPENDING", "XINFO",
+    }
+)
+# fmt: on
+
+
+class CircuitOpenError(redis.ConnectionError):
+    """
+    Raised without contacting Redis while the circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Fails fast after `failure_threshold` consecutive transient errors, for `reset_timeout` seconds.
+
+    Once the timeout has passed one call is let through: its success closes the circuit, its failure opens it again.
+    A trial call still running after another `reset_timeout` (e.g. a blocking XREADGROUP) no longer holds the slot.
+    Share one instance between stores talking to the same server so they trip together.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10):
+        """
+        :param failure_threshold: Consecutive failures opening the circuit
+        :param reset_timeout: Seconds the circuit stays open before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_at = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow(self):
+        """
+        Raise `CircuitOpenError` if calls are not allowed right now.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            now = time.monotonic()
+            # 半开：只放行一个试探请求；试探请求可能是阻塞命令，超过 reset_timeout 未返回时再放行一个
+            if now - self._opened_at >= self.reset_timeout and (
+                self._trial_at is None or now - self._trial_at >= self.reset_timeout
+            ):
+                self._trial_at = now
+                return
+        raise CircuitOpenError(
+            "circuit breaker is open, Redis is considered unavailable"
+        )
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            trial = self._trial_at is not None
+            if trial or self._failures >= self.failure_threshold:
+                if self._opened_at is None or trial:
+                    logger.warning(
+                        f"circuit breaker opened after {self._failures} failures"
+                    )
+                self._opened_at = time.monotonic()
+                self._trial_at = None
+
+
+_circuit_breakers = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def shared_circuit_breaker(parameters) -> CircuitBreaker:
+    """
+    The circuit breaker shared by every store talking to the server of `parameters`.
+    """
+    key = tuple(parameters.get(name) for name in ("host", "port", "unix_socket_path"))
+    with _circuit_breakers_lock:
+        breaker = _circuit_breakers.get(key)
+        if breaker is None:
+            breaker = _circuit_breakers[key] = CircuitBreaker()
+        return breaker
+
+
+class Retry:
+    """
+    Retries idempotent commands and pipelines on transient errors with jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 6,
+        base_delay: float = 0.05,
+        max_delay: float = 2,
+        circuit_breaker: CircuitBreaker = None,
+    ):
+        """
+        :param attempts: Maximum number of attempts of one command, 1 disables retrying
+        :param base_delay: Backoff before the second attempt (seconds), doubled on every further attempt
+        :param max_delay: Upper bound of the backoff (seconds)
+        :param circuit_breaker: Breaker consulted before every attempt, None disables it
+        """
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.circuit_breaker = circuit_breaker
+
+    def backoff(self, attempt: int) -> float:
+        """
+        "Full jitter" delay before attempt `attempt + 1`, so clients recovering together do not retry in lockstep.
+        """
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    @staticmethod
+    def is_idempotent(command) -> bool:
+        if isinstance(command, bytes):
+            command = command.decode()
+        return str(command).split(" ", 1)[0].upper() in IDEMPOTENT_COMMANDS
+
+    def call(self, func, *args, idempotent: bool = True, **kwargs):
+        """
+        Call `func`, retrying on transient errors when `idempotent`.
+        """
+        attempt = 1
+        while True:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.allow()
+            try:
+                result = func(*args, **kwargs)
+            except TRANSIENT_ERRORS as exc:
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record_failure()
+                if not idempotent or attempt >= self.attempts:
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning(
+                    f"Redis command error<{exc}>; retrying in {delay:.3f} seconds"
+                )
+                time.sleep(delay)
+                attempt += 1
+            except Exception:
+                # 其他错误（如 ResponseError）说明服务端可达，也要结束半开状态的试探
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record_success()
+                raise
+            else:
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record_success()
+                return result
+
+    def instrument(self, client):
+        """
+        Route every command (and pipeline) sent through `client` via `call`.
+        """
+        execute_command = client.execute_command
+        pipeline = client.pipeline
+
+        def retrying_execute_command(*args, **options):
+            idempotent = bool(args) and self.is_idempotent(args[0])
+            return self.call(execute_command, *args, idempotent=idempotent, **options)
+
+        def retrying_pipeline(*args, **kwargs):
+            pipe = pipeline(*args, **kwargs)
+            execute = pipe.execute
+
+            def retrying_execute(*args, **kwargs):
+                # 执行失败后 redis-py 会清空命令栈，重试前需要恢复
+                stack = list(pipe.command_stack)
+                idempotent = all(
+                    self.is_idempotent(_command_args(command)[0]) for command in stack
+                )
+
+                def attempt():
+                    pipe.command_stack = list(stack)
+                    return execute(*args, **kwargs)
+
+                return self.call(attempt, idempotent=idempotent)
+
+            pipe.execute = retrying_execute
+            return pipe
+
+        client.execute_command = retrying_execute_command
+        client.pipeline = retrying_pipeline
+        return client
+
+
+def _command_args(command):
+    # Pipeline 的命令为 (args, options) 元组，ClusterPipeline 的命令为带 args 属性的对象
+    return getattr(command, "args", None) or command[0]
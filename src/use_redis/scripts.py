@@ -0,0 +1,134 @@
+import hashlib
+import threading
+
+import redis
+
+# 从列表头部最多弹出 ARGV[1] 个元素并追加到 KEYS[2] 尾部，返回被移动的元素
+LIST_POP_MANY_TO = """
+local items = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+if #items == 0 then
+    return items
+end
+redis.call('LTRIM', KEYS[1], #items, -1)
+for i = 1, #items, 1000 do
+    redis.call('RPUSH', KEYS[2], unpack(items, i, math.min(i + 999, #items)))
+end
+return items
+"""
+
+# 工作者 ARGV[1] 的心跳早于 ARGV[2] 时，将其处理中列表 KEYS[2] 的元素按原顺序放回队列 KEYS[1] 头部，
+# 并从心跳有序集合 KEYS[3] 中移除该工作者；返回放回的元素个数
+LIST_REQUEUE = """
+local seen = redis.call('ZSCORE', KEYS[3], ARGV[1])
+if seen and tonumber(seen) > tonumber(ARGV[2]) then
+    return 0
+end
+local count = 0
+while redis.call('RPOPLPUSH', KEYS[2], KEYS[1]) do
+    count = count + 1
+end
+redis.call('ZREM', KEYS[3], ARGV[1])
+return count
+"""
+
+# 将 ARGV 中属于 KEYS[1] 的成员移动到 KEYS[2]，返回实际被移动的成员
+SET_MOVE_MANY = """
+local moved = {}
+for _, member in ipairs(ARGV) do
+    if redis.call('SMOVE', KEYS[1], KEYS[2], member) == 1 then
+        moved[#moved + 1] = member
+    end
+end
+return moved
+"""
+
+# 增加后的值仍在 [ARGV[3], ARGV[4]] 内时才增加（空字符串表示不限制），否则返回 nil
+HASH_INCREMENT_WITHIN = """
+local value = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0')
+local result = value + tonumber(ARGV[2])
+if (ARGV[3] ~= '' and result < tonumber(ARGV[3])) or (ARGV[4] ~= '' and result > tonumber(ARGV[4])) then
+    return nil
+end
+if ARGV[5] == 'float' then
+    return redis.call('HINCRBYFLOAT', KEYS[1], ARGV[1], ARGV[2])
+end
+return redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+"""
+
+
+# 租约 KEYS[1] 无人持有或由 ARGV[1] 持有时，设为 ARGV[1] 并续期 ARGV[2] 毫秒，返回 1；否则返回 0
+LEASE_ACQUIRE = """
+local owner = redis.call('GET', KEYS[1])
+if owner and owner ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+return 1
+"""
+
+# 租约 KEYS[1] 由 ARGV[1] 持有时续期 ARGV[2] 毫秒，返回 1；否则返回 0
+LEASE_RENEW = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# 租约 KEYS[1] 由 ARGV[1] 持有时删除，返回 1；否则返回 0
+LEASE_RELEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class ScriptRegistry:
+    """
+    Named Lua scripts, called with EVALSHA and loaded with SCRIPT LOAD only when the server answers NOSCRIPT.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._scripts = {}
+
+    def register(self, name: str, source: str) -> str:
+        """
+        Register `source` under `name`.
+
+        :return: The SHA1 digest of the script
+        """
+        sha = hashlib.sha1(source.encode()).hexdigest()
+        with self._lock:
+            registered = self._scripts.get(name)
+            if registered is not None and registered[0] != sha:
+                raise ValueError(f"script {name} is already registered")
+            self._scripts[name] = (sha, source)
+        return sha
+
+    def __contains__(self, name):
+        return name in self._scripts
+
+    def call(self, client, name: str, keys=(), args=()):
+        """
+        Run the script `name` on `client` in one round trip (two after a server restart or SCRIPT FLUSH).
+        """
+        try:
+            sha, source = self._scripts[name]
+        except KeyError:
+            raise ValueError(f"unknown script: {name}") from None
+        try:
+            return client.evalsha(sha, len(keys), *keys, *args)
+        except redis.exceptions.NoScriptError:
+            client.script_load(source)
+            return client.evalsha(sha, len(keys), *keys, *args)
+
+
+script_registry = ScriptRegistry()
+script_registry.register("list_pop_many_to", LIST_POP_MANY_TO)
+script_registry.register("list_requeue", LIST_REQUEUE)
+script_registry.register("set_move_many", SET_MOVE_MANY)
+script_registry.register("hash_increment_within", HASH_INCREMENT_WITHIN)
+script_registry.register("lease_acquire", LEASE_ACQUIRE)
+script_registry.register("lease_renew", LEASE_RENEW)
+script_registry.register("lease_release", LEASE_RELEASE)
@@ -1,22 +1,101 @@
+import contextlib
+import threading
+import time
+
+import redis
+
+from .cache import InvalidationListener
+from .cluster import group_by_slot
+from .iterators import paginate
 from .store import RedisStore
 
 
 class RedisSetStore(RedisStore):
-    def __init__(self, key, **kwargs):
+    def __init__(self, key, replica=False, replica_ttl=None, **kwargs):
+        """
+        :param key: 集合的键
+        :param replica: 开启后在本地保存集合的完整副本，is_member/are_members 直接查内存；
+            副本以 SSCAN 分页加载，由 Redis CLIENT TRACKING 推送的失效通知触发重新加载，只适合中小规模的集合
+        :param replica_ttl: 副本的最长使用时间（秒），到期后重新加载，None 表示只依赖失效通知
+        """
         super().__init__(**kwargs)
         self._key = key
+        self.replica = replica
+        self.replica_ttl = replica_ttl
+        self._replica = None
+        self._replica_loaded_at = 0
+        self._replica_generation = 0
+        self._replica_lock = threading.Lock()
+        self._listener = None
+        # 成员统一编码为 bytes 比较，使 1 与 "1" 等价，与 Redis 的编码方式一致
+        self._encoder = redis.connection.Encoder(
+            self.parameters.get("encoding", "utf-8"),
+            self.parameters.get("encoding_errors", "strict"),
+            False,
+        )
 
     @property
     def key(self):
         return self._key
 
+    def _members_replica(self):
+        """返回可用的本地副本，副本不可用时返回 None"""
+        if not self.replica:
+            return None
+        if self._listener is None:
+            self._listener = InvalidationListener.for_store(
+                self, self._invalidate_replica
+            )
+        if not self._listener.ready.is_set():
+            # 失效通知通道未就绪时副本可能不一致，直接查 Redis
+            return None
+        replica = self._replica
+        if self._replica_is_fresh(replica):
+            return replica
+        with self._replica_lock:
+            # 等待锁期间其他线程可能已经重新加载，避免每个线程各自执行一次完整的 SSCAN
+            replica = self._replica
+            if self._replica_is_fresh(replica):
+                return replica
+            generation = self._replica_generation
+            loaded_at = time.monotonic()
+            replica = frozenset(
+                self._encoder.encode(member) for member in self.iter_members()
+            )
+            # 加载期间收到过失效通知，本次结果可能已过期，只用于本次查询
+            if generation == self._replica_generation:
+                self._replica = replica
+                self._replica_loaded_at = loaded_at
+        return replica
+
+    def _replica_is_fresh(self, replica):
+        return replica is not None and (
+            self.replica_ttl is None
+            or time.monotonic() - self._replica_loaded_at < self.replica_ttl
+        )
+
+    def _invalidate_replica(self):
+        self._replica_generation += 1
+        self._replica = None
+
+    @contextlib.contextmanager
+    def _invalidating_replica(self):
+        """写入前后各失效一次本地副本：写入期间并发加载的副本可能不包含本次修改"""
+        self._invalidate_replica()
+        try:
+            yield
+        finally:
+            self._invalidate_replica()
+
     def add(self, *values):
         """向集合中添加一个或多个成员"""
-        return self.connection.sadd(self.key, *values)
+        with self._invalidating_replica():
+            return self.connection.sadd(self.key, *values)
 
     def remove(self, *values):
         """从集合中移除一个或多个成员"""
-        return self.connection.srem(self.key, *values)
+        with self._invalidating_replica():
+            return self.connection.srem(self.key, *values)
 
     def members(self):
         """返回集合中的所有成员"""
@@ -24,11 +103,29 @@ class RedisSetStore(RedisStore):
 
     def is_member(self, value):
         """判断value是否是集合的成员"""
+        replica = self._members_replica()
+        if replica is not None:
+            return self._encoder.encode(value) in replica
         return self.connection.sismember(self.key, value)
 
     def are_members(self, *values):
-        """判断多个value是否是集合的成员"""
-        return self.connection.sismember(self.key, *values)
+        """判断多个value是否是集合的成员，按顺序返回 bool 列表"""
+        if not values:
+            return []
+        replica = self._members_replica()
+        if replica is not None:
+            return [self._encoder.encode(value) in replica for value in values]
+        results = self.connection.smismember(self.key, values)
+        return [bool(result) for result in results]
+
+    def replica_info(self):
+        """返回本地副本的状态"""
+        return {
+            "enabled": self.replica,
+            "ready": self._listener is not None and self._listener.ready.is_set(),
+            "size": None if self._replica is None else len(self._replica),
+            "generation": self._replica_generation,
+        }
 
     def size(self):
         """返回集合的成员数"""
@@ -36,23 +133,43 @@ class RedisSetStore(RedisStore):
 
     def pop(self):
         """随机移除并返回集合中的一个成员"""
-        return self.connection.spop(self.key)
+        with self._invalidating_replica():
+            return self.connection.spop(self.key)
 
     def move(self, dst_key, value):
         """将成员从当前集合移动到另一个集合"""
-        return self.connection.smove(self.key, dst_key, value)
+        with self._invalidating_replica():
+            return self.connection.smove(self.key, dst_key, value)
+
+    def move_many(self, dst_key, *values):
+        """原子地将多个成员从当前集合移动到另一个集合，返回实际被移动的成员"""
+        if not values:
+            return []
+        with self._invalidating_replica():
+            return self.run_script("set_move_many", (self.key, dst_key), values)
+
+    def _combine(self, command, operation, other_keys):
+        keys = (self.key, *other_keys)
+        if self.cluster and len(group_by_slot(keys)) > 1:
+            # 集群中跨槽的多键命令会报 CROSSSLOT：并行读取各集合后在本地计算
+            pipeline = self._pipeline(transaction=False)
+            for key in keys:
+                pipeline.smembers(key)
+            first, *others = pipeline.execute()
+            return operation(first, *others)
+        return getattr(self.connection, command)(*keys)
 
     def intersection(self, *other_keys):
         """返回当前集合与其他集合的交集"""
-        return self.connection.sinter(self.key, *other_keys)
+        return self._combine("sinter", set.intersection, other_keys)
 
     def union(self, *other_keys):
         """返回当前集合与其他集合的并集"""
-        return self.connection.sunion(self.key, *other_keys)
+        return self._combine("sunion", set.union, other_keys)
 
     def difference(self, *other_keys):
         """返回当前集合与其他集合的差集"""
-        return self.connection.sdiff(self.key, *other_keys)
+        return self._combine("sdiff", set.difference, other_keys)
 
     def random_member(self):
         """随机返回集合中的一个成员，但不删除"""
@@ -62,11 +179,35 @@ class RedisSetStore(RedisStore):
         """迭代集合中的元素"""
         return self.connection.sscan(self.key, cursor, match, count)
 
+    def iter_members(self, match=None, page_size=None, prefetch=False):
+        """
+        以 SSCAN 分页惰性迭代集合中的成员
+
+        :param match: 成员匹配模式
+        :param page_size: 每页数量（COUNT），None 表示根据每页耗时自适应调整
+        :param prefetch: 调用方处理当前页时，是否在后台线程预取下一页
+        """
+
+        def fetch(cursor, count):
+            cursor, page = self.connection.sscan(self.key, cursor, match, count)
+            return (cursor or None), page
+
+        return paginate(fetch, 0, page_size, prefetch)
+
+    def shutdown(self):
+        listener = self.__dict__.get("_listener")
+        if listener is not None:
+            listener.stop()
+            self._listener = None
+        super().shutdown()
+
     def __getattr__(self, name):
         """动态处理未实现的方法"""
 
         def method(*args, **kwargs):
-            redis_method = getattr(self.connection, name)
-            return redis_method(self.key, *args, **kwargs)
+            # 动态方法可能修改集合
+            with self._invalidating_replica():
+                redis_method = getattr(self.connection, name)
+                return redis_method(self.key, *args, **kwargs)
 
         return method
@@ -1,7 +1,13 @@
 import logging
+import random
 import time
 
 import redis
+import redis.cluster
+
+from .pool import pool_registry
+from .retry import Retry, shared_circuit_breaker
+from .scripts import script_registry
 
 logger = logging.Logger(__name__)
 
@@ -12,12 +18,32 @@ class RedisStore:
     MAX_CONNECTION_DELAY = 2**5
     RECONNECTION_DELAY = 1
 
-    def __init__(self, *, host=None, port=None, password=None, **kwargs):
+    def __init__(
+        self,
+        *,
+        host=None,
+        port=None,
+        password=None,
+        shared_pool=True,
+        pool_idle_timeout=None,
+        metrics=None,
+        cluster=False,
+        command_retry=None,
+        **kwargs,
+    ):
         """
         :param host: Redis host
         :param port: Redis port
         :param password: Redis password
-        :param kwargs: Redis parameters
+        :param shared_pool: Whether to share one connection pool with every store using the same parameters
+        :param pool_idle_timeout: Seconds an idle pooled connection is kept open, None keeps it forever
+        :param metrics: A `use_redis.metrics.Metrics` recording command latency and errors, None disables it
+        :param cluster: Connect to a Redis Cluster with `redis.cluster.RedisCluster`, host/port being any startup node.
+            Keys built with `use_redis.cluster.hash_tag` share a slot; transactions are replaced by plain pipelines.
+        :param command_retry: A `use_redis.retry.Retry` applied to every command, None retries idempotent commands
+            up to `MAX_SEND_ATTEMPTS` times behind a circuit breaker shared by all stores of the same server,
+            False disables retrying
+        :param kwargs: Redis parameters, including redis-py's own `retry`
         """
         self._shutdown = False
         self.parameters = {
@@ -28,26 +54,62 @@ class RedisStore:
         }
         if kwargs:
             self.parameters.update(kwargs)
+        self.shared_pool = shared_pool
+        self.pool_idle_timeout = pool_idle_timeout
+        self.metrics = metrics
+        self.cluster = cluster
+        if command_retry is None:
+            command_retry = Retry(
+                self.MAX_SEND_ATTEMPTS,
+                circuit_breaker=shared_circuit_breaker(self.parameters),
+            )
+        self.command_retry = command_retry or None
         self._connection = None
 
+    @property
+    def pool(self):
+        """
+        The shared connection pool of this store, None if it uses a private one.
+        """
+        if not self.shared_pool or self.cluster:
+            # 集群客户端为每个节点维护各自的连接池
+            return None
+        return pool_registry.get_pool(self.parameters, self.pool_idle_timeout)
+
     def _create_connection(self):
         attempts = 1
         reconnection_delay = self.RECONNECTION_DELAY
+        pool = self.pool
         while attempts <= self.MAX_CONNECTION_ATTEMPTS:
             try:
-                connector = redis.Redis(**self.parameters)
+                if self.cluster:
+                    connector = redis.cluster.RedisCluster(**self.parameters)
+                elif pool is None:
+                    connector = redis.Redis(**self.parameters)
+                else:
+                    connector = redis.Redis(connection_pool=pool)
+                    if pool.verified:
+                        # 同一连接池已连通过，新建 store 无需再 ping
+                        return connector
                 connector.ping()
+                if pool is not None:
+                    pool.verified = True
                 if attempts > 1:
                     logger.warning(
                         f"RedisStore connection succeeded after {attempts} attempts",
                     )
                 return connector
-            except redis.ConnectionError as exc:
+            except (
+                redis.ConnectionError,
+                redis.exceptions.RedisClusterException,
+            ) as exc:
+                # 集群的所有启动节点都不可达时抛出 RedisClusterException
                 logger.warning(
                     f"RedisStore connection error<{exc}>; retrying in {reconnection_delay} seconds"
                 )
                 attempts += 1
-                time.sleep(reconnection_delay)
+                # 加入抖动，避免故障恢复后所有客户端同时重连
+                time.sleep(reconnection_delay * random.uniform(0.5, 1.5))
                 reconnection_delay = min(
                     reconnection_delay * 2, self.MAX_CONNECTION_DELAY
                 )
@@ -56,7 +118,13 @@ class RedisStore:
     @property
     def connection(self):
         if self._connection is None:
-            self._connection = self._create_connection()
+            connection = self._create_connection()
+            if self.metrics is not None:
+                connection = self.metrics.instrument(connection)
+            if self.command_retry is not None:
+                # 在 metrics 之外包装，每次尝试都会被单独记录
+                connection = self.command_retry.instrument(connection)
+            self._connection = connection
         return self._connection
 
     @connection.deleter
@@ -68,6 +136,22 @@ class RedisStore:
                 logger.exception(f"RedisStore connection close error<{exc}>")
             self._connection = None
 
+    def _pipeline(self, transaction=True):
+        """
+        A pipeline, transactional only outside cluster mode (RedisCluster pipelines cannot use MULTI).
+
+        In cluster mode the queued commands are grouped by node and written to all nodes before any reply is read.
+        """
+        return self.connection.pipeline(transaction=transaction and not self.cluster)
+
+    def run_script(self, name, keys=(), args=()):
+        """
+        Run a Lua script registered in `use_redis.scripts.script_registry` with EVALSHA.
+
+        In cluster mode all `keys` must share a slot.
+        """
+        return script_registry.call(self.connection, name, keys, args)
+
     def shutdown(self):
         self._shutdown = True
         del self.connection
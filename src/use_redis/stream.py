@@ -1,29 +1,76 @@
+import collections
+import datetime
+import itertools
 import json
 import logging
+import queue
 import threading
 import time
-from typing import Callable, List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Union
 
 import redis
 
+from .adaptive import AdaptivePrefetch, FixedPrefetch
+from .backpressure import Backpressure
+from .codec import Codec, get_codec
+from .iterators import paginate
 from .store import RedisStore
+from .trim import StreamTrimmer, _format_id, _parse_id
 
 logger = logging.getLogger(__name__)
 
+# 每个回放分段最多预读的页数，限制按序回放时后续分段占用的内存
+REPLAY_QUEUE_PAGES = 4
+
 
 class RedisStreamMessage:
     """
     A message from the Redis stream.
     """
 
-    def __init__(self, id, body, stream, group):
-        self.stream = stream
-        self.group = group
+    # prefetch 批量较大时逐条分配对象开销明显：使用 __slots__ 去掉实例 __dict__，
+    # 并让同一批次的消息共享一个 (stream, group, codec) 元组
+    __slots__ = ("id", "_body", "_batch")
+
+    def __init__(self, id, body, stream, group, codec=None):
         self.id = id
-        self.body = body
+        # 配置了 codec 时 body 为原始字段，首次访问时才解码
+        self._body = body
+        self._batch = (stream, group, codec)
+
+    @property
+    def stream(self):
+        return self._batch[0]
+
+    @stream.setter
+    def stream(self, value):
+        # 批次元组为同批消息共享，修改时替换为本消息自己的元组
+        self._batch = (value,) + self._batch[1:]
+
+    @property
+    def group(self):
+        return self._batch[1]
+
+    @group.setter
+    def group(self, value):
+        self._batch = (self._batch[0], value, self._batch[2])
+
+    @property
+    def body(self):
+        codec = self._batch[2]
+        if codec is not None:
+            self._body = codec.decode_fields(self._body)
+            self._batch = self._batch[:2] + (None,)
+        return self._body
+
+    @body.setter
+    def body(self, value):
+        self._body = value
+        self._batch = self._batch[:2] + (None,)
 
     @staticmethod
-    def from_xread(raw_messages, *, group):
+    def from_xread(raw_messages, *, group, codec=None):
         """
         Parse a raw message from the Redis stream xread[group] respond.
         """
@@ -32,16 +79,16 @@ class RedisStreamMessage:
         if not group:
             raise ValueError("group is required")
 
+        message = _BatchedMessage
         result = []
         for stream, messages in raw_messages:
-            result.extend(
-                RedisStreamMessage(id, body, stream, group) for id, body in messages
-            )
+            batch = (stream, group, codec)
+            result += [message(id, body, batch) for id, body in messages]
 
         return result
 
     @staticmethod
-    def from_xclaim(raw_messages, *, stream, group):
+    def from_xclaim(raw_messages, *, stream, group, codec=None):
         """
         Parse a raw message from the Redis stream xclaim respond.
         """
@@ -52,15 +99,20 @@ class RedisStreamMessage:
         if not group:
             raise ValueError("group is required")
 
-        return [
-            RedisStreamMessage(id, body, stream, group) for id, body in raw_messages
-        ]
+        message = _BatchedMessage
+        batch = (stream, group, codec)
+        return [message(id, body, batch) for id, body in raw_messages]
 
     def to_dict(self):
-        return {k: v for k, v in self.__dict__.items() if not k.startswith("_")}
+        return {
+            "id": self.id,
+            "body": self.body,
+            "stream": self.stream,
+            "group": self.group,
+        }
 
     def to_json(self):
-        return json.dumps(self.to_dict())
+        return json.dumps(self.to_dict(), default=_json_default)
 
     def __str__(self):
         return self.to_json()
@@ -71,7 +123,55 @@ class RedisStreamMessage:
         )
 
 
+class _BatchedMessage(RedisStreamMessage):
+    """
+    A message parsed from a Redis response, sharing its batch tuple with the rest of the response.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, id, body, batch):
+        self.id = id
+        self._body = body
+        self._batch = batch
+
+
+def _split_dead_letters(stream, messages, pending, max_deliveries):
+    """
+    Split claimed messages of `stream` into those still to be consumed and the dead letters, given their XPENDING entries.
+
+    Dead letters carry their original fields plus "_stream", "_id" and "_deliveries".
+    """
+    deliveries = {entry["message_id"]: entry["times_delivered"] for entry in pending}
+    alive, dead = [], []
+    for id, fields in messages:
+        if deliveries.get(id, 0) > max_deliveries:
+            extra = {"_stream": stream, "_id": id, "_deliveries": deliveries[id]}
+            dead.append((id, {**(fields or {}), **extra}))
+        else:
+            alive.append((id, fields))
+    return alive, dead
+
+
+def _to_stream_id(value):
+    if isinstance(value, datetime.datetime):
+        value = int(value.timestamp() * 1000)
+    if isinstance(value, int):
+        return str(value)
+    return value
+
+
+def _json_default(value):
+    # bytes 模式下 id、stream 为 bytes
+    if isinstance(value, bytes):
+        return value.decode(errors="replace")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
 class RedisStreamStore(RedisStore):
+    LAG_SAMPLE_INTERVAL = 10000
+    PENDING_SYNC_INTERVAL = 5000
+
     def __init__(
         self,
         *,
@@ -80,6 +180,18 @@ class RedisStreamStore(RedisStore):
         stream_max_entries: int = 0,
         redeliver_timeout: int = 60000,
         claim_interval: int = 1800000,
+        ack_batch_size: int = 0,
+        ack_flush_interval: int = 1000,
+        delete_on_ack: bool = False,
+        track_pending: bool = False,
+        codec: Union[str, Codec, None] = None,
+        max_deliveries: int = 0,
+        dead_letter_stream: Optional[str] = None,
+        backpressure: Optional[Backpressure] = None,
+        retention: Optional[int] = None,
+        trim_consumed: bool = False,
+        trim_max_entries: Optional[int] = None,
+        trim_interval: int = 10000,
         **kwargs,
     ):
         """
@@ -91,17 +203,66 @@ class RedisStreamStore(RedisStore):
         :param stream_max_entries: any value higher than 0 defines an approximate maximum number of stream entries
         :param redeliver_timeout: Timeout before redeliver messages still in pending state (seconds)
         :param claim_interval: Interval by which pending/abandoned messages should be checked
+        :param ack_batch_size: any value higher than 0 buffers acks and sends them as one XACK once this many are queued
+        :param ack_flush_interval: Maximum time a buffered ack waits before being flushed (milliseconds)
+        :param delete_on_ack: Whether to XDEL acknowledged entries in the same pipeline as the XACK
+        :param track_pending: Count unacknowledged messages locally instead of asking the server with XPENDING
+            on every consume. Only messages delivered by `consume` and acked through this store are counted;
+            every `PENDING_SYNC_INTERVAL` milliseconds messages no longer pending for the consumer on the server
+            (claimed by another process, acked elsewhere) are forgotten.
+        :param codec: Body codec ("json", "orjson", "msgpack", optionally with "+zstd"/"+lz4") or a Codec instance.
+            Bodies are encoded into one field on send and decoded on first access to `message.body`;
+            binary codecs switch the connection to bytes mode (decode_responses=False).
+        :param max_deliveries: any value higher than 0 moves a claimed message delivered more than this many times
+            to the dead-letter stream and acks it, instead of handing it to the consumer again
+        :param dead_letter_stream: The stream receiving dead letters, defaults to "{stream}:dead". Entries keep the
+            original fields plus "_stream", "_id" and "_deliveries"; it is not capped by `stream_max_entries`.
+        :param backpressure: Throttle `send`/`send_many` while the group backlog is above its high-water mark,
+            so consumers falling behind neither exhaust Redis memory nor lose entries to `stream_max_entries` trimming
+        :param retention: any value higher than 0 trims entries older than this many milliseconds (XTRIM MINID)
+            in a background thread, see `use_redis.trim.StreamTrimmer`
+        :param trim_consumed: Trim entries every group has read and acked in a background thread,
+            never removing pending entries. Unlike `stream_max_entries`, background trimming adds nothing to XADD.
+        :param trim_max_entries: any value higher than 0 keeps about this many entries (XTRIM MAXLEN ~) in a background
+            thread, the background counterpart of `stream_max_entries`, which trims on every XADD
+        :param trim_interval: Interval between two background trims (milliseconds)
 
         """
+        self.codec = get_codec(codec)
+        if self.codec is not None and self.codec.binary:
+            kwargs["decode_responses"] = False
         super().__init__(**kwargs)
         self.stream = stream
         self.group = group
         self.max_entries = stream_max_entries if stream_max_entries > 0 else None
         self.redeliver_timeout = redeliver_timeout
         self.claim_interval = claim_interval
+        self.ack_batch_size = ack_batch_size
+        self.ack_flush_interval = ack_flush_interval
+        self.delete_on_ack = delete_on_ack
+        self.track_pending = track_pending
+        self.max_deliveries = max_deliveries
+        self.dead_letter_stream = dead_letter_stream or f"{stream}:dead"
+        self.backpressure = backpressure
+        self.trimmer = None
+        if retention or trim_consumed or trim_max_entries:
+            self.trimmer = StreamTrimmer(
+                self,
+                max_entries=trim_max_entries or None,
+                max_age=retention or None,
+                consumed=trim_consumed,
+                interval=trim_interval,
+            )
 
         self._auto_setup = True
         self.state = threading.local()
+        self._ack_buffer = []
+        self._ack_lock = threading.Lock()
+        self._ack_timer = None
+        # ack 释放名额时唤醒在 consume 中等待的线程
+        self._capacity = threading.Condition()
+        self._pending_owner = {}
+        self._pending_count = collections.Counter()
 
     def _setup(self):
         try:
@@ -113,6 +274,8 @@ class RedisStreamStore(RedisStore):
                 raise e
 
         self._auto_setup = False
+        if self.trimmer is not None:
+            self.trimmer.start()
 
     def send(self, message: dict):
         """
@@ -120,8 +283,44 @@ class RedisStreamStore(RedisStore):
         """
         if self._auto_setup:
             self._setup()
+        if self.backpressure is not None:
+            self.backpressure.acquire(self)
+        if self.codec is not None:
+            message = self.codec.encode_fields(message)
         return self.connection.xadd(self.stream, message, maxlen=self.max_entries)
 
+    def send_many(self, messages: Iterable[dict], chunk_size: int = 500) -> List[str]:
+        """
+        Send messages to the Redis stream, one pipeline round trip per chunk.
+
+        :param messages: Messages to send, consumed lazily so a generator never has to fit in memory
+        :param chunk_size: Number of XADDs per pipeline
+        :return: The ids of the added entries, in order
+        """
+        if self._auto_setup:
+            self._setup()
+
+        ids = []
+        messages = iter(messages)
+        while True:
+            chunk = list(itertools.islice(messages, chunk_size))
+            if not chunk:
+                break
+            if self.backpressure is not None:
+                self.backpressure.acquire(self, len(chunk))
+            pipeline = self.connection.pipeline(transaction=False)
+            for message in chunk:
+                if self.codec is not None:
+                    message = self.codec.encode_fields(message)
+                pipeline.xadd(self.stream, message)
+            if self.max_entries:
+                # 每个分块只裁剪一次，而不是每条 XADD 都带 MAXLEN
+                pipeline.xtrim(self.stream, maxlen=self.max_entries, approximate=True)
+                ids.extend(pipeline.execute()[:-1])
+            else:
+                ids.extend(pipeline.execute())
+        return ids
+
     def claim_old_pending_messages(
         self, consumer: str, count: int, min_idle_time: int
     ) -> Optional[List[RedisStreamMessage]]:
@@ -131,23 +330,74 @@ class RedisStreamStore(RedisStore):
         # https://redis.io/commands/xautoclaim/
         # 在迭代 PEL 时，如果偶然发现流中不再存在的消息（由 修剪 XDEL 或删除），它不会声明它 XAUTOCLAIM ，而是将其从找到它的 PEL 中删除。
         # 此功能在 Redis 7.0 中引入。这些消息 ID 作为回复的一部分 XAUTOCLAIM 返回给调用方。
-        _, messages, _ = self.connection.xautoclaim(
+        # 从上次返回的游标继续扫描，避免每次都从 PEL 头部重新扫描
+        next_id, messages, *_ = self.connection.xautoclaim(
             name=self.stream,
             groupname=self.group,
             consumername=consumer,
             min_idle_time=min_idle_time,
-            start_id="0",
+            start_id=getattr(self.state, "claim_cursor", "0-0"),
             count=count,
         )
         logger.debug(f"xautoclaim: {messages=}")
 
-        self.state.next_claim = time.time() * 1000 + self.claim_interval
-
+        if isinstance(next_id, bytes):
+            next_id = next_id.decode()
+        self.state.claim_cursor = next_id
+        if next_id == "0-0":
+            # 已扫描完整个 PEL，等待 claim_interval 后从头开始；否则下次 consume 继续扫描
+            self.state.next_claim = time.time() * 1000 + self.claim_interval
+
+        if messages and self.max_deliveries > 0:
+            messages = self._dead_letter(consumer, messages)
+        if messages and self.metrics is not None:
+            self._record("stream_messages_claimed_total", len(messages), consumer)
         if messages:
             return RedisStreamMessage.from_xclaim(
-                raw_messages=messages, stream=self.stream, group=self.group
+                raw_messages=messages,
+                stream=self.stream,
+                group=self.group,
+                codec=self.codec,
             )
 
+    def _dead_letter(self, consumer: str, messages: list) -> list:
+        """
+        Move claimed messages delivered more than `max_deliveries` times to the dead-letter stream.
+
+        :return: The messages still to be handed to the consumer
+        """
+        # XAUTOCLAIM 返回的消息按 id 升序排列
+        pending = self.connection.xpending_range(
+            self.stream,
+            self.group,
+            messages[0][0],
+            messages[-1][0],
+            len(messages),
+            consumer,
+        )
+        alive, dead = _split_dead_letters(
+            self.stream, messages, pending, self.max_deliveries
+        )
+        if not dead:
+            return alive
+
+        pipeline = self._pipeline()
+        for id, fields in dead:
+            # 死信流不按 stream_max_entries 截断，以免丢失待排查的消息
+            pipeline.xadd(self.dead_letter_stream, fields)
+        ids = [id for id, _ in dead]
+        pipeline.xack(self.stream, self.group, *ids)
+        if self.delete_on_ack:
+            pipeline.xdel(self.stream, *ids)
+        pipeline.execute()
+        self._release_pending(ids)
+        logger.warning(
+            f"moved {len(ids)} messages of {self.stream} to {self.dead_letter_stream}"
+        )
+        if self.metrics is not None:
+            self._record("stream_messages_dead_lettered_total", len(ids), consumer)
+        return alive
+
     def get(
         self, consumer: str, count: int = 1, block: Union[int, None] = None
     ) -> Optional[List[RedisStreamMessage]]:
@@ -166,9 +416,12 @@ class RedisStreamStore(RedisStore):
         )
         logger.debug(f"xreadgroup: {raw_messages=}")
         if raw_messages:
-            return RedisStreamMessage.from_xread(
-                raw_messages=raw_messages, group=self.group
+            messages = RedisStreamMessage.from_xread(
+                raw_messages=raw_messages, group=self.group, codec=self.codec
             )
+            if self.metrics is not None:
+                self._record("stream_messages_fetched_total", len(messages), consumer)
+            return messages
 
     def consume(
         self,
@@ -189,14 +442,15 @@ class RedisStreamStore(RedisStore):
         :return: List of messages consumed. If consumption fails, return []
         """
 
-        # 获取 当前消费者尚未ACK 的消息，最多获取  prefetch 个
-        pending_messages = self.connection.xpending_range(
-            self.stream, self.group, "-", "+", prefetch, consumer, 0
-        )
-        # 计算需获取的消息数量
-        need_count = prefetch - len(pending_messages) if pending_messages else prefetch
+        need_count = prefetch - self._count_pending(consumer, prefetch)
+        if need_count <= 0 and not self.track_pending and self._ack_buffer:
+            # 缓冲中尚未发送的 ack 在 XPENDING 中仍计为 pending，先发送再重新计算名额
+            self.flush_acks()
+            need_count = prefetch - self._count_pending(consumer, prefetch)
         if need_count <= 0:
-            time.sleep(1)  # 尚未ACK的消息过多，导致本次不获取，暂停1s再试
+            # 尚未ACK的消息过多，导致本次不获取；等待 ack 释放名额，最多 1s 后再试
+            with self._capacity:
+                self._capacity.wait(1)
             return []
 
         result = []
@@ -217,14 +471,75 @@ class RedisStreamStore(RedisStore):
             if messages:
                 result.extend(messages)
 
+        if self.track_pending and result:
+            self._track_delivered(consumer, result)
         return result
 
+    def _count_pending(self, consumer: str, prefetch: int) -> int:
+        if self.track_pending:
+            next_sync = getattr(self.state, "next_pending_sync", None)
+            now = time.time() * 1000
+            if next_sync is None:
+                self.state.next_pending_sync = now + self.PENDING_SYNC_INTERVAL
+            elif next_sync <= now:
+                self._sync_pending(consumer, prefetch)
+            with self._capacity:
+                return self._pending_count[consumer]
+        # 获取 当前消费者尚未ACK 的消息，最多获取  prefetch 个
+        pending_messages = self.connection.xpending_range(
+            self.stream, self.group, "-", "+", prefetch, consumer, 0
+        )
+        return len(pending_messages) if pending_messages else 0
+
+    def _sync_pending(self, consumer: str, prefetch: int):
+        """
+        Forget locally counted messages of `consumer` that the server no longer lists as pending for it.
+        """
+        self.state.next_pending_sync = time.time() * 1000 + self.PENDING_SYNC_INTERVAL
+        with self._capacity:
+            if not self._pending_count[consumer]:
+                return
+        entries = self.connection.xpending_range(
+            self.stream, self.group, "-", "+", prefetch, consumer
+        )
+        if len(entries) >= prefetch:
+            # 服务端的列表被 prefetch 截断，无法判断哪些消息已不属于该消费者
+            return
+        ids = {entry["message_id"] for entry in entries}
+        with self._capacity:
+            for id, owner in list(self._pending_owner.items()):
+                if owner == consumer and id not in ids:
+                    del self._pending_owner[id]
+                    self._pending_count[consumer] -= 1
+            self._capacity.notify_all()
+
+    def _track_delivered(self, consumer: str, messages: List[RedisStreamMessage]):
+        with self._capacity:
+            for message in messages:
+                owner = self._pending_owner.get(message.id)
+                if owner == consumer:
+                    continue
+                if owner is not None:
+                    self._pending_count[owner] -= 1
+                self._pending_owner[message.id] = consumer
+                self._pending_count[consumer] += 1
+
+    def _release_pending(self, ids):
+        with self._capacity:
+            for id in ids:
+                owner = self._pending_owner.pop(id, None)
+                if owner is not None:
+                    self._pending_count[owner] -= 1
+            self._capacity.notify_all()
+
     def start_consuming(
         self,
         consumer: str,
         callback: Callable,
         prefetch: int = 1,
         timeout: int = 1000,
+        workers: int = 0,
+        adaptive: Optional[AdaptivePrefetch] = None,
         **kwargs,
     ):
         """
@@ -234,10 +549,24 @@ class RedisStreamStore(RedisStore):
         :param callback: Callback function
         :param prefetch: Number of prefetches
         :param timeout: Blocking time of the Xread. Unit is millisecond, 0 is infinite blocking
+        :param workers: Number of threads running callbacks concurrently, 0 runs them on the polling thread.
+            At most `prefetch` messages are in flight; new messages are fetched as soon as a slot frees up.
+        :param adaptive: Resize prefetch and workers from the group lag and callback latency, `prefetch` and `workers`
+            are then ignored
         """
+        if self.metrics is not None:
+            callback = self._timed_callback(consumer, callback)
+
+        if adaptive is None and workers > 0:
+            adaptive = FixedPrefetch(prefetch, workers)
+        if adaptive is not None:
+            return self._start_consuming_with_workers(
+                consumer, callback, adaptive, timeout, **kwargs
+            )
 
         while not self._shutdown:
             try:
+                self._maybe_sample_lag()
                 messages = self.consume(consumer, prefetch, timeout=timeout, **kwargs)
                 for message in messages:
                     callback(message)
@@ -245,14 +574,383 @@ class RedisStreamStore(RedisStore):
                 logger.error(f"Error consuming messages: {e}")
                 time.sleep(self.RECONNECTION_DELAY)
 
+    def _start_consuming_with_workers(
+        self,
+        consumer: str,
+        callback: Callable,
+        sizing: Union[AdaptivePrefetch, FixedPrefetch],
+        timeout: int,
+        **kwargs,
+    ):
+        """
+        Fetch messages on this thread and run callbacks on a pool of threads sized by `sizing`.
+
+        At most `sizing.prefetch` messages are in flight; new messages are fetched as soon as a slot frees up.
+        Every `sizing.interval` milliseconds (never if None) prefetch and pool are resized from the group lag.
+        """
+        tasks = queue.Queue()
+        threads = set()
+        pool_lock = threading.Lock()
+        # 未收到退出信号的工作线程数；退出信号 None 由任意一个空闲线程取走
+        pool_size = 0
+        names = itertools.count()
+        in_flight = 0
+        errors = []
+        slot_freed = threading.Condition()
+
+        def run(message):
+            nonlocal in_flight
+            started = time.perf_counter()
+            try:
+                callback(message)
+            except redis.RedisError as e:
+                logger.error(f"Error consuming messages: {e}")
+            except Exception as e:
+                # 与单线程模式一致：回调的非 Redis 异常会终止消费
+                errors.append(e)
+            finally:
+                sizing.record_latency(time.perf_counter() - started)
+                with slot_freed:
+                    in_flight -= 1
+                    slot_freed.notify()
+
+        def work():
+            try:
+                while True:
+                    message = tasks.get()
+                    if message is None:
+                        return
+                    run(message)
+            finally:
+                with pool_lock:
+                    threads.discard(threading.current_thread())
+
+        def resize(size):
+            nonlocal pool_size
+            with pool_lock:
+                while pool_size < size:
+                    thread = threading.Thread(
+                        target=work,
+                        name=f"{consumer}-worker-{next(names)}",
+                        daemon=True,
+                    )
+                    threads.add(thread)
+                    thread.start()
+                    pool_size += 1
+                # 排在已提交消息之后的 None 让多余的线程处理完手头消息后退出
+                while pool_size > size:
+                    tasks.put(None)
+                    pool_size -= 1
+
+        next_update = None
+        if sizing.interval is not None:
+            next_update = time.time() * 1000 + sizing.interval
+        resize(sizing.workers)
+        try:
+            while not self._shutdown and not errors:
+                prefetch = sizing.prefetch
+                with slot_freed:
+                    while in_flight >= prefetch and not errors:
+                        slot_freed.wait()
+                if errors:
+                    break
+                try:
+                    if next_update is not None and time.time() * 1000 >= next_update:
+                        next_update = time.time() * 1000 + sizing.interval
+                        info = self.sample_lag()
+                        prefetch, workers = sizing.update(info and info.get("lag"))
+                        resize(workers)
+                        if self.metrics is not None:
+                            self._record_adaptive(consumer, prefetch, workers)
+                    else:
+                        self._maybe_sample_lag()
+                    # consume 以 pending 数计算可拉取数量，未 ACK 的在途消息已计入其中
+                    messages = self.consume(
+                        consumer, prefetch, timeout=timeout, **kwargs
+                    )
+                    sizing.record_batch(len(messages), prefetch - in_flight)
+                except redis.RedisError as e:
+                    logger.error(f"Error consuming messages: {e}")
+                    time.sleep(self.RECONNECTION_DELAY)
+                    continue
+                for message in messages:
+                    with slot_freed:
+                        in_flight += 1
+                    if pool_size:
+                        tasks.put(message)
+                    else:
+                        run(message)
+        finally:
+            # 每个线程都会取到一个退出信号，等待已提交的消息处理完毕
+            resize(0)
+            with pool_lock:
+                stopping = list(threads)
+            for thread in stopping:
+                thread.join()
+        if errors:
+            raise errors[0]
+
+    def _record_adaptive(self, consumer, prefetch, workers):
+        labels = {"stream": self.stream, "group": self.group, "consumer": consumer}
+        self.metrics.set_gauge("stream_consumer_prefetch", labels, prefetch)
+        self.metrics.set_gauge("stream_consumer_workers", labels, workers)
+
+    def _record(self, name, amount, consumer=None):
+        labels = {"stream": self.stream, "group": self.group}
+        if consumer is not None:
+            labels["consumer"] = consumer
+        self.metrics.increment(name, labels, amount)
+
+    def _timed_callback(self, consumer: str, callback: Callable) -> Callable:
+        labels = {"stream": self.stream, "group": self.group, "consumer": consumer}
+
+        def timed(message):
+            started = time.perf_counter()
+            try:
+                return callback(message)
+            finally:
+                self.metrics.observe(
+                    "stream_callback_duration_seconds",
+                    labels,
+                    time.perf_counter() - started,
+                )
+
+        return timed
+
+    def _maybe_sample_lag(self):
+        if self.metrics is None:
+            return
+        now = time.time() * 1000
+        if getattr(self.state, "next_lag_sample", 0) <= now:
+            self.state.next_lag_sample = now + self.LAG_SAMPLE_INTERVAL
+            self.sample_lag()
+
+    def sample_lag(self) -> Optional[dict]:
+        """
+        Read the group's lag and pending count with XINFO GROUPS and record them as gauges.
+
+        :return: The XINFO GROUPS entry of this group, None if the group does not exist
+        """
+        if self._auto_setup:
+            self._setup()
+        for info in self.connection.xinfo_groups(self.stream):
+            name = info.get("name")
+            if isinstance(name, bytes):
+                name = name.decode()
+            if name != self.group:
+                continue
+            if self.metrics is not None:
+                labels = {"stream": self.stream, "group": self.group}
+                self.metrics.set_gauge(
+                    "stream_group_pending", labels, info.get("pending", 0)
+                )
+                # lag 字段自 Redis 7.0 起提供，无法计算时为 None
+                if info.get("lag") is not None:
+                    self.metrics.set_gauge("stream_group_lag", labels, info["lag"])
+            return info
+        return None
+
+    def _range_page(self, start, end, count: int):
+        page = self.connection.xrange(self.stream, start, end, count)
+        next_start = None
+        if len(page) >= count:
+            ms, seq = _parse_id(page[-1][0])
+            next_start = _format_id((ms, seq + 1))
+        messages = RedisStreamMessage.from_xclaim(
+            page, stream=self.stream, group=self.group, codec=self.codec
+        )
+        return next_start, messages
+
+    def _range_bounds(self, start, end) -> Optional[tuple]:
+        if start == "-":
+            first = self.connection.xrange(self.stream, count=1)
+            if not first:
+                return None
+            start = first[0][0]
+        if end == "+":
+            last = self.connection.xrevrange(self.stream, count=1)
+            if not last:
+                return None
+            end = last[0][0]
+        return _parse_id(start)[0], _parse_id(end)[0]
+
+    def _read_segment(self, start, end, page_size, pages, stopped):
+        def put(item):
+            while not stopped.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        try:
+            while start is not None:
+                start, messages = self._range_page(start, end, page_size)
+                if messages and not put(messages):
+                    return
+        except Exception as exc:
+            put(exc)
+        put(None)
+
+    def replay(
+        self,
+        start="-",
+        end="+",
+        page_size: int = 1000,
+        segments: int = 1,
+        ordered: bool = True,
+    ) -> Iterator[RedisStreamMessage]:
+        """
+        Lazily iterate the stream entries between `start` and `end` with paginated XRANGE, e.g. for backfills and audits.
+
+        Entries are read outside the consumer group: nothing is delivered or claimed, so they need no ack.
+
+        :param start: First id, "-" for the oldest entry; a `datetime` or an int (milliseconds since the epoch) starts at that time
+        :param end: Last id, "+" for the newest entry; a `datetime` or an int (milliseconds) ends at that time, inclusive
+        :param page_size: Number of entries per XRANGE
+        :param segments: Split the time range into this many segments, each read by a thread of a pool.
+            Worth it for large ranges only, it costs two extra round trips to find the bounds of "-" and "+".
+        :param ordered: Yield the entries of several segments in id order, segments read ahead by at most
+            `REPLAY_QUEUE_PAGES` pages each; False yields every page as soon as any segment returns it
+        """
+        start, end = _to_stream_id(start), _to_stream_id(end)
+        if segments <= 1:
+            return paginate(
+                lambda cursor, count: self._range_page(cursor, end, count),
+                start,
+                page_size,
+            )
+        return self._replay_segments(start, end, page_size, segments, ordered)
+
+    def _replay_segments(self, start, end, page_size, segments, ordered):
+        bounds = self._range_bounds(start, end)
+        if bounds is None or bounds[0] > bounds[1]:
+            return
+        first, last = bounds
+        segments = min(segments, last - first + 1)
+        step = (last - first + 1) / segments
+        # 按毫秒切分：分段 i 读取 [edges[i], edges[i + 1]) 内的条目，首尾保留调用方给定的 id
+        edges = [first + int(step * i) for i in range(segments)] + [last + 1]
+        ranges = [
+            (
+                start if i == 0 else str(edges[i]),
+                end if i == segments - 1 else str(edges[i + 1] - 1),
+            )
+            for i in range(segments)
+        ]
+
+        stopped = threading.Event()
+        if ordered:
+            queues = [queue.Queue(REPLAY_QUEUE_PAGES) for _ in ranges]
+        else:
+            queues = [queue.Queue(REPLAY_QUEUE_PAGES * segments)] * segments
+        executor = ThreadPoolExecutor(
+            max_workers=segments, thread_name_prefix=f"{self.stream}-replay"
+        )
+        try:
+            for (segment_start, segment_end), pages in zip(ranges, queues):
+                executor.submit(
+                    self._read_segment,
+                    segment_start,
+                    segment_end,
+                    page_size,
+                    pages,
+                    stopped,
+                )
+            remaining = segments
+            for pages in queues if ordered else queues[:1]:
+                while remaining:
+                    page = pages.get()
+                    if page is None:
+                        remaining -= 1
+                        if ordered:
+                            break
+                        continue
+                    if isinstance(page, Exception):
+                        raise page
+                    yield from page
+        finally:
+            stopped.set()
+            executor.shutdown(wait=True)
+
+    def _ack_ids(self, ids):
+        if not self.delete_on_ack:
+            acked = self.connection.xack(self.stream, self.group, *ids)
+        else:
+            pipeline = self._pipeline()
+            pipeline.xack(self.stream, self.group, *ids)
+            pipeline.xdel(self.stream, *ids)
+            acked, _ = pipeline.execute()
+        self._release_pending(ids)
+        if self.metrics is not None:
+            self._record("stream_messages_acked_total", len(ids))
+        return acked
+
+    def _buffer_ack(self, message: RedisStreamMessage):
+        if self.track_pending:
+            # 已交由缓冲区确认的消息不再占用本地名额
+            self._release_pending([message.id])
+        with self._ack_lock:
+            self._ack_buffer.append(message.id)
+            if len(self._ack_buffer) < self.ack_batch_size:
+                if self._ack_timer is None:
+                    self._ack_timer = threading.Timer(
+                        self.ack_flush_interval / 1000, self._flush_acks_quietly
+                    )
+                    self._ack_timer.daemon = True
+                    self._ack_timer.start()
+                return
+        self.flush_acks()
+
+    def flush_acks(self):
+        """
+        Send all buffered acks as one XACK.
+        """
+        with self._ack_lock:
+            ids, self._ack_buffer = self._ack_buffer, []
+            if self._ack_timer is not None:
+                self._ack_timer.cancel()
+                self._ack_timer = None
+        if ids:
+            return self._ack_ids(ids)
+        return 0
+
+    def _flush_acks_quietly(self):
+        # 定时刷新失败时消息仍在 pending 中，会在 redeliver_timeout 后被重新投递
+        try:
+            self.flush_acks()
+        except redis.RedisError as exc:
+            logger.exception(f"RedisStreamStore flush acks error<{exc}>")
+
+    def ack_many(self, messages: List[RedisStreamMessage]):
+        """
+        Acknowledge several messages with one XACK.
+        """
+        ids = [message.id for message in messages]
+        if ids:
+            return self._ack_ids(ids)
+        return 0
+
     def ack(self, message: RedisStreamMessage):
         """
         Acknowledge a message.
         """
-        self.connection.xack(self.stream, self.group, message.id)
+        if self.ack_batch_size > 0:
+            self._buffer_ack(message)
+        else:
+            self._ack_ids([message.id])
 
     def reject(self, message: RedisStreamMessage):
         """
         Reject a message.
         """
-        self.connection.xack(self.stream, self.group, message.id)
+        self.ack(message)
+
+    def shutdown(self):
+        trimmer = self.__dict__.get("trimmer")
+        if trimmer is not None:
+            trimmer.stop()
+        if getattr(self, "_ack_buffer", None) and self._connection is not None:
+            self._flush_acks_quietly()
+        super().shutdown()
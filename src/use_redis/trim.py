@@ -0,0 +1,144 @@
+import logging
+import threading
+import time
+from typing import Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_id(id) -> tuple:
+    if isinstance(id, bytes):
+        id = id.decode()
+    ms, _, seq = str(id).partition("-")
+    return int(ms), int(seq or 0)
+
+
+def _format_id(id: tuple) -> str:
+    return f"{id[0]}-{id[1]}"
+
+
+class StreamTrimmer:
+    """
+    Trims a stream periodically from a background thread, keeping XADD free of MAXLEN work.
+
+    Strategies, combined by trimming everything any of them allows:
+
+    - `max_entries`: approximate XTRIM MAXLEN
+    - `max_age`: XTRIM MINID, dropping entries older than `max_age` milliseconds even if unconsumed
+    - `consumed`: XTRIM MINID up to the oldest entry still needed by a group, i.e. its oldest pending entry,
+      or its last delivered entry when nothing is pending; entries not yet read or acked are never removed
+
+    To delete each entry as soon as it is acknowledged, use `RedisStreamStore(delete_on_ack=True)` instead.
+    """
+
+    def __init__(
+        self,
+        store,
+        max_entries: Optional[int] = None,
+        max_age: Optional[int] = None,
+        consumed: bool = False,
+        interval: int = 10000,
+        approximate: bool = True,
+    ):
+        """
+        :param store: The `RedisStreamStore` whose stream is trimmed, its connection is used
+        :param max_entries: Approximate maximum number of entries
+        :param max_age: Maximum age of an entry, derived from its id (milliseconds)
+        :param consumed: Trim entries every group has read and acknowledged
+        :param interval: Interval between two trims (milliseconds)
+        :param approximate: Trim with "~", letting Redis remove whole macro nodes only, which is much cheaper
+        """
+        if max_entries is None and max_age is None and not consumed:
+            raise ValueError("expected one of max_entries, max_age or consumed")
+        self.store = store
+        self.stream = store.stream
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.consumed = consumed
+        self.interval = interval
+        self.approximate = approximate
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def connection(self):
+        return self.store.connection
+
+    def _consumed_id(self) -> Optional[tuple]:
+        """
+        The oldest id still needed by any group, None if there is no group.
+        """
+        try:
+            groups = self.connection.xinfo_groups(self.stream)
+        except redis.exceptions.ResponseError as e:
+            if "no such key" not in str(e):
+                raise e
+            return None
+        if not groups:
+            return None
+        pipeline = self.connection.pipeline(transaction=False)
+        for info in groups:
+            pipeline.xpending(self.stream, info["name"])
+        needed = []
+        for info, pending in zip(groups, pipeline.execute()):
+            if pending["pending"]:
+                needed.append(_parse_id(pending["min"]))
+            else:
+                # 最后投递的条目本身也已确认，从其下一个 id 开始保留
+                ms, seq = _parse_id(info["last-delivered-id"])
+                needed.append((ms, seq + 1))
+        return min(needed)
+
+    def trim(self) -> int:
+        """
+        Trim the stream once.
+
+        :return: Number of entries removed
+        """
+        minid = None
+        if self.max_age is not None:
+            minid = (int(time.time() * 1000) - self.max_age, 0)
+        if self.consumed:
+            consumed_id = self._consumed_id()
+            if consumed_id is not None:
+                minid = consumed_id if minid is None else max(minid, consumed_id)
+
+        removed = 0
+        if minid is not None:
+            removed += self.connection.xtrim(
+                self.stream, minid=_format_id(minid), approximate=self.approximate
+            )
+        if self.max_entries is not None:
+            removed += self.connection.xtrim(
+                self.stream, maxlen=self.max_entries, approximate=self.approximate
+            )
+        if removed:
+            logger.debug(f"trimmed {removed} entries from {self.stream}")
+        return removed
+
+    def _run(self):
+        while not self._stopped.wait(self.interval / 1000):
+            try:
+                self.trim()
+            except redis.RedisError as exc:
+                logger.exception(f"StreamTrimmer trim error<{exc}>")
+
+    def start(self):
+        """
+        Start trimming every `interval` milliseconds in a daemon thread.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=f"{self.stream}-trimmer", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self._thread = None
@@ -0,0 +1,41 @@
+import pytest
+
+from use_redis.adaptive import AdaptivePrefetch
+
+
+def test_grows_under_backlog():
+    adaptive = AdaptivePrefetch(min_prefetch=1, max_prefetch=8, max_workers=2)
+    assert adaptive.update(lag=100) == (2, 1)
+    assert adaptive.update(lag=100) == (4, 2)
+    assert adaptive.update(lag=100) == (8, 2)
+    assert adaptive.update(lag=100) == (8, 2)
+
+
+def test_shrinks_when_idle():
+    adaptive = AdaptivePrefetch(
+        min_prefetch=2, max_prefetch=8, min_workers=1, max_workers=4
+    )
+    adaptive.prefetch, adaptive.workers = 8, 4
+    assert adaptive.update(lag=0) == (4, 3)
+    assert adaptive.update(lag=0) == (2, 2)
+    assert adaptive.update(lag=0) == (2, 1)
+
+
+def test_full_batches_signal_backlog_without_lag():
+    adaptive = AdaptivePrefetch(max_prefetch=8)
+    adaptive.record_batch(1, 1)
+    assert adaptive.update() == (2, 0)
+    adaptive.record_batch(0, 2)
+    assert adaptive.update() == (1, 0)
+
+
+def test_prefetch_capped_by_latency():
+    adaptive = AdaptivePrefetch(max_prefetch=64, max_batch_latency=1.0)
+    adaptive.prefetch = 32
+    adaptive.record_latency(0.1)
+    assert adaptive.update(lag=1000) == (10, 0)
+
+
+def test_invalid_bounds():
+    with pytest.raises(ValueError):
+        AdaptivePrefetch(min_prefetch=0)
@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+import redis
+
+from use_redis.asyncio import (
+    useRedisAsync,
+    useRedisHashAsync,
+    useRedisListAsync,
+    useRedisSetAsync,
+    useRedisStreamAsync,
+)
+
+
+@pytest.fixture
+def mock_redis(mocker):
+    mock = mocker.patch("redis.asyncio.Redis")
+    mock.return_value = mocker.AsyncMock()
+    return mock.return_value
+
+
+def test_connection_is_created_once(mock_redis):
+    async def main():
+        store = useRedisAsync()
+        first = await store.get_connection()
+        second = await store.get_connection()
+        await store.shutdown()
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first is second is mock_redis
+    mock_redis.ping.assert_awaited_once()
+
+
+def test_connection_max_attempts(mocker):
+    mock = mocker.patch("redis.asyncio.Redis")
+    mock.return_value = mocker.AsyncMock()
+    mock.return_value.ping.side_effect = redis.ConnectionError("down")
+    mocker.patch("asyncio.sleep", mocker.AsyncMock())
+    store = useRedisAsync()
+    store.MAX_CONNECTION_ATTEMPTS = 3
+    with pytest.raises(redis.ConnectionError):
+        asyncio.run(store.get_connection())
+    assert mock.return_value.ping.await_count == 3
+
+
+def test_hash_get(mock_redis):
+    mock_redis.hget.return_value = "value1"
+    store = useRedisHashAsync("test_hash")
+    assert asyncio.run(store.get("field1")) == "value1"
+    mock_redis.hget.assert_awaited_once_with("test_hash", "field1")
+
+
+def test_hash_increment_float(mock_redis):
+    store = useRedisHashAsync("test_hash")
+    asyncio.run(store.increment("field1", 1.5))
+    mock_redis.hincrbyfloat.assert_awaited_once_with("test_hash", "field1", 1.5)
+
+
+def test_list_dynamic_method(mock_redis):
+    store = useRedisListAsync("test_list")
+    asyncio.run(store.lmove("destination", "LEFT", "RIGHT"))
+    mock_redis.lmove.assert_awaited_once_with(
+        "test_list", "destination", "LEFT", "RIGHT"
+    )
+
+
+def test_set_add(mock_redis):
+    store = useRedisSetAsync("test_set")
+    asyncio.run(store.add("value1", "value2"))
+    mock_redis.sadd.assert_awaited_once_with("test_set", "value1", "value2")
+
+
+def test_set_are_members(mock_redis):
+    mock_redis.smismember.return_value = [1, 0]
+    store = useRedisSetAsync("test_set")
+    assert asyncio.run(store.are_members("value1", "value2")) == [True, False]
+    mock_redis.smismember.assert_awaited_once_with("test_set", ("value1", "value2"))
+
+
+def test_stream_consume(mock_redis):
+    mock_redis.xpending_range.return_value = []
+    mock_redis.xautoclaim.return_value = ["0-0", [], []]
+    mock_redis.xreadgroup.return_value = [["test_stream", [("1-0", {"foo": "bar"})]]]
+    store = useRedisStreamAsync(stream="test_stream", group="test_group")
+    messages = asyncio.run(store.consume("test_consumer", prefetch=2))
+    assert len(messages) == 1
+    assert messages[0].body == {"foo": "bar"}
+    assert messages[0].group == "test_group"
+
+
+def test_stream_claim_continues_from_cursor(mock_redis):
+    mock_redis.xautoclaim.return_value = ["5-0", [("1-0", {"foo": "bar"})], []]
+    store = useRedisStreamAsync(stream="test_stream", group="test_group")
+
+    async def main():
+        await store.claim_old_pending_messages("test_consumer", 1, 0)
+        await store.claim_old_pending_messages("test_consumer", 1, 0)
+
+    asyncio.run(main())
+    assert mock_redis.xautoclaim.await_args.kwargs["start_id"] == "5-0"
+    assert "test_consumer" not in store._next_claim
+
+
+def test_stream_dead_letter_after_max_deliveries(mock_redis, mocker):
+    mock_redis.xautoclaim.return_value = [
+        "0-0",
+        [("1-0", {"foo": "bar"}), ("2-0", {"foo": "baz"})],
+        [],
+    ]
+    mock_redis.xpending_range.return_value = [
+        {"message_id": "1-0", "times_delivered": 3},
+        {"message_id": "2-0", "times_delivered": 1},
+    ]
+    pipeline = mocker.MagicMock()
+    pipeline.execute = mocker.AsyncMock()
+    mock_redis.pipeline = mocker.MagicMock(return_value=pipeline)
+    store = useRedisStreamAsync(
+        stream="test_stream", group="test_group", max_deliveries=2
+    )
+    messages = asyncio.run(store.claim_old_pending_messages("test_consumer", 2, 0))
+    assert [message.id for message in messages] == ["2-0"]
+    pipeline.xadd.assert_called_once_with(
+        "test_stream:dead",
+        {"foo": "bar", "_stream": "test_stream", "_id": "1-0", "_deliveries": 3},
+    )
+    pipeline.xack.assert_called_once_with("test_stream", "test_group", "1-0")
+
+
+def test_stream_start_consuming_awaits_callback(mock_redis):
+    mock_redis.xpending_range.return_value = []
+    mock_redis.xautoclaim.return_value = ["0-0", [], []]
+    mock_redis.xreadgroup.return_value = [["test_stream", [("1-0", {"foo": "bar"})]]]
+    store = useRedisStreamAsync(stream="test_stream", group="test_group")
+    received = []
+
+    async def callback(message):
+        received.append(message)
+        await store.ack(message)
+        store._shutdown = True
+
+    asyncio.run(store.start_consuming("test_consumer", callback))
+    assert [m.id for m in received] == ["1-0"]
+    mock_redis.xack.assert_awaited_once_with("test_stream", "test_group", "1-0")
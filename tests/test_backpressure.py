@@ -0,0 +1,61 @@
+import pytest
+
+from use_redis.backpressure import Backpressure, BackpressureError, TokenBucket
+
+
+@pytest.fixture
+def store(mocker):
+    store = mocker.Mock(stream="test_stream")
+    store.pipeline = store.connection.pipeline.return_value
+    return store
+
+
+def sampled(store, *backlogs):
+    store.pipeline.execute.side_effect = [
+        [backlog, [{"name": "test_group", "lag": backlog, "pending": 0}]]
+        for backlog in backlogs
+    ]
+
+
+def test_samples_are_cached(store):
+    sampled(store, 0)
+    backpressure = Backpressure(high_water=10, sample_interval=60000)
+    for _ in range(5):
+        backpressure.acquire(store)
+    assert store.pipeline.execute.call_count == 1
+    assert backpressure.backlog(store) == 5
+
+
+def test_reject_above_high_water(store):
+    sampled(store, 10)
+    backpressure = Backpressure(high_water=10, policy="reject")
+    with pytest.raises(BackpressureError):
+        backpressure.acquire(store)
+    assert backpressure.throttled
+
+
+def test_block_until_below_low_water(store, mocker):
+    sleep = mocker.patch("use_redis.backpressure.time.sleep")
+    sampled(store, 12, 9, 8)
+    backpressure = Backpressure(high_water=10, low_water=8, sample_interval=100)
+    backpressure.acquire(store)
+    assert sleep.call_count == 2
+    assert not backpressure.throttled
+
+
+def test_block_gives_up_after_max_wait(store, mocker):
+    mocker.patch("use_redis.backpressure.time.sleep")
+    store.pipeline.execute.return_value = [20, []]
+    backpressure = Backpressure(high_water=10, max_wait=0)
+    with pytest.raises(BackpressureError):
+        backpressure.acquire(store)
+
+
+def test_token_bucket(mocker):
+    sleep = mocker.patch("use_redis.backpressure.time.sleep")
+    bucket = TokenBucket(rate=10, burst=2)
+    bucket.take()
+    bucket.take()
+    sleep.assert_not_called()
+    bucket.take()
+    assert sleep.call_args.args[0] == pytest.approx(0.1, abs=0.01)
@@ -0,0 +1,42 @@
+import time
+
+from use_redis.cache import InvalidationListener, LocalCache
+
+
+def test_lru_eviction():
+    cache = LocalCache(max_size=2)
+    cache.set("a", 1, cache.generation)
+    cache.set("b", 2, cache.generation)
+    assert cache.get("a") == (True, 1)
+    cache.set("c", 3, cache.generation)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    info = cache.info()
+    assert info["evictions"] == 1
+    assert info["hits"] == 2
+    assert info["misses"] == 1
+
+
+def test_ttl_expiry():
+    cache = LocalCache(max_size=2, ttl=0.05)
+    cache.set("a", 1, cache.generation)
+    time.sleep(0.1)
+    assert cache.get("a") == (False, None)
+
+
+def test_stale_read_is_not_cached():
+    cache = LocalCache()
+    generation = cache.generation
+    cache.invalidate()
+    cache.set("a", 1, generation)
+    assert cache.get("a") == (False, None)
+
+
+def test_listener_filters_keys(mocker):
+    on_invalidate = mocker.Mock()
+    listener = InvalidationListener(mocker.Mock(), "config", on_invalidate)
+    listener._handle(["message", "__redis__:invalidate", ["config2"]])
+    on_invalidate.assert_not_called()
+    listener._handle(["message", "__redis__:invalidate", ["config"]])
+    listener._handle(["message", "__redis__:invalidate", None])
+    assert on_invalidate.call_count == 2
@@ -0,0 +1,47 @@
+import pytest
+
+from use_redis.cluster import group_by_slot, hash_tag, key_slot
+from use_redis.set import RedisSetStore
+
+
+def test_hash_tag():
+    assert hash_tag("orders") == "{orders}"
+    assert hash_tag("orders", "stream") == "{orders}:stream"
+    assert key_slot(hash_tag("orders", "stream")) == key_slot("orders")
+    with pytest.raises(ValueError):
+        hash_tag("{orders}")
+
+
+def test_group_by_slot():
+    keys = [hash_tag("a", "1"), "b", hash_tag("a", "2")]
+    groups = group_by_slot(keys)
+    assert groups[key_slot("a")] == ["{a}:1", "{a}:2"]
+    assert groups[key_slot("b")] == ["b"]
+
+
+@pytest.fixture
+def mock_cluster(mocker):
+    mock = mocker.patch("redis.cluster.RedisCluster")
+    return mock.return_value
+
+
+def test_cluster_connection(mock_cluster):
+    store = RedisSetStore("test_set", cluster=True, command_retry=False)
+    assert store.pool is None
+    assert store.connection is mock_cluster
+    store._pipeline()
+    mock_cluster.pipeline.assert_called_once_with(transaction=False)
+
+
+def test_cluster_cross_slot_intersection(mock_cluster):
+    store = RedisSetStore("test_set", cluster=True)
+    pipeline = mock_cluster.pipeline.return_value
+    pipeline.execute.return_value = [{"a", "b"}, {"b", "c"}]
+    assert store.intersection("other_set") == {"b"}
+    mock_cluster.sinter.assert_not_called()
+
+
+def test_cluster_same_slot_intersection(mock_cluster):
+    store = RedisSetStore(hash_tag("sets", "1"), cluster=True)
+    store.intersection(hash_tag("sets", "2"))
+    mock_cluster.sinter.assert_called_once_with("{sets}:1", "{sets}:2")
@@ -0,0 +1,44 @@
+import pytest
+
+from use_redis.codec import CompressedCodec, JsonCodec, get_codec
+
+
+def test_json_roundtrip():
+    codec = get_codec("json")
+    fields = codec.encode_fields({"foo": [1, 2], "bar": None})
+    assert list(fields) == ["d"]
+    assert codec.decode_fields(fields) == {"foo": [1, 2], "bar": None}
+
+
+def test_decode_bytes_fields():
+    codec = JsonCodec()
+    assert codec.decode_fields({b"d": b'{"foo":"bar"}'}) == {"foo": "bar"}
+
+
+def test_plain_fields_are_returned_unchanged():
+    assert JsonCodec().decode_fields({"foo": "bar"}) == {"foo": "bar"}
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        get_codec("xml")
+    with pytest.raises(ValueError):
+        CompressedCodec(JsonCodec(), "brotli")
+
+
+def test_msgpack_is_binary():
+    pytest.importorskip("msgpack")
+    codec = get_codec("msgpack")
+    assert codec.binary
+    assert codec.decode_fields(codec.encode_fields({"foo": b"\x00"})) == {
+        "foo": b"\x00"
+    }
+
+
+@pytest.mark.parametrize("compression", ["zstd", "lz4"])
+def test_compressed_roundtrip(compression):
+    pytest.importorskip({"zstd": "zstandard", "lz4": "lz4"}[compression])
+    codec = get_codec(f"json+{compression}")
+    assert codec.binary
+    body = {"foo": "bar" * 100}
+    assert codec.decode_fields(codec.encode_fields(body)) == body
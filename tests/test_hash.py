@@ -1,4 +1,5 @@
 import pytest
+import redis
 from use_redis.hash import RedisHashStore
 
 
@@ -102,3 +103,146 @@ def test_scan(hash_store, mock_redis):
 def test_dynamic_method(hash_store, mock_redis):
     hash_store.hstrlen("field1")
     mock_redis.hstrlen.assert_called_once_with("test_hash", "field1")
+
+
+@pytest.fixture
+def cached_hash_store(mock_redis, mocker):
+    listener_class = mocker.patch("use_redis.hash.InvalidationListener")
+    listener = listener_class.for_store.return_value
+    listener.ready.is_set.return_value = True
+    return RedisHashStore("test_hash", cache_size=10)
+
+
+def test_cached_get(cached_hash_store, mock_redis):
+    mock_redis.hget.return_value = "value1"
+    assert cached_hash_store.get("field1") == "value1"
+    assert cached_hash_store.get("field1") == "value1"
+    mock_redis.hget.assert_called_once_with("test_hash", "field1")
+    info = cached_hash_store.cache_info()
+    assert info["hits"] == 1
+    assert info["misses"] == 1
+
+
+def test_cached_items_invalidated_by_write(cached_hash_store, mock_redis):
+    mock_redis.hgetall.return_value = {"field1": "value1"}
+    cached_hash_store.items()
+    cached_hash_store.set("field1", "value2")
+    cached_hash_store.items()
+    assert mock_redis.hgetall.call_count == 2
+
+
+def test_cached_read_during_write_not_kept(cached_hash_store, mock_redis):
+    mock_redis.hget.return_value = "value1"
+
+    def hset(*args):
+        # 写入期间另一个读取把旧值放入缓存
+        cached_hash_store.get("field1")
+        mock_redis.hget.return_value = "value2"
+
+    mock_redis.hset.side_effect = hset
+    cached_hash_store.set("field1", "value2")
+    assert cached_hash_store.get("field1") == "value2"
+
+
+def test_cached_get_multiple_returns_copy(cached_hash_store, mock_redis):
+    mock_redis.hmget.return_value = ["value1", "value2"]
+    cached_hash_store.get("field1", "field2").append("value3")
+    assert cached_hash_store.get("field1", "field2") == ["value1", "value2"]
+    mock_redis.hmget.assert_called_once()
+
+
+def test_iter_items(hash_store, mock_redis):
+    mock_redis.hscan.side_effect = [
+        (5, {"field1": "value1"}),
+        (0, {"field2": "value2"}),
+    ]
+    result = list(hash_store.iter_items(match="f*", page_size=1))
+    assert result == [("field1", "value1"), ("field2", "value2")]
+    mock_redis.hscan.assert_called_with("test_hash", 5, "f*", 1)
+
+
+@pytest.fixture
+def write_behind_store(mock_redis):
+    store = RedisHashStore(
+        "test_hash", write_behind=True, flush_interval=60, command_retry=False
+    )
+    yield store
+    store.write_behind = False
+    store.shutdown()
+
+
+def test_write_behind_merges_increments(write_behind_store, mock_redis):
+    pipeline = mock_redis.pipeline.return_value
+    assert write_behind_store.increment("counter", 1) is None
+    write_behind_store.increment("counter", 2)
+    write_behind_store.increment("ratio", 0.5)
+    mock_redis.hincrby.assert_not_called()
+    write_behind_store.flush()
+    pipeline.hincrby.assert_called_once_with("test_hash", "counter", 3)
+    pipeline.hincrbyfloat.assert_called_once_with("test_hash", "ratio", 0.5)
+    pipeline.execute.assert_called_once()
+
+
+def test_write_behind_set_overrides_increments(write_behind_store, mock_redis):
+    pipeline = mock_redis.pipeline.return_value
+    write_behind_store.increment("field1", 5)
+    write_behind_store.set("field1", 0)
+    write_behind_store.flush()
+    pipeline.hset.assert_called_once_with("test_hash", mapping={"field1": 0})
+    pipeline.hincrby.assert_not_called()
+
+
+def test_write_behind_flush_size(mock_redis):
+    store = RedisHashStore(
+        "test_hash", write_behind=True, flush_size=2, command_retry=False
+    )
+    pipeline = mock_redis.pipeline.return_value
+    store.set("field1", "value1")
+    pipeline.execute.assert_not_called()
+    store.set("field2", "value2")
+    pipeline.hset.assert_called_once_with(
+        "test_hash", mapping={"field1": "value1", "field2": "value2"}
+    )
+    pipeline.execute.assert_called_once()
+
+
+def test_increment_within(hash_store, mock_redis):
+    mock_redis.evalsha.return_value = None
+    assert hash_store.increment_within("field1", 5, maximum=10) is None
+    sha, numkeys, *args = mock_redis.evalsha.call_args.args
+    assert (numkeys, args) == (1, ["test_hash", "field1", 5, "", 10, "int"])
+
+
+def test_write_behind_ignores_empty_mapping(write_behind_store, mock_redis):
+    pipeline = mock_redis.pipeline.return_value
+    assert write_behind_store.set_multiple({}) is None
+    write_behind_store.flush()
+    pipeline.execute.assert_not_called()
+
+
+def test_write_behind_restores_when_not_sent(write_behind_store, mock_redis):
+    pipeline = mock_redis.pipeline.return_value
+    pipeline.connection_pool.get_connection.side_effect = redis.ConnectionError
+    write_behind_store.increment("counter", 1)
+    with pytest.raises(redis.ConnectionError):
+        write_behind_store.flush()
+    pipeline.execute.assert_not_called()
+    assert write_behind_store._pending_increments == {"counter": 1}
+
+
+def test_write_behind_drops_on_lost_reply(write_behind_store, mock_redis):
+    pipeline = mock_redis.pipeline.return_value
+    pipeline.execute.side_effect = redis.ConnectionError
+    write_behind_store.increment("counter", 1)
+    with pytest.raises(redis.ConnectionError):
+        write_behind_store.flush()
+    assert write_behind_store._pending_increments == {}
+
+
+def test_write_behind_drops_on_response_error(write_behind_store, mock_redis):
+    pipeline = mock_redis.pipeline.return_value
+    pipeline.execute.side_effect = redis.ResponseError("WRONGTYPE")
+    write_behind_store.increment("counter", 1)
+    with pytest.raises(redis.ResponseError):
+        write_behind_store.flush()
+    assert write_behind_store._pending_increments == {}
@@ -0,0 +1,37 @@
+import pytest
+
+from use_redis.iterators import AdaptivePageSize, paginate
+
+
+def pages(data, calls):
+    def fetch(cursor, count):
+        calls.append((cursor, count))
+        page = data[cursor : cursor + count]
+        next_cursor = cursor + count if cursor + count < len(data) else None
+        return next_cursor, page
+
+    return fetch
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_paginate(prefetch):
+    calls = []
+    result = list(paginate(pages(list(range(10)), calls), 0, 4, prefetch))
+    assert result == list(range(10))
+    assert calls == [(0, 4), (4, 4), (8, 4)]
+
+
+def test_paginate_is_lazy():
+    calls = []
+    iterator = paginate(pages(list(range(10)), calls), 0, 4)
+    assert next(iterator) == 0
+    assert calls == [(0, 4)]
+
+
+def test_adaptive_page_size():
+    sizer = AdaptivePageSize(initial=100, minimum=10, maximum=400, target_latency=0.01)
+    assert sizer.record(0.001) == 200
+    assert sizer.record(0.001) == 400
+    assert sizer.record(0.001) == 400
+    assert sizer.record(0.02) == 200
+    assert sizer.record(0.007) == 200
@@ -86,3 +86,31 @@ def test_insert_after(list_store, mock_redis):
 def test_dynamic_method(list_store, mock_redis):
     list_store.lmove("source", "destination", "LEFT", "RIGHT")
     mock_redis.lmove.assert_called_once_with("test_list", "source", "destination", "LEFT", "RIGHT")
+
+
+def test_iter_range(list_store, mock_redis):
+    mock_redis.lrange.side_effect = [["value1", "value2"], ["value3"]]
+    result = list(list_store.iter_range(page_size=2))
+    assert result == ["value1", "value2", "value3"]
+    mock_redis.lrange.assert_called_with("test_list", 2, 3)
+
+
+def test_iter_range_bounded(list_store, mock_redis):
+    mock_redis.lrange.side_effect = [["value1", "value2"], ["value3"]]
+    result = list(list_store.iter_range(0, 2, page_size=2))
+    assert result == ["value1", "value2", "value3"]
+    mock_redis.lrange.assert_called_with("test_list", 2, 2)
+
+
+def test_pop_many_to(list_store, mock_redis):
+    mock_redis.evalsha.return_value = ["value1", "value2"]
+    assert list_store.pop_many_to("other_list", 2) == ["value1", "value2"]
+    sha, numkeys, *args = mock_redis.evalsha.call_args.args
+    assert (numkeys, args) == (2, ["test_list", "other_list", 2])
+
+
+@pytest.mark.parametrize("end", [-2, -4])
+def test_iter_range_negative_end_before_start(list_store, mock_redis, end):
+    mock_redis.llen.return_value = 1
+    assert list(list_store.iter_range(0, end)) == []
+    mock_redis.lrange.assert_not_called()
@@ -0,0 +1,61 @@
+import pytest
+import redis
+
+from use_redis.metrics import Metrics
+
+
+@pytest.fixture
+def metrics():
+    return Metrics(buckets=(0.1, 1))
+
+
+def test_snapshot(metrics):
+    metrics.increment("requests_total", {"command": "GET"})
+    metrics.increment("requests_total", {"command": "GET"}, 2)
+    metrics.set_gauge("lag", {"stream": "s"}, 5)
+    metrics.observe("duration_seconds", {"command": "GET"}, 0.05)
+    metrics.observe("duration_seconds", {"command": "GET"}, 2)
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == [
+        {"name": "requests_total", "labels": {"command": "GET"}, "value": 3}
+    ]
+    assert snapshot["gauges"][0]["value"] == 5
+    histogram = snapshot["histograms"][0]
+    assert histogram["count"] == 2
+    assert histogram["sum"] == pytest.approx(2.05)
+    assert histogram["buckets"] == {0.1: 1, 1: 0, float("inf"): 1}
+
+
+def test_to_prometheus(metrics):
+    metrics.increment("requests_total", {"command": "GET"})
+    metrics.observe("duration_seconds", None, 0.5)
+    text = metrics.to_prometheus()
+    assert "# TYPE use_redis_requests_total counter" in text
+    assert 'use_redis_requests_total{command="GET"} 1' in text
+    assert 'use_redis_duration_seconds_bucket{le="0.1"} 0' in text
+    assert 'use_redis_duration_seconds_bucket{le="1.0"} 1' in text
+    assert 'use_redis_duration_seconds_bucket{le="+Inf"} 1' in text
+    assert "use_redis_duration_seconds_count 1" in text
+
+
+def test_instrument_records_commands(metrics, mocker):
+    client = mocker.Mock()
+    client.execute_command.side_effect = [1, redis.ResponseError("boom")]
+    metrics.instrument(client)
+    assert client.execute_command("HSET", "key", "field", "value") == 1
+    with pytest.raises(redis.ResponseError):
+        client.execute_command("HSET", "key", "field", "value")
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == [
+        {"name": "command_errors_total", "labels": {"command": "HSET"}, "value": 1}
+    ]
+    assert snapshot["histograms"][0]["count"] == 2
+
+
+def test_store_instruments_connection(metrics, mocker):
+    mocker.patch("redis.Redis")
+    from use_redis.hash import RedisHashStore
+
+    store = RedisHashStore("test_hash", metrics=metrics, shared_pool=False)
+    store.connection.execute_command("HGET", "test_hash", "field")
+    assert metrics.snapshot()["histograms"][0]["labels"] == {"command": "HGET"}
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+from use_redis.multistream import RedisMultiStreamStore
+from use_redis.stream import RedisStreamMessage
+
+
+@pytest.fixture
+def multi_stream_store():
+    store = RedisMultiStreamStore(
+        streams=["test_multi_a", "test_multi_b"], group="test_group"
+    )
+    yield store
+    store.connection.delete(*store.streams)
+    store.shutdown()
+
+
+def test_consume_reads_every_stream(multi_stream_store):
+    multi_stream_store.send("test_multi_a", {"foo": "a"})
+    multi_stream_store.send("test_multi_b", {"foo": "b"})
+    messages = multi_stream_store.consume("test_consumer", prefetch=10, timeout=100)
+    assert all(isinstance(message, RedisStreamMessage) for message in messages)
+    assert {(m.stream, m.body["foo"]) for m in messages} == {
+        ("test_multi_a", "a"),
+        ("test_multi_b", "b"),
+    }
+    assert multi_stream_store.ack_many(messages) == 2
+
+
+def test_consume_respects_per_stream_budget(multi_stream_store):
+    for i in range(3):
+        multi_stream_store.send("test_multi_a", {"index": str(i)})
+    multi_stream_store.send("test_multi_b", {"index": "b"})
+
+    messages = multi_stream_store.consume("test_consumer", prefetch=1, timeout=100)
+    assert sorted(message.stream for message in messages) == [
+        "test_multi_a",
+        "test_multi_b",
+    ]
+    # 两个 stream 的名额都已用完
+    assert multi_stream_store.consume("test_consumer", prefetch=1, timeout=100) == []
+
+    multi_stream_store.ack(
+        next(message for message in messages if message.stream == "test_multi_a")
+    )
+    messages = multi_stream_store.consume("test_consumer", prefetch=1, timeout=100)
+    assert [message.stream for message in messages] == ["test_multi_a"]
+    assert messages[0].body == {"index": "1"}
+
+
+def test_consume_claims_across_streams(multi_stream_store):
+    multi_stream_store.send("test_multi_a", {"foo": "a"})
+    multi_stream_store.send("test_multi_b", {"foo": "b"})
+    multi_stream_store.consume("other_consumer", prefetch=10, timeout=100)
+    time.sleep(0.01)
+
+    messages = multi_stream_store.consume(
+        "test_consumer", prefetch=10, force_claim=True, redeliver_timeout=1
+    )
+    assert sorted(message.stream for message in messages) == [
+        "test_multi_a",
+        "test_multi_b",
+    ]
+
+
+def test_budget_resyncs_after_claim_elsewhere(multi_stream_store):
+    multi_stream_store.PENDING_SYNC_INTERVAL = 0
+    for i in range(2):
+        multi_stream_store.send("test_multi_a", {"index": str(i)})
+    (message,) = multi_stream_store.consume("test_consumer", prefetch=1, timeout=100)
+    multi_stream_store.connection.xclaim(
+        "test_multi_a", "test_group", "other_consumer", 0, [message.id]
+    )
+    (message,) = multi_stream_store.consume("test_consumer", prefetch=1, timeout=100)
+    assert message.body == {"index": "1"}
+
+
+def test_dead_letter_after_max_deliveries(multi_stream_store):
+    multi_stream_store.max_deliveries = 1
+    multi_stream_store.send("test_multi_a", {"foo": "a"})
+    multi_stream_store.send("test_multi_b", {"foo": "b"})
+    first = multi_stream_store.consume("other_consumer", prefetch=10, timeout=100)
+    multi_stream_store.ack(next(m for m in first if m.stream == "test_multi_b"))
+    multi_stream_store.send("test_multi_b", {"foo": "c"})
+    time.sleep(0.01)
+
+    # test_multi_a 的消息第二次投递时超过上限，test_multi_b 的新消息仍交给消费者
+    messages = multi_stream_store.consume(
+        "test_consumer", prefetch=10, force_claim=True, redeliver_timeout=1
+    )
+    assert [message.body for message in messages] == [{"foo": "c"}]
+    dead_letter_stream = multi_stream_store.dead_letter_stream_for("test_multi_a")
+    ((_, fields),) = multi_stream_store.connection.xrange(dead_letter_stream)
+    assert fields["foo"] == "a"
+    assert fields["_stream"] == "test_multi_a"
+    pending = multi_stream_store.connection.xpending("test_multi_a", "test_group")
+    assert pending["pending"] == 0
+    multi_stream_store.connection.delete(
+        dead_letter_stream, multi_stream_store.dead_letter_stream_for("test_multi_b")
+    )
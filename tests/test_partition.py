@@ -0,0 +1,84 @@
+import pytest
+
+from use_redis.partition import RedisPartitionedStreamStore
+
+
+@pytest.fixture
+def partitioned_store():
+    store = RedisPartitionedStreamStore(
+        stream="test_partitioned", group="test_group", partitions=4
+    )
+    yield store
+    store.connection.delete(*store.streams, store.consumers_key)
+    store.shutdown()
+
+
+def test_send_keeps_key_on_one_partition(partitioned_store):
+    stream = partitioned_store.partition_for("user-1")
+    assert stream in partitioned_store.streams
+    for i in range(3):
+        partitioned_store.send({"index": str(i)}, key="user-1")
+    messages = partitioned_store.connection.xrange(stream)
+    assert [body["index"] for _, body in messages] == ["0", "1", "2"]
+
+
+def test_partitions_rebalance_between_consumers(partitioned_store):
+    assert partitioned_store.heartbeat("consumer-a") == partitioned_store.streams
+    # consumer-a 仍持有全部租约，释放前 consumer-b 不读取任何分区
+    assert partitioned_store.heartbeat("consumer-b") == []
+    second = partitioned_store.heartbeat("consumer-a")
+    first = partitioned_store.heartbeat("consumer-b")
+    assert len(first) == len(second) == 2
+    assert sorted(first + second) == sorted(partitioned_store.streams)
+
+    partitioned_store.leave("consumer-b")
+    assert partitioned_store.heartbeat("consumer-a") == partitioned_store.streams
+
+
+def test_consume_reads_assigned_partitions(partitioned_store):
+    for key in ("a", "b", "c", "d"):
+        partitioned_store.send({"key": key}, key=key)
+    messages = partitioned_store.consume("consumer-a", prefetch=10, timeout=100)
+    assert sorted(message.body["key"] for message in messages) == ["a", "b", "c", "d"]
+    partitioned_store.ack_many(messages)
+
+
+def test_partition_released_after_pending_acked(partitioned_store):
+    for key in ("a", "b", "c", "d"):
+        partitioned_store.send({"key": key}, key=key)
+    messages = partitioned_store.consume("consumer-a", prefetch=10, timeout=100)
+    assert partitioned_store.heartbeat("consumer-b") == []
+    wanted = partitioned_store.heartbeat("consumer-a")
+    assert len(wanted) == 2
+    # 交出的分区仍有未确认消息，租约保留到确认之后
+    assert partitioned_store.heartbeat("consumer-b") == []
+
+    partitioned_store.ack_many(messages)
+    partitioned_store.heartbeat("consumer-a")
+    taken = partitioned_store.heartbeat("consumer-b")
+    assert sorted(wanted + taken) == sorted(partitioned_store.streams)
+
+
+def test_heartbeat_without_membership(partitioned_store, mocker):
+    pipeline = mocker.patch.object(partitioned_store, "_pipeline").return_value
+    pipeline.execute.return_value = [1, 0, ["consumer-b"]]
+    assert partitioned_store.heartbeat("consumer-a") == []
+
+
+def test_lease_of_another_owner_is_never_renewed_or_released(partitioned_store):
+    for key in ("a", "b", "c", "d"):
+        partitioned_store.send({"key": key}, key=key)
+    messages = partitioned_store.consume("consumer-a", prefetch=10, timeout=100)
+    partitioned_store.heartbeat("consumer-b")
+    wanted = partitioned_store.heartbeat("consumer-a")
+    draining = sorted(set(partitioned_store.streams) - set(wanted))
+    lease = partitioned_store.lease_key(draining[0])
+    # 租约过期后被 consumer-b 取得
+    partitioned_store.connection.set(lease, "consumer-b", px=60000)
+
+    partitioned_store.heartbeat("consumer-a")
+    assert partitioned_store.connection.pttl(lease) > 30000
+    partitioned_store.leave("consumer-a")
+    assert partitioned_store.connection.get(lease) == "consumer-b"
+    partitioned_store.connection.delete(lease)
+    partitioned_store.ack_many(messages)
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+import redis
+
+from use_redis.pool import ConnectionPoolRegistry, SharedConnectionPool
+from use_redis.store import RedisStore
+
+
+class DummyConnection(redis.Connection):
+    def connect(self):
+        self._sock = object()
+
+    def disconnect(self):
+        self._sock = None
+
+    def can_read(self, timeout=0):
+        return False
+
+
+@pytest.fixture
+def registry():
+    registry = ConnectionPoolRegistry()
+    yield registry
+    registry.disconnect()
+
+
+def test_same_parameters_share_pool(registry):
+    first = registry.get_pool({"host": "localhost", "port": 6379})
+    second = registry.get_pool({"port": 6379, "host": "localhost"})
+    assert first is second
+    assert registry.get_pool({"host": "localhost", "port": 6380}) is not first
+
+
+def test_unshareable_parameters(registry):
+    assert registry.get_pool({"host": "localhost", "ssl": True}) is None
+    assert registry.get_pool({"host": "localhost", "retry_on_error": []}) is None
+
+
+def test_stores_share_pool(mocker):
+    mocker.patch("redis.Redis")
+    first = RedisStore(db=15)
+    second = RedisStore(db=15)
+    assert first.pool is second.pool
+    assert RedisStore(db=15, shared_pool=False).pool is None
+
+
+def test_pool_skips_ping_once_verified(mocker):
+    redis_mock = mocker.patch("redis.Redis")
+    first = RedisStore(db=14)
+    first.connection
+    second = RedisStore(db=14)
+    second.connection
+    redis_mock.return_value.ping.assert_called_once()
+    assert first.pool.verified
+
+
+def test_reap_idle_connections():
+    pool = SharedConnectionPool(idle_timeout=0.05, connection_class=DummyConnection)
+    connection = pool.get_connection("PING")
+    pool.release(connection)
+    assert pool.stats()["idle_connected_connections"] == 1
+    time.sleep(0.1)
+    assert pool.reap() == 1
+    stats = pool.stats()
+    assert stats["idle_connected_connections"] == 0
+    assert stats["available_connections"] == 1
+    assert stats["reaped_connections"] == 1
+    assert stats["checkouts"] == 1
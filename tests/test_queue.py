@@ -0,0 +1,67 @@
+import pytest
+
+from use_redis.queue import RedisListQueue
+
+
+@pytest.fixture
+def mock_redis(mocker):
+    mock = mocker.patch("redis.Redis")
+    return mock.return_value
+
+
+@pytest.fixture
+def queue(mock_redis):
+    queue = RedisListQueue("test_queue", command_retry=False)
+    queue._next_recovery = float("inf")
+    return queue
+
+
+def test_related_keys_share_slot(queue):
+    assert queue.processing_key("worker-1") == "{test_queue}:processing:worker-1"
+    assert queue.workers_key == "{test_queue}:workers"
+
+
+def test_consume_moves_batch(queue, mock_redis):
+    mock_redis.evalsha.return_value = ["job1", "job2"]
+    assert queue.consume("worker-1", count=2, timeout=100) == ["job1", "job2"]
+    _, numkeys, *args = mock_redis.evalsha.call_args.args
+    assert args == ["test_queue", "{test_queue}:processing:worker-1", 2]
+    mock_redis.zadd.assert_called_once()
+    mock_redis.blmove.assert_not_called()
+
+
+def test_consume_blocks_when_empty(queue, mock_redis):
+    mock_redis.evalsha.side_effect = [[], ["job2"]]
+    mock_redis.blmove.return_value = "job1"
+    assert queue.consume("worker-1", count=2, timeout=500) == ["job1", "job2"]
+    mock_redis.blmove.assert_called_once_with(
+        "test_queue", "{test_queue}:processing:worker-1", 0.5, "LEFT", "RIGHT"
+    )
+
+
+def test_recover_requeues_silent_workers(queue, mock_redis):
+    mock_redis.zrangebyscore.return_value = ["worker-2"]
+    mock_redis.evalsha.return_value = 3
+    assert queue.recover() == 3
+    _, numkeys, *args = mock_redis.evalsha.call_args.args
+    assert args[:4] == [
+        "test_queue",
+        "{test_queue}:processing:worker-2",
+        "{test_queue}:workers",
+        "worker-2",
+    ]
+
+
+def test_ack_many(queue, mock_redis):
+    pipeline = mock_redis.pipeline.return_value
+    pipeline.execute.return_value = [1, 1]
+    assert queue.ack_many("worker-1", ["job1", "job2"]) == 2
+    pipeline.lrem.assert_any_call("{test_queue}:processing:worker-1", 1, "job2")
+
+
+def test_pop_batch(queue, mock_redis):
+    mock_redis.blmpop.return_value = ["test_queue", ["job1", "job2"]]
+    assert queue.pop_batch(2, timeout=1000) == ["job1", "job2"]
+    mock_redis.blmpop.assert_called_once_with(
+        1.0, 1, "test_queue", direction="LEFT", count=2
+    )
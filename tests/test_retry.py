@@ -0,0 +1,89 @@
+import pytest
+import redis
+
+from use_redis.retry import CircuitBreaker, CircuitOpenError, Retry
+
+
+class FlakyClient:
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = []
+
+    def execute_command(self, *args, **options):
+        self.calls.append(args)
+        if len(self.calls) <= self.failures:
+            raise redis.ConnectionError("connection reset")
+        return "OK"
+
+    def pipeline(self):
+        raise NotImplementedError
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(mocker):
+    return mocker.patch("use_redis.retry.time.sleep")
+
+
+def test_retries_idempotent_command():
+    client = Retry(attempts=3).instrument(FlakyClient(failures=2))
+    assert client.execute_command("HSET", "key", "field", "value") == "OK"
+    assert len(client.calls) == 3
+
+
+def test_gives_up_after_attempts():
+    client = Retry(attempts=2).instrument(FlakyClient(failures=5))
+    with pytest.raises(redis.ConnectionError):
+        client.execute_command("GET", "key")
+    assert len(client.calls) == 2
+
+
+def test_does_not_retry_non_idempotent_command():
+    client = Retry(attempts=3).instrument(FlakyClient(failures=1))
+    with pytest.raises(redis.ConnectionError):
+        client.execute_command("INCRBY", "key", 1)
+    assert len(client.calls) == 1
+
+
+def test_backoff_is_jittered_and_capped():
+    retry = Retry(base_delay=0.1, max_delay=0.3)
+    delays = [retry.backoff(attempt) for attempt in range(1, 10) for _ in range(20)]
+    assert all(0 <= delay <= 0.3 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_circuit_breaker_fails_fast(mocker):
+    clock = mocker.patch("use_redis.retry.time.monotonic", return_value=100)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    client = Retry(attempts=5, circuit_breaker=breaker).instrument(
+        FlakyClient(failures=10)
+    )
+    with pytest.raises(CircuitOpenError):
+        client.execute_command("GET", "key")
+    assert len(client.calls) == 2
+    assert breaker.state == "open"
+
+    clock.return_value = 111
+    client.failures = 0
+    assert client.execute_command("GET", "key") == "OK"
+    assert breaker.state == "closed"
+
+
+@pytest.mark.parametrize("command", ["XREADGROUP", "XAUTOCLAIM", "SET", "ZADD"])
+def test_does_not_retry_state_changing_reads_and_writes(command):
+    client = Retry(attempts=3).instrument(FlakyClient(failures=1))
+    with pytest.raises(redis.ConnectionError):
+        client.execute_command(command, "key")
+    assert len(client.calls) == 1
+
+
+def test_circuit_breaker_trial_slot_expires(mocker):
+    clock = mocker.patch("use_redis.retry.time.monotonic", return_value=100)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock.return_value = 110
+    breaker.allow()
+    # 试探请求（如阻塞的 XREADGROUP）尚未返回
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    clock.return_value = 120
+    breaker.allow()
@@ -0,0 +1,38 @@
+import hashlib
+
+import pytest
+import redis
+
+from use_redis.scripts import ScriptRegistry
+
+
+@pytest.fixture
+def registry():
+    registry = ScriptRegistry()
+    registry.register("echo", "return ARGV[1]")
+    return registry
+
+
+def test_call_uses_evalsha(registry, mocker):
+    client = mocker.Mock()
+    client.evalsha.return_value = "hello"
+    assert registry.call(client, "echo", ("key",), ("hello",)) == "hello"
+    sha = hashlib.sha1(b"return ARGV[1]").hexdigest()
+    client.evalsha.assert_called_once_with(sha, 1, "key", "hello")
+    client.script_load.assert_not_called()
+
+
+def test_call_reloads_on_noscript(registry, mocker):
+    client = mocker.Mock()
+    client.evalsha.side_effect = [redis.exceptions.NoScriptError("NOSCRIPT"), "hello"]
+    assert registry.call(client, "echo", (), ("hello",)) == "hello"
+    client.script_load.assert_called_once_with("return ARGV[1]")
+    assert client.evalsha.call_count == 2
+
+
+def test_register_conflict(registry):
+    registry.register("echo", "return ARGV[1]")
+    with pytest.raises(ValueError):
+        registry.register("echo", "return ARGV[2]")
+    with pytest.raises(ValueError):
+        registry.call(None, "missing")
@@ -1,3 +1,6 @@
+import threading
+import time
+
 import pytest
 from use_redis.set import RedisSetStore
 
@@ -37,6 +40,13 @@ def test_is_member(set_store, mock_redis):
     mock_redis.sismember.assert_called_once_with("test_set", "value1")
 
 
+def test_are_members(set_store, mock_redis):
+    mock_redis.smismember.return_value = [1, 0]
+    result = set_store.are_members("value1", "value2")
+    assert result == [True, False]
+    mock_redis.smismember.assert_called_once_with("test_set", ("value1", "value2"))
+
+
 def test_size(set_store, mock_redis):
     mock_redis.scard.return_value = 2
     result = set_store.size()
@@ -88,3 +98,71 @@ def test_scan(set_store, mock_redis):
 def test_dynamic_method(set_store, mock_redis):
     set_store.srandmember(3)
     mock_redis.srandmember.assert_called_once_with("test_set", 3)
+
+
+def test_iter_members(set_store, mock_redis):
+    mock_redis.sscan.side_effect = [(3, ["value1"]), (0, ["value2"])]
+    result = list(set_store.iter_members(page_size=1, prefetch=True))
+    assert result == ["value1", "value2"]
+    assert mock_redis.sscan.call_count == 2
+
+
+def test_move_many(set_store, mock_redis):
+    mock_redis.evalsha.return_value = ["value1"]
+    assert set_store.move_many("other_set", "value1", "value2") == ["value1"]
+    sha, numkeys, *args = mock_redis.evalsha.call_args.args
+    assert (numkeys, args) == (2, ["test_set", "other_set", "value1", "value2"])
+
+
+@pytest.fixture
+def replica_set_store(mock_redis, mocker):
+    listener_class = mocker.patch("use_redis.set.InvalidationListener")
+    listener = listener_class.for_store.return_value
+    listener.ready.is_set.return_value = True
+    return RedisSetStore("test_set", replica=True)
+
+
+def test_replica_lookups(replica_set_store, mock_redis):
+    mock_redis.sscan.return_value = (0, ["value1", "1"])
+    assert replica_set_store.is_member("value1") is True
+    assert replica_set_store.are_members(1, "value2") == [True, False]
+    mock_redis.sscan.assert_called_once()
+    mock_redis.sismember.assert_not_called()
+    mock_redis.smismember.assert_not_called()
+
+
+def test_replica_reloaded_after_write(replica_set_store, mock_redis):
+    mock_redis.sscan.return_value = (0, ["value1"])
+    assert replica_set_store.is_member("value2") is False
+    replica_set_store.add("value2")
+    mock_redis.sscan.return_value = (0, ["value1", "value2"])
+    assert replica_set_store.is_member("value2") is True
+    assert mock_redis.sscan.call_count == 2
+
+
+def test_replica_loaded_during_write_not_kept(replica_set_store, mock_redis):
+    mock_redis.sscan.return_value = (0, ["value1"])
+
+    def sadd(*args):
+        # 写入期间另一个读取加载了不含新成员的副本
+        replica_set_store.is_member("value1")
+        mock_redis.sscan.return_value = (0, ["value1", "value2"])
+
+    mock_redis.sadd.side_effect = sadd
+    replica_set_store.add("value2")
+    assert replica_set_store.is_member("value2") is True
+
+
+def test_replica_loaded_once_by_waiting_threads(replica_set_store, mock_redis):
+    mock_redis.sscan.return_value = (0, ["value1"])
+    with replica_set_store._replica_lock:
+        threads = [
+            threading.Thread(target=replica_set_store.is_member, args=("value1",))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join()
+    mock_redis.sscan.assert_called_once()
@@ -1,4 +1,7 @@
 import pytest
+import redis
+import redis.backoff
+import redis.retry
 from redis.exceptions import ConnectionError
 
 from use_redis.store import RedisStore
@@ -28,3 +31,18 @@ def test_redis_connection():
     rds.MAX_CONNECTION_ATTEMPTS = 1
     with pytest.raises(ConnectionError):
         rds.connection
+
+
+def test_redis_retry_is_forwarded():
+    retry = redis.retry.Retry(redis.backoff.NoBackoff(), 1)
+    store = RedisStore(retry=retry)
+    assert store.parameters["retry"] is retry
+    assert store.command_retry is not None
+
+
+def test_stores_share_circuit_breaker():
+    first, second = RedisStore(), RedisStore(db=1)
+    breaker = first.command_retry.circuit_breaker
+    assert breaker is second.command_retry.circuit_breaker
+    assert breaker is not RedisStore(port=6380).command_retry.circuit_breaker
+    assert RedisStore(command_retry=False).command_retry is None
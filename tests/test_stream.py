@@ -1,9 +1,12 @@
+import itertools
 import json
+import threading
 import time
 
 import pytest
 import redis
 
+from use_redis.metrics import Metrics
 from use_redis.stream import RedisStreamMessage, RedisStreamStore
 
 
@@ -27,6 +30,29 @@ class TestRedisStreamMessage:
             "group": "test_group",
         }
 
+    def test_from_xread_shares_batch(self):
+        raw = [["test_stream", [("1-0", {"foo": "bar"}), ("2-0", {"foo": "baz"})]]]
+        first, second = RedisStreamMessage.from_xread(raw, group="test_group")
+        assert isinstance(first, RedisStreamMessage)
+        assert not hasattr(first, "__dict__")
+        assert first.stream == second.stream == "test_stream"
+        assert first.group == "test_group"
+        assert first._batch is second._batch
+        assert second.to_dict() == {
+            "id": "2-0",
+            "body": {"foo": "baz"},
+            "stream": "test_stream",
+            "group": "test_group",
+        }
+
+    def test_stream_and_group_are_assignable(self):
+        raw = [["test_stream", [("1-0", {"foo": "bar"}), ("2-0", {"foo": "baz"})]]]
+        first, second = RedisStreamMessage.from_xread(raw, group="test_group")
+        first.stream = "other_stream"
+        first.group = "other_group"
+        assert (first.stream, first.group) == ("other_stream", "other_group")
+        assert (second.stream, second.group) == ("test_stream", "test_group")
+
 
 # 创建一个测试Redis连接
 def test_redis_connection():
@@ -95,3 +121,329 @@ class TestRedisStreamStore:
         assert isinstance(messages[0], RedisStreamMessage)
         assert messages[0].body == message
         redis_stream_store.ack(messages[0])
+
+    def test_start_consuming_with_workers(self):
+        store = RedisStreamStore(stream="test_workers_stream", group="test_group")
+        for i in range(4):
+            store.send({"index": str(i)})
+
+        lock = threading.Lock()
+        running = []
+        max_running = []
+        consumed = []
+
+        def callback(message):
+            with lock:
+                running.append(message.id)
+                max_running.append(len(running))
+            time.sleep(0.2)
+            store.ack(message)
+            with lock:
+                running.remove(message.id)
+                consumed.append(message.body["index"])
+                if len(consumed) == 4:
+                    store._shutdown = True
+
+        store.start_consuming(
+            "test_consumer", callback, prefetch=4, timeout=100, workers=4
+        )
+        assert sorted(consumed) == ["0", "1", "2", "3"]
+        assert max(max_running) > 1
+
+    def test_ack_many(self, redis_stream_store):
+        consumer = "test_consumer"
+        for _ in range(3):
+            redis_stream_store.send({"foo": "bar"})
+        messages = redis_stream_store.get(consumer, count=3)
+        assert redis_stream_store.ack_many(messages) == 3
+        assert redis_stream_store.ack_many([]) == 0
+
+    def test_buffered_ack_flushes_on_batch_size(self):
+        store = RedisStreamStore(
+            stream="test_ack_stream", group="test_group", ack_batch_size=2
+        )
+        store.send({"foo": "bar"})
+        store.send({"foo": "bar"})
+        first, second = store.get("test_consumer", count=2)
+        store.ack(first)
+        assert store.connection.xpending(store.stream, store.group)["pending"] == 2
+        store.ack(second)
+        assert store.connection.xpending(store.stream, store.group)["pending"] == 0
+
+    def test_buffered_ack_does_not_stall_consume(self):
+        store = RedisStreamStore(
+            stream="test_ack_stall_stream",
+            group="test_group",
+            ack_batch_size=10,
+            ack_flush_interval=60000,
+        )
+        store.connection.delete(store.stream)
+        for _ in range(3):
+            store.send({"foo": "bar"})
+        started = time.time()
+        for _ in range(3):
+            (message,) = store.consume("test_consumer", prefetch=1, timeout=100)
+            store.ack(message)
+        assert time.time() - started < 0.9
+        store.shutdown()
+        store.connection.delete(store.stream)
+
+    def test_buffered_ack_flushes_on_shutdown(self):
+        store = RedisStreamStore(
+            stream="test_ack_stream",
+            group="test_group",
+            ack_batch_size=100,
+            delete_on_ack=True,
+        )
+        message_id = store.send({"foo": "bar"})
+        (message,) = store.get("test_consumer", count=1)
+        store.ack(message)
+        store.shutdown()
+        connection = redis.Redis(decode_responses=True)
+        assert connection.xpending(store.stream, store.group)["pending"] == 0
+        assert connection.xrange(store.stream, message_id, message_id) == []
+
+    def test_consume_with_tracked_pending(self, mocker):
+        store = RedisStreamStore(
+            stream="test_tracked_stream", group="test_group", track_pending=True
+        )
+        store.send({"foo": "bar"})
+        store.send({"foo": "bar"})
+        xpending_range = mocker.spy(store.connection, "xpending_range")
+
+        (message,) = store.consume("test_consumer", prefetch=1, timeout=100)
+
+        def ack_later():
+            time.sleep(0.1)
+            store.ack(message)
+
+        thread = threading.Thread(target=ack_later)
+        started = time.time()
+        thread.start()
+        # prefetch 已满，consume 应在 ack 之后立即返回，而不是固定等待 1s
+        assert store.consume("test_consumer", prefetch=1, timeout=100) == []
+        assert time.time() - started < 0.9
+        thread.join()
+
+        messages = store.consume("test_consumer", prefetch=1, timeout=100)
+        assert len(messages) == 1
+        store.ack(messages[0])
+        xpending_range.assert_not_called()
+
+    def test_tracked_pending_resyncs_after_claim_elsewhere(self):
+        store = RedisStreamStore(
+            stream="test_tracked_sync_stream", group="test_group", track_pending=True
+        )
+        store.PENDING_SYNC_INTERVAL = 0
+        store.connection.delete(store.stream)
+        store.send({"foo": "first"})
+        store.send({"foo": "second"})
+        (message,) = store.consume("test_consumer", prefetch=1, timeout=100)
+        # 另一个进程认领了这条未确认的消息
+        store.connection.xclaim(
+            store.stream, store.group, "other_consumer", 0, [message.id]
+        )
+        (message,) = store.consume("test_consumer", prefetch=1, timeout=100)
+        assert message.body == {"foo": "second"}
+        assert len(store._pending_owner) == 1
+        store.connection.delete(store.stream)
+        store.shutdown()
+
+    def test_send_many(self):
+        store = RedisStreamStore(stream="test_send_many_stream", group="test_group")
+        ids = store.send_many(({"index": str(i)} for i in range(5)), chunk_size=2)
+        assert len(ids) == 5
+        messages = store.get("test_consumer", count=5)
+        assert [m.id for m in messages] == ids
+        assert [m.body["index"] for m in messages] == ["0", "1", "2", "3", "4"]
+        store.ack_many(messages)
+
+    def test_send_many_trims_per_chunk(self, mocker):
+        store = RedisStreamStore(
+            stream="test_send_many_stream", group="test_group", stream_max_entries=10
+        )
+        pipeline = mocker.patch.object(store.connection, "pipeline").return_value
+        pipeline.execute.return_value = ["1-0", "2-0", 0]
+        ids = store.send_many([{"foo": "bar"}] * 2, chunk_size=2)
+        assert ids == ["1-0", "2-0"]
+        pipeline.xtrim.assert_called_once_with(
+            "test_send_many_stream", maxlen=10, approximate=True
+        )
+
+    def test_codec_encodes_body(self):
+        store = RedisStreamStore(
+            stream="test_codec_stream", group="test_group", codec="json"
+        )
+        body = {"user": {"id": 1, "tags": ["a", "b"]}}
+        store.send(body)
+        (message,) = store.get("test_consumer", count=1)
+        assert message.body == body
+        assert message.to_dict()["body"] == body
+        store.ack(message)
+
+    def test_binary_codec_uses_bytes_connection(self):
+        pytest.importorskip("msgpack")
+        store = RedisStreamStore(
+            stream="test_codec_stream", group="test_group", codec="msgpack"
+        )
+        assert store.parameters["decode_responses"] is False
+        store.send({"payload": b"\x00\xff"})
+        (message,) = store.get("test_consumer", count=1)
+        assert message.body == {"payload": b"\x00\xff"}
+        store.ack(message)
+
+    def test_consumer_metrics(self):
+        metrics = Metrics()
+        store = RedisStreamStore(
+            stream="test_metrics_stream", group="test_group", metrics=metrics
+        )
+        store.send({"foo": "bar"})
+
+        def callback(message):
+            store.ack(message)
+            store._shutdown = True
+
+        store.start_consuming("test_consumer", callback, timeout=100)
+        counters = {
+            item["name"]: item["value"] for item in metrics.snapshot()["counters"]
+        }
+        assert counters["stream_messages_fetched_total"] == 1
+        assert counters["stream_messages_acked_total"] == 1
+        histograms = {item["name"] for item in metrics.snapshot()["histograms"]}
+        assert "stream_callback_duration_seconds" in histograms
+        assert "command_duration_seconds" in histograms
+        assert store.sample_lag()["pending"] == 0
+
+    def test_claim_continues_from_cursor(self):
+        store = RedisStreamStore(stream="test_claim_cursor_stream", group="test_group")
+        for i in range(3):
+            store.send({"index": str(i)})
+        store.get("other_consumer", count=3)
+
+        first = store.claim_old_pending_messages("test_consumer", 1, 0)
+        second = store.claim_old_pending_messages("test_consumer", 1, 0)
+        assert first[0].body == {"index": "0"}
+        assert second[0].body == {"index": "1"}
+        store.ack_many(first + second)
+        store.connection.delete(store.stream)
+
+    def test_dead_letter_after_max_deliveries(self):
+        store = RedisStreamStore(
+            stream="test_dead_letter_stream", group="test_group", max_deliveries=1
+        )
+        store.connection.delete(store.dead_letter_stream)
+        id = store.send({"foo": "bar"})
+        store.get("other_consumer", count=1)
+
+        assert store.claim_old_pending_messages("test_consumer", 1, 0) is None
+        assert store.connection.xpending(store.stream, store.group)["pending"] == 0
+        ((_, fields),) = store.connection.xrange(store.dead_letter_stream)
+        assert fields == {
+            "foo": "bar",
+            "_stream": "test_dead_letter_stream",
+            "_id": id,
+            "_deliveries": "2",
+        }
+        store.connection.delete(store.stream, store.dead_letter_stream)
+
+    def test_start_consuming_adaptively(self):
+        from use_redis.adaptive import AdaptivePrefetch
+
+        store = RedisStreamStore(stream="test_adaptive_stream", group="test_group")
+        store.send_many({"index": str(i)} for i in range(20))
+        adaptive = AdaptivePrefetch(max_prefetch=8, max_workers=2, interval=0)
+        consumed = []
+        lock = threading.Lock()
+
+        def callback(message):
+            store.ack(message)
+            with lock:
+                consumed.append(message.body["index"])
+                if len(consumed) == 20:
+                    store._shutdown = True
+
+        store.start_consuming("test_consumer", callback, timeout=100, adaptive=adaptive)
+        assert sorted(consumed, key=int) == [str(i) for i in range(20)]
+        assert adaptive.prefetch > 1
+        store.connection.delete(store.stream)
+
+    def test_adaptive_workers_shrink_then_shut_down(self, mocker):
+        from use_redis.adaptive import AdaptivePrefetch
+
+        store = RedisStreamStore(stream="test_adaptive_stream", group="test_group")
+        adaptive = AdaptivePrefetch(max_workers=6, interval=0)
+        lags = itertools.cycle([100] * 6 + [0] * 6)
+        mocker.patch.object(store, "sample_lag", lambda: {"lag": next(lags)})
+        calls = itertools.count()
+
+        def consume(consumer, prefetch, **kwargs):
+            if next(calls) >= 60:
+                store._shutdown = True
+            return []
+
+        mocker.patch.object(store, "consume", consume)
+        thread = threading.Thread(
+            target=store.start_consuming,
+            args=("test_shrink_consumer", print),
+            kwargs={"timeout": 100, "adaptive": adaptive},
+            daemon=True,
+        )
+        thread.start()
+        thread.join(5)
+        assert not thread.is_alive()
+        assert not [
+            worker
+            for worker in threading.enumerate()
+            if worker.name.startswith("test_shrink_consumer-worker")
+        ]
+
+    def test_send_rejected_by_backpressure(self):
+        from use_redis.backpressure import Backpressure, BackpressureError
+
+        store = RedisStreamStore(
+            stream="test_backpressure_stream",
+            group="test_group",
+            backpressure=Backpressure(high_water=2, policy="reject"),
+        )
+        store.connection.delete(store.stream)
+        store.send({"foo": "bar"})
+        store.send({"foo": "bar"})
+        with pytest.raises(BackpressureError):
+            store.send({"foo": "bar"})
+        assert store.connection.xlen(store.stream) == 2
+        store.connection.delete(store.stream)
+
+
+@pytest.mark.parametrize("segments, ordered", [(1, True), (3, True), (3, False)])
+def test_replay(segments, ordered):
+    store = RedisStreamStore(stream="test_replay_stream", group="test_group")
+    store.connection.delete(store.stream)
+    for i in range(10):
+        store.connection.xadd(store.stream, {"foo": i}, id=f"{1000 + i * 10}-0")
+    try:
+        messages = list(store.replay(page_size=3, segments=segments, ordered=ordered))
+        ids = [message.id for message in messages]
+        if ordered:
+            assert ids == [f"{1000 + i * 10}-0" for i in range(10)]
+        assert sorted(ids) == [f"{1000 + i * 10}-0" for i in range(10)]
+        assert all(isinstance(message, RedisStreamMessage) for message in messages)
+
+        window = list(store.replay(start=1020, end=1050, segments=segments))
+        assert [message.body["foo"] for message in window] == ["2", "3", "4", "5"]
+    finally:
+        store.connection.delete(store.stream)
+        store.shutdown()
+
+
+def test_replay_is_lazy(mocker):
+    store = RedisStreamStore(stream="test_replay_stream", group="test_group")
+    xrange = mocker.patch.object(
+        store.connection, "xrange", return_value=[("1-0", {}), ("2-0", {})]
+    )
+    iterator = store.replay(page_size=2)
+    assert next(iterator).id == "1-0"
+    assert xrange.call_count == 1
+    next(iterator)
+    next(iterator)
+    assert xrange.call_args.args[1] == "2-1"
+    store.shutdown()
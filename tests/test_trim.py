@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from use_redis.stream import RedisStreamStore
+from use_redis.trim import StreamTrimmer
+
+
+@pytest.fixture
+def stream_store():
+    store = RedisStreamStore(stream="test_trim_stream", group="test_group")
+    store.connection.delete(store.stream)
+    yield store
+    store.connection.delete(store.stream)
+    store.shutdown()
+
+
+def test_requires_a_strategy(stream_store):
+    with pytest.raises(ValueError):
+        StreamTrimmer(stream_store)
+
+
+def test_trim_by_age(stream_store):
+    old = int(time.time() * 1000) - 60000
+    stream_store.connection.xadd(stream_store.stream, {"foo": "old"}, id=f"{old}-0")
+    stream_store.send({"foo": "new"})
+    trimmer = StreamTrimmer(stream_store, max_age=30000, approximate=False)
+    assert trimmer.trim() == 1
+    assert stream_store.connection.xlen(stream_store.stream) == 1
+
+
+def test_trim_consumed_keeps_pending(stream_store):
+    for i in range(3):
+        stream_store.send({"foo": i})
+    first, second = stream_store.consume("test_consumer", prefetch=2)
+    stream_store.ack(first)
+    trimmer = StreamTrimmer(stream_store, consumed=True, approximate=False)
+    assert trimmer.trim() == 1
+    entries = stream_store.connection.xrange(stream_store.stream)
+    assert [entry[0] for entry in entries][0] == second.id
+    assert len(entries) == 2
+
+
+def test_trim_max_entries(stream_store):
+    for i in range(5):
+        stream_store.send({"foo": i})
+    trimmer = StreamTrimmer(stream_store, max_entries=2, approximate=False)
+    assert trimmer.trim() == 3
+
+
+def test_background_trimming(stream_store):
+    store = RedisStreamStore(
+        stream=stream_store.stream,
+        group="test_group",
+        trim_consumed=True,
+        trim_interval=10,
+    )
+    store.send({"foo": "bar"})
+    message = store.consume("test_consumer", prefetch=1)[0]
+    store.ack(message)
+    deadline = time.time() + 1
+    while store.connection.xlen(store.stream) and time.time() < deadline:
+        time.sleep(0.01)
+    assert store.connection.xlen(store.stream) == 0
+    store.shutdown()
+    assert store.trimmer._thread is None
+
+
+def test_background_max_entries(stream_store, mocker):
+    store = RedisStreamStore(
+        stream=stream_store.stream,
+        group="test_group",
+        trim_max_entries=2,
+        trim_interval=60000,
+    )
+    xadd = mocker.spy(store.connection, "xadd")
+    for i in range(5):
+        store.send({"foo": i})
+    # XADD 不带 MAXLEN，由后台线程截断
+    assert all(call.kwargs["maxlen"] is None for call in xadd.call_args_list)
+    store.trimmer.approximate = False
+    assert store.trimmer.trim() == 3
+    store.shutdown()